@@ -0,0 +1,115 @@
+import argparse
+import json
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from field_linguistics_ide import codec
+from field_linguistics_ide.project import load_document
+from field_linguistics_ide.synthetic import CorpusGenerator, CorpusSpec
+from field_linguistics_ide.types_ import Document, Line, Morpheme, MorphemesDictionary, \
+    Token, write_text_atomically
+
+
+def legacy_save(document: Document, path: Path):
+    # what Document.save did before the codec
+    write_text_atomically(path, json.dumps([asdict(line) for line in document.data],
+                                           ensure_ascii=False, indent=4,
+                                           cls=codec.JSONEncoderWithDataClasses))
+
+
+def legacy_load(path: Path) -> Document:
+    document = Document()
+    for line_dict in json.loads(path.read_text()):
+        tokens_dicts = line_dict.pop('tokens')
+        line = Line([], **line_dict)
+        for token_dict in tokens_dicts:
+            morpheme_dicts = token_dict.pop('morphemes')
+            token = Token([], **token_dict)
+            for morpheme_dict in morpheme_dicts:
+                document.add_morpheme_to_token(Morpheme(**morpheme_dict), token)
+            document.add_token_to_line(token, line)
+        document.add_line(line)
+    return document
+
+
+def measure(function: Callable[[], None], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def check_round_trip(document: Document, directory: Path):
+    legacy_path = directory / 'legacy.json'
+    legacy_save(document, legacy_path)
+    for compact in (False, True):
+        path = directory / 'document.json'
+        document.save(path, compact=compact)
+        loaded = load_document(path)
+        if loaded.snapshot() != document.snapshot():
+            raise AssertionError('compact={} does not load back the same document'
+                                 .format(compact))
+        if not compact and path.read_bytes() != legacy_path.read_bytes():
+            raise AssertionError('indented output differs from json.dumps')
+        loaded.save(path, compact=compact)
+        if codec.loads(path.read_bytes()) != document.snapshot():
+            raise AssertionError('compact={} changes on a second save'.format(compact))
+
+
+def run(lines: int, repeat: int, directory: Path) -> Dict[str, float]:
+    document = CorpusGenerator(CorpusSpec(lines=lines)).document(MorphemesDictionary(),
+                                                                 'document')
+    check_round_trip(document, directory)
+    legacy_path = directory / 'legacy.json'
+    indented_path = directory / 'indented.json'
+    compact_path = directory / 'compact.json'
+    results = {
+        'save legacy': measure(lambda: legacy_save(document, legacy_path), repeat),
+        'save indented': measure(lambda: document.save(indented_path), repeat),
+        'save compact': measure(lambda: document.save(compact_path, compact=True), repeat),
+        'load legacy': measure(lambda: legacy_load(legacy_path), repeat),
+        'load indented': measure(lambda: load_document(indented_path), repeat),
+        'load compact': measure(lambda: load_document(compact_path), repeat),
+    }
+    if codec.orjson is not None:
+        backend, codec.orjson = codec.orjson, None
+        try:
+            results['save compact, json'] = measure(
+                lambda: document.save(compact_path, compact=True), repeat)
+            results['load compact, json'] = measure(
+                lambda: load_document(compact_path), repeat)
+        finally:
+            codec.orjson = backend
+    results['size indented, KiB'] = indented_path.stat().st_size / 1024
+    results['size compact, KiB'] = compact_path.stat().st_size / 1024
+    return results
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Document save and load, before and after '
+                                                 'the codec')
+    parser.add_argument('--lines', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+    print('orjson: {}'.format('yes' if codec.orjson is not None else 'no'))
+    with tempfile.TemporaryDirectory() as directory:
+        for lines in args.lines:
+            print('{} lines'.format(lines))
+            for name, value in run(lines, args.repeat, Path(directory)).items():
+                if name.startswith('size'):
+                    print('  {:<20} {:10.0f}'.format(name, value))
+                else:
+                    print('  {:<20} {:10.2f} ms'.format(name, value * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+import argparse
+import json
+from pathlib import Path
+from typing import List, Optional
+
+
+def _medians(path: Path) -> dict:
+    results = json.loads(path.read_text())
+    return {(run['spec']['lines'], name): timing['median']
+            for run in results['runs']
+            for name, timing in run['results'].items()}
+
+
+def compare(baseline: Path, current: Path):
+    before = _medians(baseline)
+    after = _medians(current)
+    print('{:<8} {:<22} {:>12} {:>12} {:>8}'.format(
+        'lines', 'benchmark', 'baseline ms', 'current ms', 'ratio'))
+    for key in sorted(before.keys() & after.keys()):
+        lines, name = key
+        print('{:<8} {:<22} {:12.2f} {:12.2f} {:8.2f}'.format(
+            lines, name, before[key] * 1000, after[key] * 1000,
+            after[key] / before[key] if before[key] else float('nan')))
+
+
+def plot(paths: List[Path], output: Path):
+    # matplotlib is only needed for plotting
+    import matplotlib
+    matplotlib.use('Agg')
+    from matplotlib import pyplot
+    figure, axes = pyplot.subplots()
+    for path in paths:
+        medians = _medians(path)
+        for name in sorted({name for _, name in medians}):
+            points = sorted((lines, median) for (lines, bench_name), median
+                            in medians.items() if bench_name == name)
+            axes.plot([lines for lines, _ in points],
+                      [median * 1000 for _, median in points],
+                      marker='o', label='{} ({})'.format(name, path.stem))
+    axes.set_xscale('log')
+    axes.set_yscale('log')
+    axes.set_xlabel('lines')
+    axes.set_ylabel('median, ms')
+    axes.legend(fontsize='small')
+    figure.savefig(str(output))
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Compare or plot benchmark results')
+    parser.add_argument('results', type=Path, nargs='+')
+    parser.add_argument('--plot', type=Path, help='write scaling curves to this image')
+    args = parser.parse_args(argv)
+    if args.plot:
+        plot(args.results, args.plot)
+    elif len(args.results) == 2:
+        compare(*args.results)
+    else:
+        parser.error('pass two result files to compare or --plot')
+
+
+if __name__ == '__main__':
+    main()
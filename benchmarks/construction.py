@@ -0,0 +1,65 @@
+import argparse
+import gc
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PySide2 import QtCore, QtWidgets as Qt
+from field_linguistics_ide.synthetic import CorpusGenerator, CorpusSpec
+from field_linguistics_ide.types_ import MorphemesDictionary
+from field_linguistics_ide.user_interface import theme
+from field_linguistics_ide.user_interface.widgets import DictionaryArea, DocumentArea
+
+
+def build(app: Qt.QApplication, document) -> DocumentArea:
+    document_area = DocumentArea(document)
+    document_area.display()
+    # every chunk, not only the first one
+    while document_area.rendering:
+        document_area._render_next_chunk()
+    app.processEvents()
+    return document_area
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description='Time to build the widgets of a document with many morphemes')
+    parser.add_argument('--morphemes', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    app = Qt.QApplication.instance() or Qt.QApplication([])
+    theme.apply(app)
+    dictionary = MorphemesDictionary()
+    DictionaryArea(dictionary)
+    spec = CorpusSpec()
+    lines = max(1, args.morphemes // (spec.tokens_per_line * spec.morphemes_per_token))
+    document = CorpusGenerator(spec._replace(lines=lines)).document(dictionary, 'document')
+
+    timings = []
+    objects = 0
+    for _ in range(args.repeat):
+        gc.collect()
+        started = time.perf_counter()
+        document_area = build(app, document)
+        timings.append(time.perf_counter() - started)
+        objects = len(document_area.findChildren(QtCore.QObject))
+        # closing would pop the lines from the document
+        document_area.cancel_rendering()
+        document_area.deleteLater()
+        app.processEvents()
+    print('{} morphemes, {} lines, {} QObjects'.format(
+        len(document.morphemes), len(document.lines), objects))
+    print('  median  {:8.1f} ms'.format(statistics.median(timings) * 1000))
+    print('  min     {:8.1f} ms'.format(min(timings) * 1000))
+    print('  max     {:8.1f} ms'.format(max(timings) * 1000))
+
+
+if __name__ == '__main__':
+    main()
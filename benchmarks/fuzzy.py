@@ -0,0 +1,86 @@
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from field_linguistics_ide.fuzzy import FuzzyIndex, edit_distance
+from field_linguistics_ide.types_ import Morpheme, MorphemesDictionary
+
+LETTERS = 'aeioukptmnslrwhy'
+
+
+def lexicon(entries: int, rng: random.Random) -> MorphemesDictionary:
+    forms = set()
+    while len(forms) < entries:
+        forms.add(''.join(rng.choice(LETTERS) for _ in range(rng.randint(2, 9))))
+    dictionary = MorphemesDictionary()
+    dictionary.add_many(Morpheme(form, 'gloss{}'.format(number))
+                        for number, form in enumerate(sorted(forms)))
+    return dictionary
+
+
+def typo(form: str, rng: random.Random) -> str:
+    position = rng.randrange(len(form))
+    return form[:position] + rng.choice(LETTERS) + form[position + 1:]
+
+
+def brute_force(dictionary: MorphemesDictionary, text: str, distance: int) -> List[tuple]:
+    distances = ((edit_distance(text, entry.text, distance), dict_id)
+                 for dict_id, entry in dictionary.items())
+    return sorted(pair for pair in distances if pair[0] <= distance)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Fuzzy dictionary lookup against a scan')
+    parser.add_argument('--entries', type=int, default=100000)
+    parser.add_argument('--queries', type=int, default=2000)
+    parser.add_argument('--distance', type=int, default=1)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(0)
+    dictionary = lexicon(args.entries, rng)
+    forms = [entry.text for entry in dictionary.values()]
+    queries = [typo(rng.choice(forms), rng) for _ in range(args.queries)]
+    index = FuzzyIndex(dictionary, args.distance)
+
+    started = time.perf_counter()
+    index.lookup('')
+    print('{} entries, distance {}'.format(len(dictionary), args.distance))
+    print('  build          {:8.1f} ms'.format((time.perf_counter() - started) * 1000))
+
+    timings = []
+    for query in queries:
+        started = time.perf_counter()
+        index.lookup(query)
+        timings.append(time.perf_counter() - started)
+    print('  lookup median  {:8.3f} ms'.format(statistics.median(timings) * 1000))
+    print('  lookup max     {:8.3f} ms'.format(max(timings) * 1000))
+
+    checked = queries[:20]
+    started = time.perf_counter()
+    for query in checked:
+        expected = brute_force(dictionary, query, args.distance)
+        found = sorted((suggestion.distance, suggestion.dict_id)
+                       for suggestion in index.lookup(query))
+        if found != expected:
+            raise AssertionError('{!r}: {} instead of {}'.format(query, found, expected))
+    print('  scan           {:8.3f} ms'.format(
+        (time.perf_counter() - started) / len(checked) * 1000))
+
+    started = time.perf_counter()
+    dict_ids = [dictionary.add(Morpheme(query, 'new'))
+                for query in dict.fromkeys(queries[:1000])]
+    for dict_id in dict_ids:
+        dictionary.edit(dict_id, 'text', dictionary[dict_id].text + 'a')
+        dictionary.pop(dict_id)
+    print('  add, edit, pop {:8.3f} ms'.format(
+        (time.perf_counter() - started) / len(dict_ids) * 1000))
+
+
+if __name__ == '__main__':
+    main()
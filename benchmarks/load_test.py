@@ -0,0 +1,130 @@
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from field_linguistics_ide.server.client import AsyncClient, query_path
+from field_linguistics_ide.server.index import CorpusIndex
+from field_linguistics_ide.server.server import CorpusServer
+from field_linguistics_ide.synthetic import CorpusSpec, generate_project
+
+
+def start_server(project: Path) -> CorpusServer:
+    # the server gets its own thread and event loop, clients run in the main one
+    server = CorpusServer(CorpusIndex(project), port=0)
+    started = threading.Event()
+
+    def run():
+        async def serve():
+            await server.start()
+            started.set()
+            await server.serve_forever()
+
+        asyncio.run(serve())
+
+    threading.Thread(target=run, daemon=True).start()
+    started.wait()
+    return server
+
+
+def workload(index: CorpusIndex, size: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    texts = sorted(entry.text for entry in index.dictionary.values())
+    glosses = sorted({entry.gloss for entry in index.dictionary.values() if entry.gloss})
+    names = index.document_names
+    paths = []
+    for _ in range(size):
+        kind = rng.random()
+        if kind < 0.6 and texts:
+            paths.append(query_path('concordance', query=rng.choice(texts), limit=20))
+        elif kind < 0.8 and glosses:
+            paths.append(query_path('concordance', query=rng.choice(glosses),
+                                    field='gloss', limit=20))
+        elif kind < 0.95 and texts:
+            paths.append(query_path('dictionary', text=rng.choice(texts)))
+        elif kind < 0.98 or not names:
+            paths.append('/statistics')
+        else:
+            paths.append('/documents/{}'.format(rng.choice(names)))
+    return paths
+
+
+async def connection(host: str, port: int, paths: List[str], depth: int,
+                     latencies: List[float], reconnect: bool):
+    client = AsyncClient(host, port)
+    await client.connect()
+    for start in range(0, len(paths), depth):
+        if reconnect:
+            await client.close()
+            await client.connect()
+        batch = paths[start:start + depth]
+        started = time.perf_counter()
+        await client.pipeline(batch)
+        latencies.append((time.perf_counter() - started) / len(batch))
+    await client.close()
+
+
+async def run(host: str, port: int, paths: List[str], connections: int,
+              depth: int, reconnect: bool) -> List[float]:
+    latencies = []
+    share = len(paths) // connections
+    await asyncio.gather(*(connection(host, port, paths[index * share:(index + 1) * share],
+                                      depth, latencies, reconnect)
+                           for index in range(connections)))
+    return latencies
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Load test for the corpus query server')
+    parser.add_argument('--project', type=Path,
+                        help='project to serve, a synthetic one is generated by default')
+    parser.add_argument('--host', help='test an already running server instead')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--lines', type=int, default=1000)
+    parser.add_argument('--documents', type=int, default=4)
+    parser.add_argument('--connections', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=4000)
+    parser.add_argument('--pipeline', type=int, default=1,
+                        help='requests sent per connection before reading answers')
+    parser.add_argument('--reconnect', action='store_true',
+                        help='open a new connection for every batch')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directory:
+        project = args.project
+        if project is None:
+            project = Path(directory) / 'project'
+            generate_project(project, CorpusSpec(lines=args.lines), args.documents)
+        if args.host is None:
+            server = start_server(project)
+            index, host, port = server.index, server.host, server.port
+        else:
+            index, host, port = CorpusIndex(project), args.host, args.port
+        paths = workload(index, args.requests, args.seed)
+        started = time.perf_counter()
+        latencies = asyncio.run(run(host, port, paths, args.connections,
+                                    args.pipeline, args.reconnect))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    answered = args.requests // args.connections * args.connections
+    print('{} requests over {} connections, pipeline depth {}{}'.format(
+        answered, args.connections, args.pipeline, ', reconnecting' if args.reconnect else ''))
+    print('  throughput  {:10.1f} requests/s'.format(answered / elapsed))
+    print('  median      {:10.3f} ms'.format(statistics.median(latencies) * 1000))
+    for percentile in (95, 99):
+        position = min(len(latencies) - 1, len(latencies) * percentile // 100)
+        print('  p{}         {:10.3f} ms'.format(percentile, latencies[position] * 1000))
+
+
+if __name__ == '__main__':
+    main()
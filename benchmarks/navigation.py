@@ -0,0 +1,90 @@
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PySide2 import QtCore, QtGui, QtWidgets as Qt
+from field_linguistics_ide.synthetic import CorpusGenerator, CorpusSpec
+from field_linguistics_ide.types_ import MorphemesDictionary
+from field_linguistics_ide.user_interface import theme
+from field_linguistics_ide.user_interface.widgets import DictionaryArea, DocumentArea
+from field_linguistics_ide.user_interface.widgets.document_area.common import EditableWidgetsArea
+from field_linguistics_ide.user_interface.widgets.document_area.morpheme_widget import \
+    MorphemeGlossLabel, MorphemeWidget
+
+
+def use_inline_styles():
+    # what the widgets did before the shared theme, for comparison
+    EditableWidgetsArea.focusInEvent = lambda self, _: self.setStyleSheet('background: gray;')
+    EditableWidgetsArea.focusOutEvent = lambda self, _: self.setStyleSheet('')
+
+    def highlight_not_in_dict(self, in_dict: bool):
+        self.fixed.setStyleSheet('' if in_dict else
+                                 'border-bottom-width: 1px;'
+                                 'border-bottom-style: solid;'
+                                 'border-radius: 0px;'
+                                 'border-color: brown;')
+
+    MorphemeGlossLabel.highlight_not_in_dict = highlight_not_in_dict
+
+
+def navigate(app: Qt.QApplication, document_area: DocumentArea, steps: int) -> List[float]:
+    first = next(widget for widget in document_area.morphemes_tray.values()
+                 if isinstance(widget, MorphemeWidget))
+    first.setFocus()
+    app.processEvents()
+    timings = []
+    for _ in range(steps):
+        focused = app.focusWidget()
+        if focused is None:
+            break
+        started = time.perf_counter()
+        app.sendEvent(focused, QtGui.QKeyEvent(QtCore.QEvent.KeyPress,
+                                               QtCore.Qt.Key_Right, QtCore.Qt.NoModifier))
+        # includes the repaint of both widgets
+        app.processEvents()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(
+        description='Latency of moving between morphemes with the arrow keys')
+    parser.add_argument('--lines', type=int, default=200)
+    parser.add_argument('--steps', type=int, default=1000)
+    parser.add_argument('--inline-styles', action='store_true',
+                        help='set a stylesheet per widget like before the shared theme')
+    args = parser.parse_args(argv)
+
+    app = Qt.QApplication.instance() or Qt.QApplication([])
+    if args.inline_styles:
+        use_inline_styles()
+    else:
+        theme.apply(app)
+    dictionary = MorphemesDictionary()
+    DictionaryArea(dictionary)
+    document = CorpusGenerator(CorpusSpec(lines=args.lines)).document(dictionary, 'document')
+    document_area = DocumentArea(document)
+    document_area.display()
+    document_area.resize(1600, 1000)
+    document_area.show()
+    while document_area.rendering:
+        app.processEvents()
+
+    timings = navigate(app, document_area, args.steps)
+    timings.sort()
+    print('{} steps, {}'.format(len(timings),
+                                'inline stylesheets' if args.inline_styles else 'shared theme'))
+    print('  median  {:8.3f} ms'.format(statistics.median(timings) * 1000))
+    print('  p95     {:8.3f} ms'.format(timings[len(timings) * 95 // 100] * 1000))
+    print('  max     {:8.3f} ms'.format(timings[-1] * 1000))
+
+
+if __name__ == '__main__':
+    main()
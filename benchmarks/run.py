@@ -0,0 +1,164 @@
+import argparse
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from field_linguistics_ide.loaders.csv_loader import CSVLoader
+from field_linguistics_ide.loaders.json_loader import JsonLoader
+from field_linguistics_ide.project import Project, load_document
+from field_linguistics_ide.synthetic import CorpusGenerator, CorpusSpec
+from field_linguistics_ide.types_ import Line, MorphemesDictionary
+
+RESULTS_DIR = Path(__file__).resolve().parent / 'results'
+_DEFAULT_SPEC = CorpusSpec()
+
+
+def measure(function: Callable[[], None], repeat: int,
+            setup: Optional[Callable[[], None]] = None) -> Dict[str, float]:
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - started)
+    return {'min': min(timings), 'median': statistics.median(timings),
+            'max': max(timings)}
+
+
+class Benchmarks:
+    def __init__(self, spec: CorpusSpec, directory: Path, repeat: int):
+        self.spec = spec
+        self.directory = directory
+        self.repeat = repeat
+        generator = CorpusGenerator(spec)
+        self.json_path = directory / 'corpus.json'
+        self.csv_path = directory / 'corpus.csv'
+        CorpusGenerator(spec).write_json(self.json_path)
+        CorpusGenerator(spec).write_csv(self.csv_path)
+        self.project = Project(directory / 'project')
+        self.document = generator.document(self.project.dictionary, 'document')
+        self.project.documents.append(self.document)
+        self.project.save()
+        self.document_path = self.project.document_path(self.document)
+        self.dictionary_json = self.project.dictionary_path.read_text()
+        self.lexicon = generator.stems + generator.affixes
+
+    def json_loader(self):
+        JsonLoader(self.json_path)
+
+    def csv_loader(self):
+        CSVLoader(self.csv_path).load()
+
+    def dictionary_add(self):
+        dictionary = MorphemesDictionary()
+        for morpheme in self.lexicon:
+            dictionary.add(morpheme)
+
+    def dictionary_find(self):
+        dictionary = self.project.dictionary
+        for morpheme in self.lexicon:
+            dictionary.find(morpheme)
+
+    def dictionary_load_json(self):
+        MorphemesDictionary().load_json(self.dictionary_json)
+
+    def dictionary_save(self):
+        self.project.dictionary.save(self.directory / 'dictionary.json')
+
+    def document_add(self):
+        document = load_document(self.document_path)
+        for _ in range(100):
+            document.add_line(Line.new(document))
+
+    def document_pop(self):
+        document = load_document(self.document_path)
+        for morpheme_id in list(document.morphemes)[-100:]:
+            document.pop_morpheme(morpheme_id)
+        for line_id in list(document.lines)[-100:]:
+            document.pop_line(line_id)
+
+    def document_update(self):
+        document = load_document(self.document_path)
+        for dict_id in list(self.project.dictionary)[:20]:
+            for _ in document.update_morphemes(dict_id, 'gloss', 'updated'):
+                pass
+        for line_id in document.lines:
+            document.update_translation(line_id, 'updated')
+
+    def load_document(self):
+        load_document(self.document_path)
+
+    def project_save(self):
+        self.project.save()
+
+    def run(self, names: List[str]) -> Dict[str, Dict[str, float]]:
+        results = {}
+        for name in names:
+            results[name] = measure(getattr(self, name), self.repeat)
+            print('  {:<22} {:10.2f} ms'.format(name, results[name]['median'] * 1000),
+                  file=sys.stderr)
+        return results
+
+
+BENCHMARKS = [
+    'json_loader', 'csv_loader',
+    'dictionary_add', 'dictionary_find', 'dictionary_load_json', 'dictionary_save',
+    'document_add', 'document_pop', 'document_update',
+    'load_document', 'project_save',
+]
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='Run benchmarks over synthetic corpora')
+    parser.add_argument('--lines', type=int, nargs='+', default=[100, 1000],
+                        help='corpus sizes to measure, one run per size')
+    parser.add_argument('--tokens-per-line', type=int, default=_DEFAULT_SPEC.tokens_per_line)
+    parser.add_argument('--morphemes-per-token', type=int,
+                        default=_DEFAULT_SPEC.morphemes_per_token)
+    parser.add_argument('--lexicon-size', type=int, default=_DEFAULT_SPEC.lexicon_size)
+    parser.add_argument('--glossed-ratio', type=float, default=_DEFAULT_SPEC.glossed_ratio)
+    parser.add_argument('--zipf-exponent', type=float, default=_DEFAULT_SPEC.zipf_exponent)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--only', nargs='+', choices=BENCHMARKS, default=BENCHMARKS)
+    parser.add_argument('--output', type=Path)
+    args = parser.parse_args(argv)
+
+    runs = []
+    for lines in args.lines:
+        spec = CorpusSpec(lines=lines,
+                          tokens_per_line=args.tokens_per_line,
+                          morphemes_per_token=args.morphemes_per_token,
+                          lexicon_size=args.lexicon_size,
+                          glossed_ratio=args.glossed_ratio,
+                          zipf_exponent=args.zipf_exponent)
+        print('{} lines:'.format(lines), file=sys.stderr)
+        with tempfile.TemporaryDirectory() as directory:
+            benchmarks = Benchmarks(spec, Path(directory), args.repeat)
+            runs.append({'spec': spec._asdict(),
+                         'morphemes': len(benchmarks.document.morphemes),
+                         'results': benchmarks.run(args.only)})
+
+    created = datetime.now()
+    output = args.output or RESULTS_DIR / '{}.json'.format(
+        created.strftime('%Y%m%d-%H%M%S'))
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({
+        'created': created.isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'runs': runs,
+    }, indent=4))
+    print('Results written to {}'.format(output), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
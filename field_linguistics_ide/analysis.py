@@ -0,0 +1,191 @@
+from array import array
+from typing import Dict, Hashable, Iterable, List, NamedTuple, Optional, Tuple
+from field_linguistics_ide.types_ import Document, MorphemesDictionary
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class EncodedCorpus(NamedTuple):
+    # one element per linked morpheme, in corpus order
+    codes: 'np.ndarray'
+    gloss_codes: 'np.ndarray'
+    tokens: 'np.ndarray'
+    positions: 'np.ndarray'
+    positions_from_end: 'np.ndarray'
+    # code -> dict_id and gloss code -> gloss
+    dict_ids: 'np.ndarray'
+    glosses: List[str]
+
+
+class CooccurrenceCounts(NamedTuple):
+    first: 'np.ndarray'
+    second: 'np.ndarray'
+    counts: 'np.ndarray'
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError('Corpus analysis needs numpy, '
+                          'install it with pip install FieldLinguisticsIde[analysis]')
+
+
+def _to_numpy(values: array) -> 'np.ndarray':
+    return np.frombuffer(values, dtype=np.int64) if values else np.zeros(0, np.int64)
+
+
+def encode(documents: Iterable[Document],
+           dictionary: MorphemesDictionary) -> EncodedCorpus:
+    # the only python loop: every later computation works on these arrays
+    _require_numpy()
+    dict_ids = sorted(dictionary)
+    codes_by_dict_id = {dict_id: code for code, dict_id in enumerate(dict_ids)}
+    gloss_codes_by_gloss: Dict[str, int] = {}
+    codes, gloss_codes = array('q'), array('q')
+    tokens, positions, positions_from_end = array('q'), array('q'), array('q')
+    token_number = 0
+    for document in documents:
+        for line in document.data:
+            for token in line.tokens:
+                length = len(token.morphemes)
+                for position, morpheme in enumerate(token.morphemes):
+                    code = codes_by_dict_id.get(morpheme.dict_id)
+                    if code is None:
+                        continue
+                    gloss = dictionary[morpheme.dict_id].gloss or ''
+                    gloss_code = gloss_codes_by_gloss.setdefault(
+                        gloss, len(gloss_codes_by_gloss))
+                    codes.append(code)
+                    gloss_codes.append(gloss_code)
+                    tokens.append(token_number)
+                    positions.append(position)
+                    positions_from_end.append(length - position - 1)
+                token_number += 1
+    return EncodedCorpus(
+        _to_numpy(codes), _to_numpy(gloss_codes), _to_numpy(tokens),
+        _to_numpy(positions), _to_numpy(positions_from_end),
+        np.array(dict_ids, dtype=np.int64),
+        list(gloss_codes_by_gloss),
+    )
+
+
+def bigram_counts(codes: 'np.ndarray', tokens: 'np.ndarray',
+                  positions: 'np.ndarray') -> CooccurrenceCounts:
+    # adjacent morphemes of the same token, counted sparsely so that
+    # lexicons of any size fit into memory; unlinked morphemes are not
+    # encoded, so neighbours in the arrays are only adjacent if their
+    # positions in the token follow each other
+    adjacent = (tokens[1:] == tokens[:-1]) & (positions[1:] == positions[:-1] + 1)
+    first = codes[:-1][adjacent]
+    second = codes[1:][adjacent]
+    size = int(codes.max()) + 1 if codes.size else 1
+    keys, counts = np.unique(first * size + second, return_counts=True)
+    return CooccurrenceCounts(keys // size, keys % size, counts)
+
+
+def dense_matrix(bigrams: CooccurrenceCounts, size: int) -> 'np.ndarray':
+    matrix = np.zeros((size, size), dtype=np.int64)
+    matrix[bigrams.first, bigrams.second] = bigrams.counts
+    return matrix
+
+
+def slot_distribution(codes: 'np.ndarray', positions: 'np.ndarray',
+                      size: int) -> 'np.ndarray':
+    # rows are codes, columns are slots within a token
+    slots = int(positions.max()) + 1 if positions.size else 1
+    counts = np.bincount(codes * slots + positions, minlength=size * slots)
+    return counts.reshape(size, slots)
+
+
+def pmi(bigrams: CooccurrenceCounts, size: int) -> 'np.ndarray':
+    total = bigrams.counts.sum()
+    first_totals = np.bincount(bigrams.first, weights=bigrams.counts, minlength=size)
+    second_totals = np.bincount(bigrams.second, weights=bigrams.counts, minlength=size)
+    with np.errstate(divide='ignore'):
+        return np.log2(bigrams.counts * total
+                       / (first_totals[bigrams.first] * second_totals[bigrams.second]))
+
+
+class CorpusAnalysis:
+    def __init__(self, documents: List[Document], dictionary: MorphemesDictionary):
+        _require_numpy()
+        self.documents = documents
+        self.dictionary = dictionary
+        self._signature: Optional[Tuple] = None
+        self._cache: Dict[Hashable, object] = {}
+
+    def _current_signature(self) -> Tuple:
+        return (self.dictionary.version,
+                tuple((id(document), document.version) for document in self.documents))
+
+    def _cached(self, key: Hashable, compute):
+        # every Document and MorphemesDictionary mutation bumps a version,
+        # so a changed signature means the cached arrays are stale
+        signature = self._current_signature()
+        if signature != self._signature:
+            self._cache.clear()
+            self._signature = signature
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    def invalidate(self):
+        self._cache.clear()
+        self._signature = None
+
+    @property
+    def encoded(self) -> EncodedCorpus:
+        return self._cached('encoded', lambda: encode(self.documents, self.dictionary))
+
+    @property
+    def size(self) -> int:
+        return len(self.encoded.dict_ids)
+
+    @property
+    def gloss_size(self) -> int:
+        return len(self.encoded.glosses)
+
+    def morpheme_bigrams(self) -> CooccurrenceCounts:
+        return self._cached('morpheme_bigrams', lambda: bigram_counts(
+            self.encoded.codes, self.encoded.tokens, self.encoded.positions))
+
+    def gloss_bigrams(self) -> CooccurrenceCounts:
+        return self._cached('gloss_bigrams', lambda: bigram_counts(
+            self.encoded.gloss_codes, self.encoded.tokens, self.encoded.positions))
+
+    def morpheme_matrix(self) -> 'np.ndarray':
+        return self._cached('morpheme_matrix', lambda: dense_matrix(
+            self.morpheme_bigrams(), self.size))
+
+    def gloss_matrix(self) -> 'np.ndarray':
+        return self._cached('gloss_matrix', lambda: dense_matrix(
+            self.gloss_bigrams(), self.gloss_size))
+
+    def slots(self, from_end: bool = False) -> 'np.ndarray':
+        positions = self.encoded.positions_from_end if from_end else self.encoded.positions
+        return self._cached(('slots', from_end), lambda: slot_distribution(
+            self.encoded.codes, positions, self.size))
+
+    def morpheme_pmi(self) -> 'np.ndarray':
+        return self._cached('morpheme_pmi', lambda: pmi(self.morpheme_bigrams(), self.size))
+
+    def gloss_pmi(self) -> 'np.ndarray':
+        return self._cached('gloss_pmi', lambda: pmi(self.gloss_bigrams(), self.gloss_size))
+
+    def top_pmi(self, count: int = 20, min_count: int = 5,
+                glosses: bool = False) -> List[Tuple[str, str, int, float]]:
+        bigrams = self.gloss_bigrams() if glosses else self.morpheme_bigrams()
+        scores = self.gloss_pmi() if glosses else self.morpheme_pmi()
+        frequent = np.flatnonzero(bigrams.counts >= min_count)
+        best = frequent[np.argsort(scores[frequent])[::-1][:count]]
+        return [(self._label(bigrams.first[index], glosses),
+                 self._label(bigrams.second[index], glosses),
+                 int(bigrams.counts[index]), float(scores[index])) for index in best]
+
+    def _label(self, code: int, glosses: bool) -> str:
+        if glosses:
+            return self.encoded.glosses[code]
+        entry = self.dictionary[int(self.encoded.dict_ids[code])]
+        return '{}/{}'.format(entry.text, entry.gloss)
@@ -0,0 +1,150 @@
+import json
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Union
+from field_linguistics_ide.instrumentation import timed
+from field_linguistics_ide.project import DOCUMENTS_DIR, document_paths
+from field_linguistics_ide.types_ import Morpheme, MorphemesDictionary, save_json
+
+# Rules work on the morpheme dicts of the saved JSON, so a rewrite
+# never builds Document objects. They are plain tuples to be sent to
+# worker processes.
+
+
+class EditEntry(NamedTuple):
+    dict_id: int
+    field: str
+    value: Any
+
+    def apply(self, morpheme: dict) -> bool:
+        if morpheme.get('dict_id') != self.dict_id or morpheme.get(self.field) == self.value:
+            return False
+        morpheme[self.field] = self.value
+        return True
+
+
+class DeleteEntry(NamedTuple):
+    dict_id: int
+
+    def apply(self, morpheme: dict) -> bool:
+        # what the editor does with morphemes of a deleted entry
+        if morpheme.get('dict_id') != self.dict_id:
+            return False
+        morpheme['gloss'] = ''
+        morpheme['dict_id'] = None
+        return True
+
+
+class Replace(NamedTuple):
+    field: str
+    old: str
+    new: str
+    regex: bool = False
+
+    def apply(self, morpheme: dict) -> bool:
+        value = morpheme.get(self.field)
+        if not value:
+            return False
+        if self.regex:
+            new_value = re.sub(self.old, self.new, value)
+        else:
+            new_value = value.replace(self.old, self.new)
+        if new_value == value:
+            return False
+        morpheme[self.field] = new_value
+        return True
+
+
+class Relink(NamedTuple):
+    old_dict_id: int
+    new_dict_id: int
+    # of the new entry, so that relinked morphemes match it
+    text: str
+    gloss: str
+    is_stem: Optional[bool]
+
+    @classmethod
+    def to_entry(cls, old_dict_id: int, entry: Morpheme) -> 'Relink':
+        return cls(old_dict_id, entry.dict_id, entry.text, entry.gloss, entry.is_stem)
+
+    def apply(self, morpheme: dict) -> bool:
+        if morpheme.get('dict_id') != self.old_dict_id:
+            return False
+        new_values = {'text': self.text, 'gloss': self.gloss, 'is_stem': self.is_stem,
+                      'dict_id': self.new_dict_id}
+        if all(morpheme.get(field) == value for field, value in new_values.items()):
+            return False
+        morpheme.update(new_values)
+        return True
+
+
+Rule = Union[EditEntry, DeleteEntry, Replace, Relink]
+
+
+class FileReport(NamedTuple):
+    name: str
+    # morphemes changed by at least one rule
+    morphemes: int
+    changes: Dict[str, int]
+    error: Optional[str] = None
+
+
+def rewrite_file(path: Path, rules: Sequence[Rule], dry_run: bool = False) -> FileReport:
+    try:
+        document_json = json.loads(path.read_text())
+    except (OSError, ValueError) as error:
+        return FileReport(path.stem, 0, {}, str(error))
+    changes = Counter()
+    morphemes = 0
+    for line_dict in document_json:
+        for token_dict in line_dict['tokens']:
+            for morpheme_dict in token_dict['morphemes']:
+                changed = False
+                for rule in rules:
+                    if rule.apply(morpheme_dict):
+                        changes[type(rule).__name__] += 1
+                        changed = True
+                morphemes += changed
+    # unchanged files keep their modification time
+    if morphemes and not dry_run:
+        save_json(path, document_json)
+    return FileReport(path.stem, morphemes, dict(changes))
+
+
+@timed('rewrite_documents')
+def rewrite_documents(paths: Sequence[Path], rules: Iterable[Rule],
+                      dry_run: bool = False,
+                      workers: Optional[int] = None) -> Iterator[FileReport]:
+    # one file per task: memory is bounded by the largest document
+    # times the number of workers, not by the project
+    rules = tuple(rules)
+    if not rules or not paths:
+        return
+    work = partial(rewrite_file, rules=rules, dry_run=dry_run)
+    if workers == 1 or len(paths) == 1:
+        yield from map(work, paths)
+        return
+    with ProcessPoolExecutor(workers) as executor:
+        yield from executor.map(work, paths)
+
+
+def rewrite_project(project_path: Path, rules: Iterable[Rule], dry_run: bool = False,
+                    workers: Optional[int] = None) -> Iterator[FileReport]:
+    return rewrite_documents(document_paths(project_path / DOCUMENTS_DIR), rules,
+                             dry_run, workers)
+
+
+def apply_to_dictionary(dictionary: MorphemesDictionary, rules: Iterable[Rule]) -> List[Rule]:
+    # entry edits and deletions also change the dictionary itself
+    applied = []
+    for rule in rules:
+        if isinstance(rule, EditEntry) and rule.dict_id in dictionary:
+            dictionary.edit(rule.dict_id, rule.field, rule.value)
+            applied.append(rule)
+        elif isinstance(rule, DeleteEntry) and rule.dict_id in dictionary:
+            dictionary.pop(rule.dict_id)
+            applied.append(rule)
+    return applied
@@ -0,0 +1,496 @@
+import argparse
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+# subcommands import what they need themselves to keep startup fast
+
+
+def _open_project(path: Path, with_documents: bool = True):
+    from field_linguistics_ide.project import Project
+    return Project.load(path, with_documents=with_documents)
+
+
+def import_command(args: argparse.Namespace) -> int:
+    from field_linguistics_ide.project import DOCUMENTS_DIR, Project, free_document_name, \
+        safe_document_name
+    if (args.project / DOCUMENTS_DIR).is_dir():
+        project = _open_project(args.project, with_documents=False)
+    else:
+        project = Project(args.project)
+    taken = {path.stem for path in project.document_paths()} \
+        if project.documents_dir.is_dir() else set()
+    for path in args.files:
+        file_format = args.format or path.suffix[1:].lower()
+        if file_format == 'json':
+            from field_linguistics_ide.loaders.json_loader import JsonLoader
+            loader = JsonLoader(path)
+        elif file_format == 'csv':
+            from field_linguistics_ide.loaders.csv_loader import CSVLoader
+            loader = CSVLoader(path)
+            loader.load()
+        elif file_format == 'flextext':
+            from field_linguistics_ide.loaders.flextext_loader import FlexTextLoader
+            # glosses go straight into the project dictionary,
+            # documents are saved one by one as they are parsed
+            loader = FlexTextLoader(path, project.dictionary, taken_names=taken)
+            for document in loader.iter_documents():
+                project.save_document(document)
+                print('{}: {}: {} lines'.format(path, document.name, len(document.data)))
+            continue
+        else:
+            print('{}: unknown format {!r}'.format(path, file_format), file=sys.stderr)
+            return 1
+        # an existing document of the same name is kept, not overwritten
+        loader.document.name = free_document_name(safe_document_name(path.stem), taken)
+        project.import_document(loader.document, loader.morphemes_dictionary)
+        project.save_document(loader.document)
+        project.documents.remove(loader.document)
+        print('{}: {}: {} lines'.format(path, loader.document.name, len(loader.document.data)))
+    project.save_dictionary()
+    return 0
+
+
+def export_command(args: argparse.Namespace) -> int:
+    from field_linguistics_ide.exporters import EXPORTERS, EXTENSIONS
+    from field_linguistics_ide.project import load_document
+    project = _open_project(args.project, with_documents=False)
+    args.output.mkdir(parents=True, exist_ok=True)
+    for path in project.document_paths():
+        if args.documents and path.stem not in args.documents:
+            continue
+        document = load_document(path)
+        EXPORTERS[args.format](document).save(
+            args.output / '{}.{}'.format(path.stem, EXTENSIONS[args.format]))
+    return 0
+
+
+def gloss_command(args: argparse.Namespace) -> int:
+    from field_linguistics_ide.glossing import gloss_document, suggest_glosses
+    project = _open_project(args.project, with_documents=False)
+    fuzzy_index = None
+    if args.fuzzy is not None:
+        from field_linguistics_ide.fuzzy import FuzzyIndex
+        fuzzy_index = FuzzyIndex(project.dictionary, args.fuzzy)
+    for document in project.iter_documents():
+        glossed = gloss_document(document, project.dictionary)
+        if glossed and not args.dry_run:
+            project.save_document(document)
+        print('{}: {} morphemes glossed'.format(document.name, glossed))
+        if fuzzy_index is None:
+            continue
+        for morpheme, suggestions in suggest_glosses(document, fuzzy_index, args.limit):
+            print('  {}: {}'.format(morpheme.text, ', '.join(
+                '{}/{}'.format(project.dictionary[suggestion.dict_id].text,
+                               project.dictionary[suggestion.dict_id].gloss)
+                for suggestion in suggestions)))
+    return 0
+
+
+def stats_command(args: argparse.Namespace) -> int:
+    project = _open_project(args.project, with_documents=False)
+    totals = {'documents': 0, 'lines': 0, 'tokens': 0,
+              'morphemes': 0, 'glossed': 0}
+    for document in project.iter_documents():
+        totals['documents'] += 1
+        totals['lines'] += len(document.lines)
+        totals['tokens'] += len(document.tokens)
+        totals['morphemes'] += len(document.morphemes)
+        totals['glossed'] += sum(1 for morpheme in document.morphemes.values()
+                                 if morpheme.gloss)
+    totals['dictionary entries'] = len(project.dictionary)
+    for key, value in totals.items():
+        print('{}: {}'.format(key, value))
+    return 0
+
+
+def validate_command(args: argparse.Namespace) -> int:
+    from field_linguistics_ide.validation import check_dictionary, check_document
+    project = _open_project(args.project, with_documents=False)
+    problems = list(check_dictionary(project.dictionary))
+    for document in project.iter_documents():
+        problems.extend(check_document(document, project.dictionary))
+    if args.json:
+        import json
+        json.dump([problem._asdict() for problem in problems], sys.stdout,
+                  ensure_ascii=False, indent=2)
+        print()
+    else:
+        for problem in problems:
+            print('{}: {}: {}'.format(problem.document or 'dictionary',
+                                      problem.kind, problem.message))
+    return 1 if problems else 0
+
+
+def memory_command(args: argparse.Namespace) -> int:
+    from field_linguistics_ide.memory import MemoryRow, dictionary_rows, format_report, \
+        over_budget, traced
+    if args.project is not None:
+        from field_linguistics_ide.project import load_document
+        project = _open_project(args.project, with_documents=False)
+        dictionary = project.dictionary
+        load = [lambda path=path: load_document(path)
+                for path in project.document_paths()]
+    else:
+        from field_linguistics_ide.synthetic import CorpusGenerator, CorpusSpec
+        from field_linguistics_ide.types_ import MorphemesDictionary
+        generator = CorpusGenerator(CorpusSpec(lines=args.lines))
+        dictionary = MorphemesDictionary()
+        load = [lambda index=index: generator.document(
+            dictionary, 'document{}'.format(index)) for index in range(args.documents)]
+    rows = []
+    documents = []
+    for load_one in load:
+        document, allocated = traced(load_one)
+        documents.append(document)
+        objects = len(document.lines) + len(document.tokens) + len(document.morphemes)
+        rows.append(MemoryRow(document.name, 'data model', objects, allocated))
+    if args.widgets:
+        import os
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+        from field_linguistics_ide.user_interface.memory_report import measure_widgets
+        rows.extend(measure_widgets(documents))
+    rows.extend(dictionary_rows(dictionary))
+    print(format_report(rows))
+    if args.budget is None:
+        return 0
+    exceeded = over_budget(rows, args.budget * 1024)
+    for scope in exceeded:
+        print('{} is over the budget of {} KiB'.format(scope, args.budget))
+    return 1 if exceeded else 0
+
+
+def merge_command(args: argparse.Namespace) -> int:
+    from field_linguistics_ide.merge import merge_projects
+    report = merge_projects(args.base, args.other, args.output, dry_run=args.dry_run)
+    print('dictionary: {} entries matched, {} added'.format(report.matched, report.added))
+    for name, new_name in report.documents.items():
+        if name != new_name:
+            print('document {} renamed to {}'.format(name, new_name))
+    for conflict in report.conflicts:
+        print('conflict: {}/{}: {}'.format(conflict.text, conflict.gloss, conflict.message))
+    return 0
+
+
+def freeze_command(args: argparse.Namespace) -> int:
+    from field_linguistics_ide.frozen_corpus import freeze
+    project = _open_project(args.project, with_documents=False)
+    freeze(project.iter_documents(), project.dictionary, args.output)
+    return 0
+
+
+def analyse_command(args: argparse.Namespace) -> int:
+    from field_linguistics_ide.analysis import CorpusAnalysis
+    project = _open_project(args.project)
+    analysis = CorpusAnalysis(project.documents, project.dictionary)
+    for first, second, count, score in analysis.top_pmi(
+            args.top, args.min_count, glosses=args.glosses):
+        print('{}\t{}\t{}\t{:.3f}'.format(first, second, count, score))
+    return 0
+
+
+def search_command(args: argparse.Namespace) -> int:
+    from field_linguistics_ide.search import TranslationIndex
+    project = _open_project(args.project)
+    index = TranslationIndex()
+    index.add_documents(project.documents)
+    for hit in index.search(' '.join(args.query), args.limit):
+        print('{:.3f}\t{}\t{}\t{}'.format(hit.score, hit.document.name,
+                                          hit.line_id, hit.translation))
+    return 0
+
+
+def similar_command(args: argparse.Namespace) -> int:
+    from field_linguistics_ide.translation_memory import TranslationMemory, copy_analysis, \
+        is_glossed, line_text
+    project = _open_project(args.project)
+    documents = [document for document in project.documents if document.name == args.document]
+    if not documents:
+        print('No document named {}'.format(args.document), file=sys.stderr)
+        return 1
+    document = documents[0]
+    memory = TranslationMemory()
+    memory.add_documents(project.documents)
+    copied = 0
+    for line in list(document.data):
+        if is_glossed(line):
+            continue
+        matches = memory.similar_lines(document, line.id_, 1, args.threshold)
+        if not matches:
+            continue
+        match = matches[0]
+        source = match.document.lines[match.line_id]
+        print('{}\t{:.2f}\t{}:{}\t{}'.format(line.id_, match.similarity, match.document.name,
+                                            match.line_id, line_text(source)))
+        if args.apply:
+            copied += len(copy_analysis(document, line, source))
+    if copied:
+        project.save_document(document)
+        print('{} tokens analysed'.format(copied))
+    return 0
+
+
+def _entry_value(field: str, value: str):
+    if field == 'is_stem':
+        return {'true': True, 'false': False}.get(value.lower())
+    return value
+
+
+def rewrite_command(args: argparse.Namespace) -> int:
+    from field_linguistics_ide.batch_rewrite import DeleteEntry, EditEntry, Relink, Replace, \
+        apply_to_dictionary, rewrite_project
+    project = _open_project(args.project, with_documents=False)
+    rules = [EditEntry(int(dict_id), field, _entry_value(field, value))
+             for dict_id, field, value in args.edit]
+    rules.extend(DeleteEntry(dict_id) for dict_id in args.delete)
+    rules.extend(Replace(field, old, new, args.regex) for field, old, new in args.replace)
+    for old_dict_id, new_dict_id in args.relink:
+        entry = project.dictionary.get(new_dict_id)
+        if entry is None:
+            print('No dictionary entry {}'.format(new_dict_id), file=sys.stderr)
+            return 1
+        rules.append(Relink.to_entry(old_dict_id, entry))
+    if not rules:
+        print('Nothing to rewrite', file=sys.stderr)
+        return 1
+    totals = {'documents': 0, 'changed documents': 0, 'morphemes': 0}
+    failed = False
+    for report in rewrite_project(args.project, rules, args.dry_run, args.workers):
+        totals['documents'] += 1
+        if report.error is not None:
+            print('{}: {}'.format(report.name, report.error), file=sys.stderr)
+            failed = True
+            continue
+        if report.morphemes:
+            totals['changed documents'] += 1
+            totals['morphemes'] += report.morphemes
+            print('{}: {} morphemes ({})'.format(
+                report.name, report.morphemes,
+                ', '.join('{} {}'.format(kind, count)
+                          for kind, count in sorted(report.changes.items()))))
+    if not args.dry_run:
+        if apply_to_dictionary(project.dictionary, rules):
+            project.save_dictionary()
+    for key, value in totals.items():
+        print('{}: {}'.format(key, value))
+    return 1 if failed else 0
+
+
+def _print_diff(diff):
+    for prefix, paths in (('A', diff.added), ('D', diff.removed), ('M', diff.changed)):
+        for path in paths:
+            print('{} {}'.format(prefix, path))
+
+
+def snapshot_command(args: argparse.Namespace) -> int:
+    import time
+    from field_linguistics_ide.versioning import SnapshotStore
+    store = SnapshotStore(args.project)
+    if args.action == 'create':
+        snapshot = store.create(args.message)
+        print(snapshot.id_)
+    elif args.action == 'list':
+        for snapshot in store.list():
+            print('{}\t{}\t{} files\t{}'.format(
+                snapshot.id_, time.strftime('%Y-%m-%d %H:%M:%S',
+                                            time.localtime(snapshot.created)),
+                len(snapshot.files), snapshot.message))
+    elif args.action == 'diff':
+        _print_diff(store.diff(args.snapshot, args.other))
+    else:
+        # the current state can always be restored in turn
+        print('Current state saved as {}'.format(store.create('before restore').id_))
+        _print_diff(store.restore(args.snapshot))
+    return 0
+
+
+def settings_command(args: argparse.Namespace) -> int:
+    from field_linguistics_ide.normalization import get_profile
+    project = _open_project(args.project, with_documents=False)
+    settings = project.settings
+    if args.normalization is not None:
+        try:
+            get_profile(args.normalization)
+        except ValueError as error:
+            print(error, file=sys.stderr)
+            return 1
+        settings = settings._replace(normalization=args.normalization)
+        project.set_settings(settings)
+    for key, value in settings._asdict().items():
+        print('{}: {}'.format(key, value))
+    # entries the profile makes equal are left to the linguist to merge
+    duplicates = sum(1 for dict_id, entry in project.dictionary.items()
+                     if project.dictionary.find(entry) != dict_id)
+    print('duplicate entries: {}'.format(duplicates))
+    return 0
+
+
+def serve_command(args: argparse.Namespace) -> int:
+    import asyncio
+    from field_linguistics_ide.server.index import CorpusIndex
+    from field_linguistics_ide.server.server import CorpusServer
+    server = CorpusServer(CorpusIndex(args.project), args.host, args.port)
+
+    async def serve():
+        await server.start()
+        print('Serving {} on http://{}:{}'.format(args.project, server.host, server.port))
+        await server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='field-linguistics')
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.required = True
+
+    import_parser = subparsers.add_parser('import', help='import texts into a project')
+    import_parser.add_argument('project', type=Path)
+    import_parser.add_argument('files', type=Path, nargs='+')
+    import_parser.add_argument('--format', choices=['json', 'csv', 'flextext'])
+    import_parser.set_defaults(func=import_command)
+
+    export_parser = subparsers.add_parser('export', help='export project documents')
+    export_parser.add_argument('project', type=Path)
+    export_parser.add_argument('output', type=Path)
+    export_parser.add_argument('--document', dest='documents', action='append')
+    export_parser.add_argument('--format', default='json',
+                               choices=['json', 'text', 'gb4e', 'expex', 'html'])
+    export_parser.set_defaults(func=export_command)
+
+    gloss_parser = subparsers.add_parser('gloss', help='gloss morphemes from the dictionary')
+    gloss_parser.add_argument('project', type=Path)
+    gloss_parser.add_argument('--dry-run', action='store_true')
+    gloss_parser.add_argument('--fuzzy', type=int, nargs='?', const=1, metavar='DISTANCE',
+                              help='list dictionary entries within DISTANCE edits '
+                                   'of forms not in the dictionary')
+    gloss_parser.add_argument('--limit', type=int, default=5,
+                              help='suggestions per morpheme')
+    gloss_parser.set_defaults(func=gloss_command)
+
+    stats_parser = subparsers.add_parser('stats', help='print project statistics')
+    stats_parser.add_argument('project', type=Path)
+    stats_parser.set_defaults(func=stats_command)
+
+    validate_parser = subparsers.add_parser('validate', help='check dictionary links')
+    validate_parser.add_argument('project', type=Path)
+    validate_parser.add_argument('--json', action='store_true',
+                                 help='print the problems as a JSON list')
+    validate_parser.set_defaults(func=validate_command)
+
+    merge_parser = subparsers.add_parser('merge', help='merge another project into a project')
+    merge_parser.add_argument('base', type=Path)
+    merge_parser.add_argument('other', type=Path)
+    merge_parser.add_argument('--output', type=Path,
+                              help='write the merged project here instead of into base')
+    merge_parser.add_argument('--dry-run', action='store_true')
+    merge_parser.set_defaults(func=merge_command)
+
+    freeze_parser = subparsers.add_parser(
+        'freeze', help='write a read-only memory-mappable snapshot of a project')
+    freeze_parser.add_argument('project', type=Path)
+    freeze_parser.add_argument('output', type=Path)
+    freeze_parser.set_defaults(func=freeze_command)
+
+    analyse_parser = subparsers.add_parser(
+        'analyse', help='print morpheme or gloss bigrams with the highest PMI')
+    analyse_parser.add_argument('project', type=Path)
+    analyse_parser.add_argument('--top', type=int, default=20)
+    analyse_parser.add_argument('--min-count', type=int, default=5)
+    analyse_parser.add_argument('--glosses', action='store_true')
+    analyse_parser.set_defaults(func=analyse_command)
+
+    search_parser = subparsers.add_parser('search', help='ranked search over translations')
+    search_parser.add_argument('project', type=Path)
+    search_parser.add_argument('query', nargs='+')
+    search_parser.add_argument('--limit', type=int, default=20)
+    search_parser.set_defaults(func=search_command)
+
+    rewrite_parser = subparsers.add_parser(
+        'rewrite', help='apply dictionary edits and replacements to every document on disk')
+    rewrite_parser.add_argument('project', type=Path)
+    rewrite_parser.add_argument('--edit', nargs=3, action='append', default=[],
+                                metavar=('DICT_ID', 'FIELD', 'VALUE'),
+                                help='set a field of an entry and of its morphemes')
+    rewrite_parser.add_argument('--delete', type=int, action='append', default=[],
+                                metavar='DICT_ID',
+                                help='delete an entry and unlink its morphemes')
+    rewrite_parser.add_argument('--replace', nargs=3, action='append', default=[],
+                                metavar=('FIELD', 'OLD', 'NEW'),
+                                help='replace OLD with NEW in the text or gloss of morphemes')
+    rewrite_parser.add_argument('--regex', action='store_true',
+                                help='OLD of --replace is a regular expression')
+    rewrite_parser.add_argument('--relink', nargs=2, type=int, action='append', default=[],
+                                metavar=('OLD', 'NEW'),
+                                help='link morphemes of one entry to another')
+    rewrite_parser.add_argument('--workers', type=int, help='worker processes')
+    rewrite_parser.add_argument('--dry-run', action='store_true')
+    rewrite_parser.set_defaults(func=rewrite_command)
+
+    snapshot_parser = subparsers.add_parser(
+        'snapshot', help='create, list, compare and restore project snapshots')
+    snapshot_actions = snapshot_parser.add_subparsers(dest='action')
+    snapshot_actions.required = True
+    create_parser = snapshot_actions.add_parser('create')
+    create_parser.add_argument('project', type=Path)
+    create_parser.add_argument('-m', '--message', default='')
+    list_parser = snapshot_actions.add_parser('list')
+    list_parser.add_argument('project', type=Path)
+    diff_parser = snapshot_actions.add_parser(
+        'diff', help='compare two snapshots, or a snapshot and the project')
+    diff_parser.add_argument('project', type=Path)
+    diff_parser.add_argument('snapshot')
+    diff_parser.add_argument('other', nargs='?')
+    restore_parser = snapshot_actions.add_parser('restore')
+    restore_parser.add_argument('project', type=Path)
+    restore_parser.add_argument('snapshot')
+    snapshot_parser.set_defaults(func=snapshot_command)
+
+    similar_parser = subparsers.add_parser(
+        'similar', help='find glossed lines similar to the unglossed lines of a document')
+    similar_parser.add_argument('project', type=Path)
+    similar_parser.add_argument('document', help='document name')
+    similar_parser.add_argument('--threshold', type=float, default=0.5,
+                                help='lowest trigram Jaccard similarity')
+    similar_parser.add_argument('--apply', action='store_true',
+                                help='copy segmentation and glosses from the best match')
+    similar_parser.set_defaults(func=similar_command)
+
+    settings_parser = subparsers.add_parser(
+        'settings', help='show or change the settings of a project')
+    settings_parser.add_argument('project', type=Path)
+    settings_parser.add_argument('--normalization',
+                                 help='how dictionary forms are matched: nfc, nfd, '
+                                      'nfc-casefold, base or base-casefold')
+    settings_parser.set_defaults(func=settings_command)
+
+    serve_parser = subparsers.add_parser(
+        'serve', help='answer read-only JSON queries about a project over HTTP')
+    serve_parser.add_argument('project', type=Path)
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=8765)
+    serve_parser.set_defaults(func=serve_command)
+
+    memory_parser = subparsers.add_parser(
+        'memory', help='report memory use of a project or of a generated corpus')
+    memory_parser.add_argument('--project', type=Path)
+    memory_parser.add_argument('--lines', type=int, default=1000)
+    memory_parser.add_argument('--documents', type=int, default=1)
+    memory_parser.add_argument('--widgets', action='store_true',
+                               help='also build the document widgets (needs PySide2)')
+    memory_parser.add_argument('--budget', type=int, help='per-document budget, KiB')
+    memory_parser.set_defaults(func=memory_command)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,144 @@
+import json
+from dataclasses import asdict, is_dataclass
+from typing import Any, Callable, Dict, Iterator, List, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Writes the same text as json.dumps(data, ensure_ascii=False, indent=4)
+# without going through the pure Python encoder json falls back to for
+# indented output. Compact output uses orjson when it is installed.
+INDENT = 4
+_string = json.encoder.encode_basestring
+
+
+class JSONEncoderWithDataClasses(json.JSONEncoder):
+    def default(self, o):
+        if is_dataclass(o):
+            return asdict(o)
+        return super().default(o)
+
+
+def _float(value: float) -> str:
+    return json.dumps(value)
+
+
+_SCALARS: Dict[type, Callable[[Any], str]] = {
+    str: _string,
+    int: int.__repr__,
+    float: _float,
+    bool: lambda value: 'true' if value else 'false',
+    type(None): lambda _: 'null',
+}
+
+
+def _key(key: Any) -> str:
+    # the same conversions json.dumps applies to keys
+    if isinstance(key, str):
+        return _string(key)
+    if key is True:
+        return '"true"'
+    if key is False:
+        return '"false"'
+    if key is None:
+        return '"null"'
+    if isinstance(key, (int, float)):
+        return _string(_SCALARS[float if isinstance(key, float) else int](key))
+    raise TypeError('keys must be str, int, float, bool or None, not {}'.format(
+        type(key).__name__))
+
+
+def _encode(value: Any, level: int, out: List[str]):
+    # appends to one list instead of nesting generators
+    encode_scalar = _SCALARS.get(type(value))
+    if encode_scalar is not None:
+        out.append(encode_scalar(value))
+        return
+    if isinstance(value, dict):
+        if not value:
+            out.append('{}')
+            return
+        separator = '{\n' + ' ' * (INDENT * (level + 1))
+        for key, item in value.items():
+            out.append(separator + _key(key) + ': ')
+            _encode(item, level + 1, out)
+            separator = ',\n' + ' ' * (INDENT * (level + 1))
+        out.append('\n' + ' ' * (INDENT * level) + '}')
+    elif isinstance(value, (list, tuple)):
+        if not value:
+            out.append('[]')
+            return
+        separator = '[\n' + ' ' * (INDENT * (level + 1))
+        for item in value:
+            out.append(separator)
+            _encode(item, level + 1, out)
+            separator = ',\n' + ' ' * (INDENT * (level + 1))
+        out.append('\n' + ' ' * (INDENT * level) + ']')
+    elif is_dataclass(value):
+        _encode(asdict(value), level, out)
+    elif isinstance(value, (str, int, float)):
+        # subclasses such as enums
+        out.append(_SCALARS[float if isinstance(value, float)
+                            else int if isinstance(value, int) else str](value))
+    else:
+        raise TypeError('Object of type {} is not JSON serializable'.format(
+            type(value).__name__))
+
+
+def _iter_indented(data: Any) -> Iterator[str]:
+    # one chunk per line of a document or entry of a dictionary
+    if isinstance(data, dict) and data:
+        items = ((_key(key) + ': ', item) for key, item in data.items())
+        brackets = '{}'
+    elif isinstance(data, (list, tuple)) and data:
+        items = (('', item) for item in data)
+        brackets = '[]'
+    else:
+        out = []
+        _encode(data, 0, out)
+        yield ''.join(out)
+        return
+    separator = brackets[0] + '\n' + ' ' * INDENT
+    for prefix, item in items:
+        out = [separator, prefix]
+        _encode(item, 1, out)
+        yield ''.join(out)
+        separator = ',\n' + ' ' * INDENT
+    yield '\n' + brackets[1]
+
+
+def _dumps_compact(data: Any) -> str:
+    # orjson differs from json only for floats (NaN is null, 1e300 has no
+    # plus sign), which documents and dictionaries do not contain
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode('utf-8')
+        except TypeError:
+            # lone surrogates and types orjson does not know
+            pass
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':'),
+                      cls=JSONEncoderWithDataClasses)
+
+
+def iter_json(data: Any, compact: bool = False) -> Iterator[str]:
+    if compact:
+        yield _dumps_compact(data)
+    else:
+        yield from _iter_indented(data)
+
+
+def dumps(data: Any, compact: bool = False) -> str:
+    return ''.join(iter_json(data, compact))
+
+
+def loads(text: Union[str, bytes]) -> Any:
+    if orjson is not None:
+        try:
+            return orjson.loads(text)
+        except ValueError:
+            # json is more lenient, e.g. with escaped lone surrogates,
+            # and gives the error for really broken files
+            pass
+    return json.loads(text)
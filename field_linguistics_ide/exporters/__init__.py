@@ -0,0 +1,14 @@
+from functools import partial
+from field_linguistics_ide.exporters.html_exporter import HtmlExporter
+from field_linguistics_ide.exporters.json_exporter import JsonExporter
+from field_linguistics_ide.exporters.latex_exporter import LatexExporter
+from field_linguistics_ide.exporters.text_exporter import TextExporter
+
+EXPORTERS = {
+    'json': JsonExporter,
+    'text': TextExporter,
+    'gb4e': partial(LatexExporter, package='gb4e'),
+    'expex': partial(LatexExporter, package='expex'),
+    'html': HtmlExporter,
+}
+EXTENSIONS = {'json': 'json', 'text': 'txt', 'gb4e': 'tex', 'expex': 'tex', 'html': 'html'}
@@ -0,0 +1,64 @@
+import io
+import unicodedata
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, List, Optional, TextIO, Tuple
+from field_linguistics_ide.types_ import Document, Line, Token
+
+MISSING_GLOSS = '?'
+
+
+@lru_cache(maxsize=65536)
+def display_width(text: str) -> int:
+    width = 0
+    for char in text:
+        if unicodedata.combining(char):
+            continue
+        width += 2 if unicodedata.east_asian_width(char) in 'WF' else 1
+    return width
+
+
+@lru_cache(maxsize=65536)
+def _aligned_column(text: str, gloss: str) -> Tuple[str, str, int]:
+    return text, gloss, max(display_width(text), display_width(gloss))
+
+
+def token_column(token: Token) -> Tuple[str, str, int]:
+    # the same word forms recur all over a corpus, so columns are cached
+    # by their text and gloss rather than by token
+    text = '-'.join(morpheme.text for morpheme in token.morphemes)
+    gloss = '-'.join(morpheme.gloss or MISSING_GLOSS for morpheme in token.morphemes)
+    return _aligned_column(text, gloss)
+
+
+class InterlinearExporter:
+    def __init__(self, document: Document):
+        self.document = document
+
+    def write_header(self, file: TextIO):
+        pass
+
+    def write_line(self, file: TextIO, line: Line, number: int):
+        raise NotImplementedError
+
+    def write_footer(self, file: TextIO):
+        pass
+
+    def write(self, file: TextIO, lines: Optional[Iterable[Line]] = None):
+        self.write_header(file)
+        for number, line in enumerate(self.document.data if lines is None else lines, 1):
+            self.write_line(file, line, number)
+        self.write_footer(file)
+
+    def save(self, path: Path):
+        with path.open('w', encoding='utf-8') as file:
+            self.write(file)
+
+    def to_string(self, lines: Optional[Iterable[Line]] = None) -> str:
+        buffer = io.StringIO()
+        self.write(buffer, lines)
+        return buffer.getvalue()
+
+    @staticmethod
+    def columns(line: Line) -> List[Tuple[str, str, int]]:
+        return [token_column(token) for token in line.tokens]
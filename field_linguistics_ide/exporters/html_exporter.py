@@ -0,0 +1,40 @@
+from html import escape
+from typing import TextIO
+from field_linguistics_ide.exporters.common import InterlinearExporter
+from field_linguistics_ide.types_ import Document, Line
+
+_STYLE = '''<style>
+.example { margin-bottom: 1em; }
+.example .number { float: left; margin-right: 1em; }
+.example .word { display: inline-block; margin-right: 1em; vertical-align: top; }
+.example .word span { display: block; }
+.example .translation { clear: both; }
+</style>
+'''
+
+
+class HtmlExporter(InterlinearExporter):
+    def __init__(self, document: Document, standalone: bool = True):
+        super().__init__(document)
+        self.standalone = standalone
+
+    def write_header(self, file: TextIO):
+        if self.standalone:
+            file.write('<!DOCTYPE html>\n<html>\n<head>\n<meta charset="utf-8">\n')
+            file.write('<title>{}</title>\n'.format(escape(self.document.name)))
+            file.write(_STYLE)
+            file.write('</head>\n<body>\n')
+
+    def write_line(self, file: TextIO, line: Line, number: int):
+        file.write('<div class="example" id="line{}">'.format(line.id_))
+        file.write('<span class="number">({})</span>'.format(number))
+        for text, gloss, _ in self.columns(line):
+            file.write('<div class="word"><span class="text">{}</span>'
+                       '<span class="gloss">{}</span></div>'.format(
+                           escape(text), escape(gloss)))
+        file.write('<div class="translation">&lsquo;{}&rsquo;</div></div>\n'.format(
+            escape(line.translation)))
+
+    def write_footer(self, file: TextIO):
+        if self.standalone:
+            file.write('</body>\n</html>\n')
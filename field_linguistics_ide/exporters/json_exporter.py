@@ -0,0 +1,27 @@
+import json
+from typing import TextIO
+from field_linguistics_ide.exporters.common import InterlinearExporter
+from field_linguistics_ide.types_ import Line
+
+
+# writes documents in the shape read by JsonLoader
+class JsonExporter(InterlinearExporter):
+    @staticmethod
+    def raw_line(line: Line) -> dict:
+        text = []
+        glosses = []
+        for token in line.tokens:
+            text.append('-'.join(morpheme.text for morpheme in token.morphemes))
+            glosses.append('-'.join(morpheme.gloss or ''
+                                    for morpheme in token.morphemes))
+        return {'text': text, 'glosses': glosses, 'translation': line.translation}
+
+    def write_header(self, file: TextIO):
+        file.write('[')
+
+    def write_line(self, file: TextIO, line: Line, number: int):
+        file.write(',\n' if number > 1 else '\n')
+        file.write(json.dumps(self.raw_line(line), ensure_ascii=False))
+
+    def write_footer(self, file: TextIO):
+        file.write('\n]\n')
@@ -0,0 +1,59 @@
+import re
+from typing import TextIO
+from field_linguistics_ide.exporters.common import InterlinearExporter
+from field_linguistics_ide.types_ import Document, Line
+
+_SPECIAL_CHARACTERS = {
+    '\\': r'\textbackslash{}', '{': r'\{', '}': r'\}', '$': r'\$', '&': r'\&',
+    '#': r'\#', '^': r'\^{}', '_': r'\_', '~': r'\~{}', '%': r'\%',
+}
+_SPECIAL_RE = re.compile('|'.join(map(re.escape, _SPECIAL_CHARACTERS)))
+_GRAMMATICAL_GLOSS_RE = re.compile(r'\b([A-Z][A-Z0-9]*)\b')
+
+
+def escape(text: str) -> str:
+    return _SPECIAL_RE.sub(lambda match: _SPECIAL_CHARACTERS[match.group()], text)
+
+
+class LatexExporter(InterlinearExporter):
+    PACKAGES = ('gb4e', 'expex')
+
+    def __init__(self, document: Document, package: str = 'gb4e',
+                 small_caps: bool = True):
+        if package not in self.PACKAGES:
+            raise ValueError('Unknown LaTeX package {}'.format(package))
+        super().__init__(document)
+        self.package = package
+        self.small_caps = small_caps
+
+    def _gloss(self, gloss: str) -> str:
+        gloss = escape(gloss)
+        if self.small_caps:
+            gloss = _GRAMMATICAL_GLOSS_RE.sub(
+                lambda match: r'\textsc{' + match.group(1).lower() + '}', gloss)
+        return gloss
+
+    def _words(self, line: Line):
+        columns = self.columns(line)
+        text = ' '.join(escape(text) or '{}' for text, _, _ in columns)
+        gloss = ' '.join(self._gloss(gloss) or '{}' for _, gloss, _ in columns)
+        return text, gloss
+
+    def write_header(self, file: TextIO):
+        if self.package == 'gb4e':
+            file.write('\\begin{exe}\n')
+
+    def write_line(self, file: TextIO, line: Line, number: int):
+        text, gloss = self._words(line)
+        translation = escape(line.translation)
+        if self.package == 'gb4e':
+            file.write('\\ex\n\\gll {}\\\\\n{}\\\\\n'.format(text, gloss))
+            file.write("\\trans `{}'\n\n".format(translation))
+        else:
+            file.write('\\ex\n\\begingl\n')
+            file.write('\\gla {}//\n\\glb {}//\n'.format(text, gloss))
+            file.write("\\glft `{}'//\n\\endgl\n\\xe\n\n".format(translation))
+
+    def write_footer(self, file: TextIO):
+        if self.package == 'gb4e':
+            file.write('\\end{exe}\n')
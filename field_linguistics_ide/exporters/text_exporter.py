@@ -0,0 +1,22 @@
+from typing import TextIO
+from field_linguistics_ide.exporters.common import InterlinearExporter, display_width
+from field_linguistics_ide.types_ import Line
+
+
+def _pad(text: str, width: int) -> str:
+    return text + ' ' * (width - display_width(text))
+
+
+# Leipzig-style examples with word-aligned glosses
+class TextExporter(InterlinearExporter):
+    SEPARATOR = '  '
+
+    def write_line(self, file: TextIO, line: Line, number: int):
+        label = '({})'.format(number)
+        indent = ' ' * (len(label) + 1)
+        columns = self.columns(line)
+        text = self.SEPARATOR.join(_pad(text, width) for text, _, width in columns)
+        gloss = self.SEPARATOR.join(_pad(gloss, width) for _, gloss, width in columns)
+        file.write('{} {}\n'.format(label, text.rstrip()))
+        file.write('{}{}\n'.format(indent, gloss.rstrip()))
+        file.write("{}'{}'\n\n".format(indent, line.translation))
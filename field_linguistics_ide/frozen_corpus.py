@@ -0,0 +1,316 @@
+import mmap
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from field_linguistics_ide.types_ import Document, MorphemesDictionary
+
+# Layout: a header, a table of (offset, item count) pairs, then 8-byte
+# aligned sections. Every record type is stored as separate fixed-width
+# columns so that they can be mapped with memoryview.cast without copying.
+MAGIC = b'FLFC'
+FORMAT_VERSION = 1
+NONE_ID = -1
+NONE_STRING = 0xFFFFFFFF
+_HEADER = struct.Struct('<4sII')
+
+# section name, array typecode
+SECTIONS: List[Tuple[str, str]] = [
+    ('string_offsets', 'Q'),
+    ('string_data', 'B'),
+    ('entry_dict_id', 'q'), ('entry_text', 'I'), ('entry_gloss', 'I'), ('entry_is_stem', 'b'),
+    ('document_name', 'I'), ('document_first_line', 'I'), ('document_lines', 'I'),
+    ('line_id', 'q'), ('line_translation', 'I'), ('line_first_token', 'I'),
+    ('line_tokens', 'I'),
+    ('token_id', 'q'), ('token_dict_id', 'q'), ('token_first_morpheme', 'I'),
+    ('token_morphemes', 'I'),
+    ('morpheme_id', 'q'), ('morpheme_text', 'I'), ('morpheme_gloss', 'I'),
+    ('morpheme_dict_id', 'q'), ('morpheme_is_stem', 'b'),
+]
+_TABLE_ENTRY = struct.Struct('<QQ')
+
+
+def _optional_id(value: Optional[int]) -> int:
+    return NONE_ID if value is None else value
+
+
+def _is_stem_code(value: Optional[bool]) -> int:
+    return -1 if value is None else int(value)
+
+
+class _StringTable:
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+
+    def __call__(self, text: Optional[str]) -> int:
+        if text is None:
+            return NONE_STRING
+        string_id = self.ids.get(text)
+        if string_id is None:
+            string_id = self.ids[text] = len(self.ids)
+        return string_id
+
+    def sorted(self) -> Tuple[List[str], array]:
+        # ids are handed out in insertion order and renumbered
+        # in sorted order so that readers can binary search strings
+        strings = sorted(self.ids)
+        new_ids = array('I', bytes(4 * len(strings)))
+        for new_id, text in enumerate(strings):
+            new_ids[self.ids[text]] = new_id
+        return strings, new_ids
+
+
+def freeze(documents: Iterable[Document], dictionary: MorphemesDictionary, path: Path):
+    if sys.byteorder != 'little':
+        raise NotImplementedError('Frozen corpora are only written on little-endian hosts')
+    columns = {name: array(typecode) for name, typecode in SECTIONS}
+    strings = _StringTable()
+    for dict_id, entry in sorted(dictionary.items()):
+        columns['entry_dict_id'].append(dict_id)
+        columns['entry_text'].append(strings(entry.text))
+        columns['entry_gloss'].append(strings(entry.gloss))
+        columns['entry_is_stem'].append(_is_stem_code(entry.is_stem))
+    for document in documents:
+        columns['document_name'].append(strings(document.name))
+        columns['document_first_line'].append(len(columns['line_id']))
+        columns['document_lines'].append(len(document.data))
+        for line in document.data:
+            columns['line_id'].append(line.id_)
+            columns['line_translation'].append(strings(line.translation))
+            columns['line_first_token'].append(len(columns['token_id']))
+            columns['line_tokens'].append(len(line.tokens))
+            for token in line.tokens:
+                columns['token_id'].append(token.id_)
+                columns['token_dict_id'].append(_optional_id(token.dict_id))
+                columns['token_first_morpheme'].append(len(columns['morpheme_id']))
+                columns['token_morphemes'].append(len(token.morphemes))
+                for morpheme in token.morphemes:
+                    columns['morpheme_id'].append(morpheme.id_)
+                    columns['morpheme_text'].append(strings(morpheme.text))
+                    columns['morpheme_gloss'].append(strings(morpheme.gloss))
+                    columns['morpheme_dict_id'].append(_optional_id(morpheme.dict_id))
+                    columns['morpheme_is_stem'].append(_is_stem_code(morpheme.is_stem))
+
+    sorted_strings, new_ids = strings.sorted()
+    for name in ('entry_text', 'entry_gloss', 'document_name', 'line_translation',
+                 'morpheme_text', 'morpheme_gloss'):
+        columns[name] = array('I', (NONE_STRING if string_id == NONE_STRING
+                                    else new_ids[string_id]
+                                    for string_id in columns[name]))
+    offset = 0
+    encoded = bytearray()
+    for text in sorted_strings:
+        columns['string_offsets'].append(offset)
+        data = text.encode('utf-8')
+        encoded += data
+        offset += len(data)
+    columns['string_offsets'].append(offset)
+    columns['string_data'] = array('B', encoded)
+
+    tmp_path = path.with_name(path.name + '.tmp')
+    with tmp_path.open('wb') as file:
+        file.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(SECTIONS)))
+        offset = _HEADER.size + _TABLE_ENTRY.size * len(SECTIONS)
+        for name, _ in SECTIONS:
+            offset += -offset % 8
+            file.write(_TABLE_ENTRY.pack(offset, len(columns[name])))
+            offset += columns[name].itemsize * len(columns[name])
+        for name, _ in SECTIONS:
+            file.write(bytes(-file.tell() % 8))
+            columns[name].tofile(file)
+    tmp_path.replace(path)
+
+
+class FrozenMorpheme:
+    __slots__ = ('_corpus', '_index')
+
+    def __init__(self, corpus: 'FrozenCorpus', index: int):
+        self._corpus = corpus
+        self._index = index
+
+    @property
+    def text(self) -> str:
+        return self._corpus.string(self._corpus.morpheme_text[self._index])
+
+    @property
+    def gloss(self) -> Optional[str]:
+        return self._corpus.string(self._corpus.morpheme_gloss[self._index])
+
+    @property
+    def id_(self) -> int:
+        return self._corpus.morpheme_id[self._index]
+
+    @property
+    def dict_id(self) -> Optional[int]:
+        dict_id = self._corpus.morpheme_dict_id[self._index]
+        return None if dict_id == NONE_ID else dict_id
+
+    @property
+    def is_stem(self) -> Optional[bool]:
+        code = self._corpus.morpheme_is_stem[self._index]
+        return None if code == -1 else bool(code)
+
+    def __repr__(self):
+        return 'FrozenMorpheme(text={!r}, gloss={!r})'.format(self.text, self.gloss)
+
+
+class _Slice(Sequence):
+    __slots__ = ('_corpus', '_start', '_length', '_item')
+
+    def __init__(self, corpus: 'FrozenCorpus', start: int, length: int, item: type):
+        self._corpus = corpus
+        self._start = start
+        self._length = length
+        self._item = item
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, position: int):
+        if isinstance(position, slice):
+            return [self[index] for index in range(*position.indices(self._length))]
+        if position < 0:
+            position += self._length
+        if not 0 <= position < self._length:
+            raise IndexError(position)
+        return self._item(self._corpus, self._start + position)
+
+
+class FrozenToken:
+    __slots__ = ('_corpus', '_index')
+
+    def __init__(self, corpus: 'FrozenCorpus', index: int):
+        self._corpus = corpus
+        self._index = index
+
+    @property
+    def morphemes(self) -> Sequence[FrozenMorpheme]:
+        return _Slice(self._corpus, self._corpus.token_first_morpheme[self._index],
+                      self._corpus.token_morphemes[self._index], FrozenMorpheme)
+
+    @property
+    def id_(self) -> int:
+        return self._corpus.token_id[self._index]
+
+    @property
+    def dict_id(self) -> Optional[int]:
+        dict_id = self._corpus.token_dict_id[self._index]
+        return None if dict_id == NONE_ID else dict_id
+
+
+class FrozenLine:
+    __slots__ = ('_corpus', '_index')
+
+    def __init__(self, corpus: 'FrozenCorpus', index: int):
+        self._corpus = corpus
+        self._index = index
+
+    @property
+    def tokens(self) -> Sequence[FrozenToken]:
+        return _Slice(self._corpus, self._corpus.line_first_token[self._index],
+                      self._corpus.line_tokens[self._index], FrozenToken)
+
+    @property
+    def translation(self) -> str:
+        return self._corpus.string(self._corpus.line_translation[self._index])
+
+    @property
+    def id_(self) -> int:
+        return self._corpus.line_id[self._index]
+
+
+class FrozenDocument:
+    __slots__ = ('_corpus', '_index')
+
+    def __init__(self, corpus: 'FrozenCorpus', index: int):
+        self._corpus = corpus
+        self._index = index
+
+    @property
+    def name(self) -> str:
+        return self._corpus.string(self._corpus.document_name[self._index])
+
+    @property
+    def data(self) -> Sequence[FrozenLine]:
+        return _Slice(self._corpus, self._corpus.document_first_line[self._index],
+                      self._corpus.document_lines[self._index], FrozenLine)
+
+
+class FrozenCorpus:
+    def __init__(self, path: Path):
+        if sys.byteorder != 'little':
+            raise NotImplementedError('Frozen corpora are only read on little-endian hosts')
+        with path.open('rb') as file:
+            # the mapping stays valid after the file is closed
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buffer = memoryview(self._mmap)
+        magic, version, sections = _HEADER.unpack_from(self._buffer)
+        if magic != MAGIC or version != FORMAT_VERSION or sections != len(SECTIONS):
+            raise ValueError('{} is not a frozen corpus'.format(path))
+        for position, (name, typecode) in enumerate(SECTIONS):
+            offset, length = _TABLE_ENTRY.unpack_from(
+                self._buffer, _HEADER.size + position * _TABLE_ENTRY.size)
+            itemsize = array(typecode).itemsize
+            setattr(self, name,
+                    self._buffer[offset:offset + length * itemsize].cast(typecode))
+
+    def close(self):
+        for name, _ in SECTIONS:
+            getattr(self, name).release()
+        self._buffer.release()
+        self._mmap.close()
+
+    def __enter__(self) -> 'FrozenCorpus':
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def string(self, string_id: int) -> Optional[str]:
+        if string_id == NONE_STRING:
+            return None
+        start = self.string_offsets[string_id]
+        end = self.string_offsets[string_id + 1]
+        return str(self.string_data[start:end], 'utf-8')
+
+    def string_id(self, text: str) -> Optional[int]:
+        # strings are stored sorted, so lookups are a binary search
+        low, high = 0, len(self.string_offsets) - 1
+        while low < high:
+            middle = (low + high) // 2
+            if self.string(middle) < text:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(self.string_offsets) - 1 and self.string(low) == text:
+            return low
+        return None
+
+    @property
+    def documents(self) -> Sequence[FrozenDocument]:
+        return _Slice(self, 0, len(self.document_name), FrozenDocument)
+
+    def entry(self, dict_id: int) -> Optional[Tuple[str, Optional[str], Optional[bool]]]:
+        position = bisect_left(self.entry_dict_id, dict_id)
+        if position == len(self.entry_dict_id) or self.entry_dict_id[position] != dict_id:
+            return None
+        code = self.entry_is_stem[position]
+        return (self.string(self.entry_text[position]),
+                self.string(self.entry_gloss[position]),
+                None if code == -1 else bool(code))
+
+    def _morphemes_where(self, column: memoryview, value: int) -> Iterator[FrozenMorpheme]:
+        for index, item in enumerate(column):
+            if item == value:
+                yield FrozenMorpheme(self, index)
+
+    def morphemes_with_text(self, text: str) -> Iterator[FrozenMorpheme]:
+        string_id = self.string_id(text)
+        if string_id is None:
+            return iter(())
+        return self._morphemes_where(self.morpheme_text, string_id)
+
+    def morphemes_with_dict_id(self, dict_id: int) -> Iterator[FrozenMorpheme]:
+        return self._morphemes_where(self.morpheme_dict_id, dict_id)
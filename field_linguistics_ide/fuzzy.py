@@ -0,0 +1,141 @@
+from typing import Dict, List, NamedTuple, Optional, Set
+from field_linguistics_ide.instrumentation import timed
+from field_linguistics_ide.types_ import Morpheme, MorphemesDictionary
+
+# typos are mostly one character; two doubles the index size
+MAX_DISTANCE = 1
+
+
+class Suggestion(NamedTuple):
+    dict_id: int
+    distance: int
+
+
+def edit_distance(first: str, second: str, limit: int) -> int:
+    # optimal string alignment: an insertion, a deletion, a substitution
+    # or a swap of neighbours costs 1; anything above limit is limit + 1
+    if abs(len(first) - len(second)) > limit:
+        return limit + 1
+    before_previous: List[int] = []
+    previous = list(range(len(second) + 1))
+    for i, first_char in enumerate(first, 1):
+        current = [i] + [0] * len(second)
+        for j, second_char in enumerate(second, 1):
+            value = min(previous[j] + 1, current[j - 1] + 1,
+                        previous[j - 1] + (first_char != second_char))
+            if i > 1 and j > 1 and first_char == second[j - 2] \
+                    and first[i - 2] == second_char:
+                value = min(value, before_previous[j - 2] + 1)
+            current[j] = value
+        if min(current) > limit:
+            return limit + 1
+        before_previous, previous = previous, current
+    return min(previous[-1], limit + 1)
+
+
+def deletions(text: str, distance: int) -> Set[str]:
+    variants = {text}
+    frontier = {text}
+    for _ in range(distance):
+        frontier = {word[:i] + word[i + 1:] for word in frontier for i in range(len(word))}
+        variants |= frontier
+    return variants
+
+
+# SymSpell: every dictionary form is indexed under the strings left by
+# deleting up to max_distance of its characters. Two forms within that
+# edit distance share one of these strings, so a lookup generates the
+# deletions of the query and only compares the forms found under them,
+# however large the dictionary. Forms are normalized with the
+# dictionary's profile. The index is built on the first lookup and then
+# follows the dictionary's add, edit and pop.
+class FuzzyIndex:
+    def __init__(self, dictionary: MorphemesDictionary, max_distance: int = MAX_DISTANCE):
+        self.dictionary = dictionary
+        self.max_distance = max_distance
+        # deletion variant to the normalized forms it comes from
+        self._variants: Dict[str, List[str]] = {}
+        # normalized form to dict_ids
+        self._entries: Dict[str, Set[int]] = {}
+        self._keys: Dict[int, str] = {}
+        self._built_for = None
+        dictionary.subscribe(self._dictionary_changed)
+
+    def close(self):
+        self.dictionary.unsubscribe(self._dictionary_changed)
+
+    def _dictionary_changed(self, event: str, dict_id: Optional[int]):
+        if self._built_for is None:
+            return
+        if event == 'load':
+            self._built_for = None
+            return
+        entry = self.dictionary.get(dict_id)
+        key = self.dictionary.key(entry.text) if entry is not None else None
+        if key == self._keys.get(dict_id):
+            # a gloss or the class changed
+            return
+        self._remove(dict_id)
+        if key is not None:
+            self._add(dict_id, key)
+
+    def _add(self, dict_id: int, key: str):
+        self._keys[dict_id] = key
+        dict_ids = self._entries.get(key)
+        if dict_ids is not None:
+            dict_ids.add(dict_id)
+            return
+        self._entries[key] = {dict_id}
+        for variant in deletions(key, self.max_distance):
+            self._variants.setdefault(variant, []).append(key)
+
+    def _remove(self, dict_id: int):
+        key = self._keys.pop(dict_id, None)
+        if key is None:
+            return
+        dict_ids = self._entries[key]
+        dict_ids.discard(dict_id)
+        if dict_ids:
+            return
+        del self._entries[key]
+        for variant in deletions(key, self.max_distance):
+            keys = self._variants[variant]
+            keys.remove(key)
+            if not keys:
+                del self._variants[variant]
+
+    @timed('FuzzyIndex.build')
+    def _build(self):
+        self._variants = {}
+        self._entries = {}
+        self._keys = {}
+        for dict_id, entry in self.dictionary.items():
+            self._add(dict_id, self.dictionary.key(entry.text))
+        self._built_for = self.dictionary.profile
+
+    @timed('FuzzyIndex.lookup')
+    def lookup(self, text: str, max_distance: Optional[int] = None,
+               limit: Optional[int] = None) -> List[Suggestion]:
+        # nearest first, exact matches of the normalized form included
+        if self._built_for != self.dictionary.profile:
+            self._build()
+        max_distance = self.max_distance if max_distance is None \
+            else min(max_distance, self.max_distance)
+        key = self.dictionary.key(text)
+        candidates = set()
+        for variant in deletions(key, max_distance):
+            candidates.update(self._variants.get(variant, ()))
+        suggestions = []
+        for candidate in candidates:
+            distance = edit_distance(key, candidate, max_distance)
+            if distance <= max_distance:
+                suggestions.extend(Suggestion(dict_id, distance)
+                                   for dict_id in self._entries[candidate])
+        suggestions.sort(key=lambda suggestion: (suggestion.distance, suggestion.dict_id))
+        return suggestions[:limit] if limit is not None else suggestions
+
+    def suggest(self, morpheme: Morpheme, limit: Optional[int] = None) -> List[Suggestion]:
+        # the entry the morpheme is linked to is not a suggestion
+        return [suggestion for suggestion in self.lookup(morpheme.text)
+                if suggestion.dict_id != morpheme.dict_id][:limit]
+
@@ -0,0 +1,43 @@
+from collections import defaultdict
+from typing import Dict, Iterator, List, Optional, Tuple
+from field_linguistics_ide.fuzzy import FuzzyIndex, Suggestion
+from field_linguistics_ide.types_ import Document, Morpheme, MorphemesDictionary
+
+
+def index_by_text(dictionary: MorphemesDictionary) -> Dict[str, List[int]]:
+    index = defaultdict(list)
+    for dict_id, entry in dictionary.items():
+        index[entry.text].append(dict_id)
+    return index
+
+
+def gloss_document(document: Document, dictionary: MorphemesDictionary) -> int:
+    # only unambiguous forms are glossed, homonyms are left to the linguist;
+    # forms are matched with the dictionary's normalization profile
+    glossed = 0
+    for morpheme in document.morphemes.values():
+        if morpheme.gloss or morpheme.dict_id is not None:
+            continue
+        dict_ids = dictionary.find_text(morpheme.text)
+        if not dict_ids or len(dict_ids) > 1:
+            continue
+        entry = dictionary[dict_ids[0]]
+        document.update_morpheme(morpheme.id_, 'gloss', entry.gloss)
+        document.update_morpheme(morpheme.id_, 'is_stem', entry.is_stem)
+        document.update_morpheme(morpheme.id_, 'dict_id', entry.dict_id)
+        glossed += 1
+    return glossed
+
+
+def suggest_glosses(document: Document, index: FuzzyIndex, limit: Optional[int] = None
+                    ) -> Iterator[Tuple[Morpheme, List[Suggestion]]]:
+    # for morphemes whose form is not in the dictionary at all, typos
+    # and spelling variants are only suggested, never glossed
+    for morpheme in document.morphemes.values():
+        if morpheme.gloss or morpheme.dict_id is not None or not morpheme.text:
+            continue
+        if index.dictionary.find_text(morpheme.text):
+            continue
+        suggestions = index.lookup(morpheme.text, limit=limit)
+        if suggestions:
+            yield morpheme, suggestions
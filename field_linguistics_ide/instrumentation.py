@@ -0,0 +1,153 @@
+import json
+import os
+import threading
+import time
+from collections import Counter, deque
+from functools import wraps
+from pathlib import Path
+from typing import Callable, Deque, Dict, List, NamedTuple, Optional
+
+ENVIRONMENT_VARIABLE = 'FIELD_LINGUISTICS_TRACE'
+MAX_EVENTS = 200000
+
+
+class SpanEvent(NamedTuple):
+    name: str
+    start: float
+    duration: float
+    thread_id: int
+
+
+class SpanStatistics(NamedTuple):
+    calls: int
+    total: float
+    max: float
+
+
+class _Recorder:
+    def __init__(self):
+        self.enabled = bool(os.environ.get(ENVIRONMENT_VARIABLE))
+        self.origin = time.perf_counter()
+        self.events: Deque[SpanEvent] = deque(maxlen=MAX_EVENTS)
+        self.counters = Counter()
+        self.statistics: Dict[str, SpanStatistics] = {}
+        self.lock = threading.Lock()
+
+    def record(self, name: str, start: float, duration: float):
+        with self.lock:
+            self.events.append(SpanEvent(name, start, duration, threading.get_ident()))
+            calls, total, maximum = self.statistics.get(name, (0, 0.0, 0.0))
+            self.statistics[name] = SpanStatistics(
+                calls + 1, total + duration, max(maximum, duration))
+
+
+_recorder = _Recorder()
+
+
+class _Span:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *_):
+        _recorder.record(self.name, self.start, time.perf_counter() - self.start)
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def enable():
+    _recorder.enabled = True
+
+
+def disable():
+    _recorder.enabled = False
+
+
+def is_enabled() -> bool:
+    return _recorder.enabled
+
+
+def reset():
+    with _recorder.lock:
+        _recorder.events.clear()
+        _recorder.counters.clear()
+        _recorder.statistics.clear()
+        _recorder.origin = time.perf_counter()
+
+
+def span(name: str):
+    if not _recorder.enabled:
+        return _NULL_SPAN
+    return _Span(name)
+
+
+def timed(name: Optional[str] = None) -> Callable[[Callable], Callable]:
+    def decorator(function: Callable) -> Callable:
+        span_name = name or function.__qualname__
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            # a single attribute check is all that is paid while disabled
+            if not _recorder.enabled:
+                return function(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                _recorder.record(span_name, start, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def count(name: str, value: int = 1):
+    if _recorder.enabled:
+        _recorder.counters[name] += value
+
+
+def counters() -> Dict[str, int]:
+    with _recorder.lock:
+        return dict(_recorder.counters)
+
+
+def statistics() -> Dict[str, SpanStatistics]:
+    with _recorder.lock:
+        return dict(_recorder.statistics)
+
+
+def chrome_trace() -> dict:
+    with _recorder.lock:
+        events: List[dict] = [{
+            'name': event.name,
+            'ph': 'X',
+            'ts': (event.start - _recorder.origin) * 1e6,
+            'dur': event.duration * 1e6,
+            'pid': os.getpid(),
+            'tid': event.thread_id,
+        } for event in _recorder.events]
+        now = (time.perf_counter() - _recorder.origin) * 1e6
+        events.extend({
+            'name': name, 'ph': 'C', 'ts': now, 'pid': os.getpid(),
+            'args': {'value': value},
+        } for name, value in _recorder.counters.items())
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+
+def save_chrome_trace(path: Path):
+    path.write_text(json.dumps(chrome_trace()))
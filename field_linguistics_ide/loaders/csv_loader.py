@@ -1,18 +1,20 @@
-from typing import Iterable
+from typing import Iterable, Optional
 from collections import namedtuple
 from pathlib import Path
 
-from field_linguistics_ide.types_ import Document, Line, Morpheme, Token
-from field_linguistics_ide.user_interface.widgets.dictionary_area import DictionaryModel
+from field_linguistics_ide.types_ import Document, Line, Morpheme, MorphemesDictionary, Token
 
 _CsvLine = namedtuple('_CsvLine', ['text', 'glosses', 'translation'])
 
 
 class CSVLoader:
-    def __init__(self, path: Path, morphemes_model: DictionaryModel):
+    def __init__(self, path: Path,
+                 morphemes_dictionary: Optional[MorphemesDictionary] = None):
         self.csv = path.read_text()
         self.document: Document = Document()
-        self.morphemes_model = morphemes_model
+        if morphemes_dictionary is None:
+            morphemes_dictionary = MorphemesDictionary()
+        self.morphemes_dictionary = morphemes_dictionary
 
     def _preprocess(self) -> Iterable[_CsvLine]:
         result_line = _CsvLine([], [], [])
@@ -42,7 +44,7 @@ class CSVLoader:
                     new_morpheme = Morpheme(morpheme, gloss)
                     if gloss:
                         new_morpheme.is_stem = not gloss.isupper()
-                        self.morphemes_model.edit_or_add(new_morpheme)
+                        new_morpheme.dict_id = self.morphemes_dictionary.add(new_morpheme)
                     self.document.add_morpheme_to_token(new_morpheme, new_token)
                 self.document.add_token_to_line(new_token, line)
             self.document.add_line(line)
@@ -0,0 +1,127 @@
+from pathlib import Path
+from typing import Iterator, List, Optional, Set
+from xml.etree import ElementTree
+from field_linguistics_ide.project import free_document_name, safe_document_name
+from field_linguistics_ide.types_ import Document, Line, Morpheme, MorphemesDictionary, Token
+
+STEM_TYPES = {'stem', 'root', 'bound stem', 'bound root', 'particle', 'phrase'}
+AFFIX_TYPES = {'prefix', 'suffix', 'infix', 'circumfix', 'simulfix', 'suprafix',
+               'clitic', 'enclitic', 'proclitic', 'prefixing interfix',
+               'suffixing interfix', 'infixing interfix'}
+_MORPHEME_BOUNDARIES = '-=~'
+
+
+def _is_stem(morph_type: Optional[str]) -> Optional[bool]:
+    if morph_type in STEM_TYPES:
+        return True
+    if morph_type in AFFIX_TYPES:
+        return False
+    return None
+
+
+# reads FieldWorks interlinear exports (.flextext) with iterparse,
+# so only one phrase at a time is kept as an element tree
+class FlexTextLoader:
+    def __init__(self, path: Path,
+                 morphemes_dictionary: Optional[MorphemesDictionary] = None,
+                 language: Optional[str] = None,
+                 taken_names: Optional[Set[str]] = None):
+        self.path = path
+        if morphemes_dictionary is None:
+            morphemes_dictionary = MorphemesDictionary()
+        self.morphemes_dictionary = morphemes_dictionary
+        # language of glosses and translations, the first one found if None
+        self.language = language
+        # names of the project's documents, texts get names not among them
+        self.taken_names = set() if taken_names is None else taken_names
+        self.documents: List[Document] = []
+
+    @property
+    def document(self) -> Document:
+        return self.documents[0]
+
+    def _item(self, element: ElementTree.Element, item_type: str,
+              language: bool = False) -> Optional[str]:
+        for item in element.findall('item'):
+            if item.get('type') != item_type:
+                continue
+            if language and self.language is not None \
+                    and item.get('lang') != self.language:
+                continue
+            return item.text or ''
+        return None
+
+    def _morphemes(self, word: ElementTree.Element) -> List[Morpheme]:
+        morphemes = []
+        for morph in word.iterfind('morphemes/morph'):
+            text = (self._item(morph, 'txt') or '').strip(_MORPHEME_BOUNDARIES)
+            gloss = self._item(morph, 'gls', language=True) or None
+            morphemes.append(Morpheme(text, gloss, is_stem=_is_stem(morph.get('type'))))
+        if not morphemes:
+            text = self._item(word, 'txt')
+            if text is not None:
+                morphemes.append(Morpheme(text, None))
+        return morphemes
+
+    def _line(self, phrase: ElementTree.Element, document: Document,
+              pending: List[Morpheme]) -> Line:
+        translation = self._item(phrase, 'gls', language=True)
+        if translation is None:
+            translation = self._item(phrase, 'ft', language=True) or ''
+        line = Line([], translation)
+        for word in phrase.iterfind('words/word'):
+            morphemes = self._morphemes(word)
+            if not morphemes:
+                # punctuation
+                continue
+            token = Token([])
+            for morpheme in morphemes:
+                if morpheme.gloss:
+                    pending.append(morpheme)
+                document.add_morpheme_to_token(morpheme, token)
+            document.add_token_to_line(token, line)
+        return line
+
+    def _link(self, pending: List[Morpheme]):
+        dict_ids = self.morphemes_dictionary.add_many(pending)
+        for morpheme, dict_id in zip(pending, dict_ids):
+            morpheme.dict_id = dict_id
+        pending.clear()
+
+    def iter_documents(self) -> Iterator[Document]:
+        stack: List[ElementTree.Element] = []
+        document: Optional[Document] = None
+        pending: List[Morpheme] = []
+        texts = 0
+        for event, element in ElementTree.iterparse(str(self.path),
+                                                    events=('start', 'end')):
+            if event == 'start':
+                stack.append(element)
+                if element.tag == 'interlinear-text':
+                    texts += 1
+                    document = Document()
+                    document.name = '{}-{}'.format(self.path.stem, texts)
+                continue
+            stack.pop()
+            parent = stack[-1] if stack else None
+            if element.tag == 'item' and element.get('type') == 'title' \
+                    and parent is not None and parent.tag == 'interlinear-text' \
+                    and element.text:
+                document.name = safe_document_name(element.text)
+            elif element.tag == 'phrase' and document is not None:
+                document.add_line(self._line(element, document, pending))
+                element.clear()
+                parent.remove(element)
+            elif element.tag == 'paragraph' and parent is not None:
+                parent.remove(element)
+            elif element.tag == 'interlinear-text':
+                self._link(pending)
+                if parent is not None:
+                    parent.remove(element)
+                # each document is saved to the file its name gives
+                document.name = free_document_name(document.name, self.taken_names)
+                yield document
+                document = None
+
+    def load(self):
+        self.documents.extend(self.iter_documents())
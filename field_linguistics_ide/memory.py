@@ -0,0 +1,95 @@
+import os
+import sys
+import tracemalloc
+from dataclasses import fields, is_dataclass
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Tuple
+from field_linguistics_ide.sequence import IndexedSequence
+from field_linguistics_ide.types_ import Document, MorphemesDictionary
+
+
+class MemoryRow(NamedTuple):
+    scope: str
+    layer: str
+    objects: int
+    bytes: int
+
+
+def deep_sizeof(obj: Any) -> int:
+    seen = set()
+    size = 0
+    stack = [obj]
+    while stack:
+        item = stack.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        size += sys.getsizeof(item)
+        if isinstance(item, dict):
+            stack.extend(item.keys())
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple, set, frozenset, IndexedSequence)):
+            stack.extend(item)
+        elif is_dataclass(item):
+            if hasattr(item, '__dict__'):
+                size += sys.getsizeof(item.__dict__)
+            stack.extend(getattr(item, field.name) for field in fields(item))
+    return size
+
+
+def rss_bytes() -> int:
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError):
+        import resource
+        # ru_maxrss is the peak, in kilobytes on Linux and in bytes on macOS
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss if sys.platform == 'darwin' else rss * 1024
+
+
+def traced(function: Callable[[], Any]) -> Tuple[Any, int]:
+    # python heap retained by whatever function builds
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = function()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        if started:
+            tracemalloc.stop()
+    return result, after - before
+
+
+def document_rows(document: Document) -> List[MemoryRow]:
+    objects = len(document.lines) + len(document.tokens) + len(document.morphemes)
+    registries = sum(sys.getsizeof(registry) for registry in
+                     (document.lines, document.tokens, document.morphemes))
+    return [MemoryRow(document.name, 'data model', objects,
+                      deep_sizeof(document.data) + registries)]
+
+
+def dictionary_rows(dictionary: MorphemesDictionary) -> List[MemoryRow]:
+    return [MemoryRow('dictionary', 'data model', len(dictionary),
+                      deep_sizeof(dictionary))]
+
+
+def scope_totals(rows: Iterable[MemoryRow]) -> Dict[str, int]:
+    totals = {}
+    for row in rows:
+        totals[row.scope] = totals.get(row.scope, 0) + row.bytes
+    return totals
+
+
+def over_budget(rows: Iterable[MemoryRow], budget: int) -> List[str]:
+    return [scope for scope, size in scope_totals(rows).items()
+            if scope != 'dictionary' and size > budget]
+
+
+def format_report(rows: Iterable[MemoryRow]) -> str:
+    lines = ['{:<24} {:<20} {:>10} {:>12}'.format('scope', 'layer', 'objects', 'KiB')]
+    for row in rows:
+        lines.append('{:<24} {:<20} {:>10} {:>12.1f}'.format(
+            row.scope[:24], row.layer, row.objects, row.bytes / 1024))
+    return '\n'.join(lines)
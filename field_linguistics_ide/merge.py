@@ -0,0 +1,109 @@
+import json
+import shutil
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+from field_linguistics_ide.normalization import canonical
+from field_linguistics_ide.project import DICTIONARY_FILE, DOCUMENTS_DIR, document_paths, \
+    free_document_name, load_dictionary, load_settings, save_settings
+from field_linguistics_ide.types_ import MorphemesDictionary, save_json
+
+
+class MergeConflict(NamedTuple):
+    text: str
+    gloss: Optional[str]
+    base_dict_id: Optional[int]
+    other_dict_id: int
+    message: str
+
+
+class MergeReport(NamedTuple):
+    id_map: Dict[int, int]
+    matched: int
+    added: int
+    conflicts: List[MergeConflict]
+    documents: Dict[str, str]
+
+
+def merge_dictionaries(base: MorphemesDictionary, other: MorphemesDictionary,
+                       ) -> Tuple[Dict[int, int], int, List[MergeConflict]]:
+    # hash join on (text, gloss) as base's profile compares them;
+    # unmatched entries get fresh ids in base
+    def join_key(entry) -> Tuple[str, Optional[str]]:
+        return base.key(entry.text), canonical(entry.gloss) if entry.gloss else entry.gloss
+
+    index: Dict[Tuple[str, Optional[str]], int] = {}
+    classes: Dict[str, Set[Optional[bool]]] = {}
+    for dict_id, entry in base.items():
+        key = join_key(entry)
+        index.setdefault(key, dict_id)
+        classes.setdefault(key[0], set()).add(entry.is_stem)
+    id_map = {}
+    matched = 0
+    conflicts = []
+    for other_id, entry in other.items():
+        key = join_key(entry)
+        base_id = index.get(key)
+        if base_id is not None:
+            matched += 1
+            id_map[other_id] = base_id
+            base_is_stem = base[base_id].is_stem
+            if None not in (base_is_stem, entry.is_stem) and base_is_stem != entry.is_stem:
+                conflicts.append(MergeConflict(
+                    entry.text, entry.gloss, base_id, other_id,
+                    'classified as {} in base and as {} in other'.format(
+                        'stem' if base_is_stem else 'affix',
+                        'stem' if entry.is_stem else 'affix')))
+            continue
+        known_classes = classes.get(key[0], set()) - {None}
+        if entry.is_stem is not None and known_classes \
+                and entry.is_stem not in known_classes:
+            conflicts.append(MergeConflict(
+                entry.text, entry.gloss, None, other_id,
+                'is {} in other but only {} in base'.format(
+                    'a stem' if entry.is_stem else 'an affix',
+                    'affixes' if entry.is_stem else 'stems')))
+        id_map[other_id] = index[key] = base._insert(entry)
+        classes.setdefault(key[0], set()).add(entry.is_stem)
+    return id_map, matched, conflicts
+
+
+def remap_document(source: Path, target: Path, id_map: Dict[int, int]):
+    # works on the raw JSON, no dataclasses are built
+    lines = json.loads(source.read_text())
+    for line in lines:
+        for token in line['tokens']:
+            for morpheme in token['morphemes']:
+                dict_id = morpheme.get('dict_id')
+                if dict_id is not None:
+                    morpheme['dict_id'] = id_map.get(dict_id)
+    save_json(target, lines)
+
+
+def merge_projects(base_dir: Path, other_dir: Path,
+                   output_dir: Optional[Path] = None,
+                   dry_run: bool = False) -> MergeReport:
+    # the merged project keeps base's settings
+    settings = load_settings(base_dir)
+    base = load_dictionary(base_dir / DICTIONARY_FILE, settings.profile)
+    other = load_dictionary(other_dir / DICTIONARY_FILE, settings.profile)
+    id_map, matched, conflicts = merge_dictionaries(base, other)
+    output_dir = output_dir or base_dir
+    output_documents = output_dir / DOCUMENTS_DIR
+    base_paths = document_paths(base_dir / DOCUMENTS_DIR)
+    taken = {path.stem for path in base_paths}
+    renames = {path.stem: free_document_name(path.stem, taken)
+               for path in document_paths(other_dir / DOCUMENTS_DIR)}
+    report = MergeReport(id_map, matched, len(other) - matched, conflicts, renames)
+    if dry_run:
+        return report
+    output_documents.mkdir(parents=True, exist_ok=True)
+    # the dictionary goes first so that no saved document links to a missing entry
+    base.save(output_dir / DICTIONARY_FILE)
+    if output_dir != base_dir:
+        save_settings(output_dir, settings)
+        for path in base_paths:
+            shutil.copyfile(str(path), str(output_documents / path.name))
+    for path in document_paths(other_dir / DOCUMENTS_DIR):
+        remap_document(path, output_documents / '{}.json'.format(renames[path.stem]),
+                       id_map)
+    return report
@@ -0,0 +1,50 @@
+import unicodedata
+from functools import lru_cache
+from typing import Dict, NamedTuple
+
+
+# How dictionary forms are compared. Canonical equivalence always holds,
+# so precomposed and combining diacritics never make two entries; the
+# folds are a choice of the project's orthography.
+class NormalizationProfile(NamedTuple):
+    # NFC or NFD, the form keys are kept in
+    form: str = 'NFC'
+    fold_diacritics: bool = False
+    fold_case: bool = False
+
+
+PROFILES: Dict[str, NormalizationProfile] = {
+    'nfc': NormalizationProfile('NFC'),
+    'nfd': NormalizationProfile('NFD'),
+    'nfc-casefold': NormalizationProfile('NFC', fold_case=True),
+    'base': NormalizationProfile('NFC', fold_diacritics=True),
+    'base-casefold': NormalizationProfile('NFC', fold_diacritics=True, fold_case=True),
+}
+DEFAULT_PROFILE = 'nfc'
+
+
+def get_profile(name: str) -> NormalizationProfile:
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ValueError('Unknown normalization profile {!r}, expected one of {}'.format(
+            name, ', '.join(PROFILES))) from None
+
+
+@lru_cache(maxsize=65536)
+def canonical(text: str) -> str:
+    if unicodedata.is_normalized('NFC', text):
+        return text
+    return unicodedata.normalize('NFC', text)
+
+
+@lru_cache(maxsize=65536)
+def normalize(text: str, profile: NormalizationProfile) -> str:
+    if profile.fold_diacritics:
+        text = ''.join(char for char in unicodedata.normalize('NFD', text)
+                       if not unicodedata.combining(char))
+    if profile.fold_case:
+        text = text.casefold()
+    if unicodedata.is_normalized(profile.form, text):
+        return text
+    return unicodedata.normalize(profile.form, text)
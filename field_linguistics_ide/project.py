@@ -0,0 +1,192 @@
+import gc
+import re
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, List, NamedTuple, Optional, Set
+from field_linguistics_ide import codec
+from field_linguistics_ide.instrumentation import timed
+from field_linguistics_ide.normalization import DEFAULT_PROFILE, NormalizationProfile, \
+    get_profile
+from field_linguistics_ide.types_ import Document, Line, Morpheme, MorphemesDictionary, \
+    Token, save_json
+
+DICTIONARY_FILE = 'dictionary.json'
+DOCUMENTS_DIR = 'documents'
+SETTINGS_FILE = 'settings.json'
+# not allowed in file names on some systems, or a path separator
+_UNSAFE_NAME_CHARACTERS = re.compile(r'[\x00-\x1f<>:"/\\|?*]')
+
+
+class ProjectSettings(NamedTuple):
+    # a name from normalization.PROFILES
+    normalization: str = DEFAULT_PROFILE
+
+    @property
+    def profile(self) -> NormalizationProfile:
+        return get_profile(self.normalization)
+
+
+def load_settings(project_path: Path) -> ProjectSettings:
+    # missing settings take their defaults, unknown ones are ignored
+    path = project_path / SETTINGS_FILE
+    if not path.exists():
+        return ProjectSettings()
+    settings_dict = codec.loads(path.read_bytes())
+    settings = ProjectSettings(**{key: value for key, value in settings_dict.items()
+                                  if key in ProjectSettings._fields})
+    # an unknown profile is an error now rather than at the first lookup
+    get_profile(settings.normalization)
+    return settings
+
+
+def save_settings(project_path: Path, settings: ProjectSettings):
+    project_path.mkdir(parents=True, exist_ok=True)
+    save_json(project_path / SETTINGS_FILE, settings._asdict())
+
+
+@contextmanager
+def _collection_paused():
+    # a document is thousands of new objects that all survive, the
+    # collector would walk them again and again while they are built
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+@timed('load_document')
+def load_document(path: Path) -> Document:
+    with _collection_paused():
+        return _load_document(path)
+
+
+def _load_document(path: Path) -> Document:
+    document = Document()
+    for line_dict in codec.loads(path.read_bytes()):
+        line = Line([], line_dict['translation'], line_dict.get('id_'))
+        for token_dict in line_dict['tokens']:
+            token = Token([], token_dict.get('id_'), token_dict.get('dict_id'))
+            for morpheme_dict in token_dict['morphemes']:
+                document.add_morpheme_to_token(
+                    Morpheme(morpheme_dict['text'], morpheme_dict['gloss'],
+                             morpheme_dict.get('id_'), morpheme_dict.get('dict_id'),
+                             morpheme_dict.get('is_stem')),
+                    token)
+            document.add_token_to_line(token, line)
+        document.add_line(line)
+    document.name = path.name[:-5]
+    return document
+
+
+def document_paths(documents_dir: Path) -> List[Path]:
+    return sorted(path for path in documents_dir.iterdir()
+                  if path.suffix == '.json')
+
+
+def safe_document_name(name: str) -> str:
+    # a document is saved as <name>.json, titles from other tools can be anything
+    name = _UNSAFE_NAME_CHARACTERS.sub('_', name).strip().strip('.').strip()
+    return name or 'untitled'
+
+
+def free_document_name(name: str, taken: Set[str]) -> str:
+    candidate = name
+    suffix = 2
+    while candidate in taken:
+        candidate = '{}-{}'.format(name, suffix)
+        suffix += 1
+    taken.add(candidate)
+    return candidate
+
+
+def load_documents(documents_dir: Path) -> Iterator[Document]:
+    for doc_path in document_paths(documents_dir):
+        yield load_document(doc_path)
+
+
+def load_dictionary(path: Path,
+                    profile: Optional[NormalizationProfile] = None) -> MorphemesDictionary:
+    dictionary = MorphemesDictionary() if profile is None else MorphemesDictionary(profile)
+    if path.exists():
+        dictionary.load_json(path.read_bytes())
+    return dictionary
+
+
+class Project:
+    def __init__(self, path: Path,
+                 dictionary: Optional[MorphemesDictionary] = None,
+                 settings: Optional[ProjectSettings] = None):
+        self.path = path
+        self.settings = settings if settings is not None else ProjectSettings()
+        self.dictionary = dictionary if dictionary is not None \
+            else MorphemesDictionary(self.settings.profile)
+        self.documents: List[Document] = []
+
+    @property
+    def dictionary_path(self) -> Path:
+        return self.path / DICTIONARY_FILE
+
+    @property
+    def documents_dir(self) -> Path:
+        return self.path / DOCUMENTS_DIR
+
+    @classmethod
+    def load(cls, path: Path, with_documents: bool = True) -> 'Project':
+        if not (path / DOCUMENTS_DIR).is_dir():
+            raise ValueError('No documents directory found')
+        settings = load_settings(path)
+        project = cls(path, load_dictionary(path / DICTIONARY_FILE, settings.profile),
+                      settings)
+        if with_documents:
+            project.documents.extend(load_documents(project.documents_dir))
+        return project
+
+    def document_paths(self) -> List[Path]:
+        return document_paths(self.documents_dir)
+
+    def iter_documents(self) -> Iterator[Document]:
+        # streams documents from disk without keeping them in the project
+        return load_documents(self.documents_dir)
+
+    def document_path(self, document: Document) -> Path:
+        return self.documents_dir / '{}.json'.format(document.name)
+
+    def import_document(self, document: Document,
+                        dictionary: MorphemesDictionary):
+        # loaders number their dictionary from zero,
+        # so their dict_ids have to be moved into the project dictionary
+        id_map = {}
+        for morpheme in document.morphemes.values():
+            if morpheme.dict_id is None:
+                continue
+            if morpheme.dict_id not in id_map:
+                entry = dictionary.get(morpheme.dict_id)
+                if entry is None:
+                    morpheme.dict_id = None
+                    continue
+                id_map[morpheme.dict_id] = self.dictionary.add(entry)
+            morpheme.dict_id = id_map[morpheme.dict_id]
+        self.documents.append(document)
+
+    def set_settings(self, settings: ProjectSettings):
+        if settings.profile != self.dictionary.profile:
+            self.dictionary.set_profile(settings.profile)
+        self.settings = settings
+        save_settings(self.path, settings)
+
+    def save_dictionary(self):
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.dictionary.save(self.dictionary_path)
+
+    def save_document(self, document: Document):
+        self.documents_dir.mkdir(parents=True, exist_ok=True)
+        document.save(self.document_path(document))
+
+    @timed('Project.save')
+    def save(self):
+        self.save_dictionary()
+        for document in self.documents:
+            self.save_document(document)
@@ -0,0 +1,131 @@
+import heapq
+import math
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from field_linguistics_ide.instrumentation import timed
+from field_linguistics_ide.types_ import Document, Line
+
+_WORD = re.compile(r'\w+')
+LINE_EVENTS = {'add_line', 'pop_line', 'update_translation'}
+# (document key, line id)
+_Key = Tuple[int, int]
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return _WORD.findall(text.casefold()) if text else []
+
+
+class SearchHit(NamedTuple):
+    document: Document
+    line_id: int
+    score: float
+    translation: str
+
+
+# BM25 over Line.translation of every added document. Documents report
+# their own changes, so the index never has to be rebuilt.
+class TranslationIndex:
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._documents: Dict[int, Document] = {}
+        self._observers = {}
+        self._postings: Dict[str, Dict[_Key, int]] = {}
+        self._terms: Dict[_Key, Counter] = {}
+        self._lengths: Dict[_Key, int] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    @property
+    def documents(self) -> List[Document]:
+        return list(self._documents.values())
+
+    def add_document(self, document: Document):
+        document_key = id(document)
+        if document_key in self._documents:
+            return
+        self._documents[document_key] = document
+
+        def observer(event: str, line: Line):
+            if event not in LINE_EVENTS:
+                return
+            self._remove_line((document_key, line.id_))
+            if event != 'pop_line':
+                self._add_line((document_key, line.id_), line.translation)
+
+        self._observers[document_key] = observer
+        document.subscribe(observer)
+        for line in document.data:
+            self._add_line((document_key, line.id_), line.translation)
+
+    def add_documents(self, documents: Iterable[Document]):
+        for document in documents:
+            self.add_document(document)
+
+    def remove_document(self, document: Document):
+        document_key = id(document)
+        if self._documents.pop(document_key, None) is None:
+            return
+        document.unsubscribe(self._observers.pop(document_key))
+        for line in document.data:
+            self._remove_line((document_key, line.id_))
+
+    def _add_line(self, key: _Key, translation: str):
+        terms = Counter(tokenize(translation))
+        self._terms[key] = terms
+        length = sum(terms.values())
+        self._lengths[key] = length
+        self._total_length += length
+        for term, frequency in terms.items():
+            self._postings.setdefault(term, {})[key] = frequency
+
+    def _remove_line(self, key: _Key):
+        terms = self._terms.pop(key, None)
+        if terms is None:
+            return
+        self._total_length -= self._lengths.pop(key)
+        for term in terms:
+            postings = self._postings[term]
+            del postings[key]
+            if not postings:
+                del self._postings[term]
+
+    def _idf(self, postings: Dict[_Key, int]) -> float:
+        return math.log(1 + (len(self._lengths) - len(postings) + 0.5) / (len(postings) + 0.5))
+
+    @timed('TranslationIndex.search')
+    def search(self, query: str, limit: int = 20) -> List[SearchHit]:
+        terms = [term for term in dict.fromkeys(tokenize(query)) if term in self._postings]
+        if not terms or limit <= 0:
+            return []
+        # rare terms first: once the worst kept score beats everything the
+        # remaining frequent terms could add, they only rescore known hits
+        terms.sort(key=lambda term: len(self._postings[term]))
+        idfs = [self._idf(self._postings[term]) for term in terms]
+        bounds = [idf * (self.k1 + 1) for idf in idfs]
+        remaining = [sum(bounds[position:]) for position in range(len(terms))]
+        average_length = self._total_length / len(self._lengths) or 1.0
+        k1, b, lengths = self.k1, self.b, self._lengths
+        scores: Dict[_Key, float] = {}
+        for position, term in enumerate(terms):
+            postings = self._postings[term]
+            idf = idfs[position]
+            if len(scores) >= limit \
+                    and heapq.nlargest(limit, scores.values())[-1] > remaining[position]:
+                candidates = [(key, postings[key]) for key in scores if key in postings]
+            else:
+                candidates = postings.items()
+            for key, frequency in candidates:
+                norm = k1 * (1 - b + b * lengths[key] / average_length)
+                scores[key] = scores.get(key, 0.0) \
+                    + idf * frequency * (k1 + 1) / (frequency + norm)
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        hits = []
+        for (document_key, line_id), score in best:
+            document = self._documents[document_key]
+            hits.append(SearchHit(document, line_id, score,
+                                  document.lines[line_id].translation))
+        return hits
@@ -0,0 +1,172 @@
+import random
+import sys
+from collections.abc import MutableSequence
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+
+class _Node:
+    __slots__ = ('item', 'priority', 'size', 'left', 'right', 'parent')
+
+    def __init__(self, item: Any):
+        self.item = item
+        self.priority = random.random()
+        self.size = 1
+        self.left: Optional['_Node'] = None
+        self.right: Optional['_Node'] = None
+        self.parent: Optional['_Node'] = None
+
+
+def _size(node: Optional[_Node]) -> int:
+    return node.size if node is not None else 0
+
+
+def _update(node: _Node):
+    node.size = 1 + _size(node.left) + _size(node.right)
+    if node.left is not None:
+        node.left.parent = node
+    if node.right is not None:
+        node.right.parent = node
+
+
+def _split(node: Optional[_Node], count: int) -> Tuple[Optional[_Node], Optional[_Node]]:
+    # the first count items go left
+    if node is None:
+        return None, None
+    if _size(node.left) >= count:
+        left, node.left = _split(node.left, count)
+        _update(node)
+        if left is not None:
+            left.parent = None
+        return left, node
+    node.right, right = _split(node.right, count - _size(node.left) - 1)
+    _update(node)
+    if right is not None:
+        right.parent = None
+    return node, right
+
+
+def _merge(left: Optional[_Node], right: Optional[_Node]) -> Optional[_Node]:
+    if left is None:
+        return right
+    if right is None:
+        return left
+    if left.priority > right.priority:
+        left.right = _merge(left.right, right)
+        _update(left)
+        return left
+    right.left = _merge(left, right.left)
+    _update(right)
+    return right
+
+
+# A list-like sequence backed by a treap with implicit keys: insertion,
+# deletion, access by position and the position of an item are O(log n).
+# Items are found by identity, so every object may only be stored once.
+class IndexedSequence(MutableSequence):
+    def __init__(self, items: Iterable[Any] = ()):
+        self._root: Optional[_Node] = None
+        self._nodes: Dict[int, _Node] = {}
+        self.extend(items)
+
+    def __len__(self) -> int:
+        return _size(self._root)
+
+    def __iter__(self) -> Iterator[Any]:
+        stack = []
+        node = self._root
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield node.item
+            node = node.right
+
+    def __contains__(self, item: Any) -> bool:
+        return id(item) in self._nodes
+
+    def __repr__(self):
+        return '{}({!r})'.format(type(self).__name__, list(self))
+
+    def __sizeof__(self) -> int:
+        # the tree and its index, like the pointer array of a list
+        return object.__sizeof__(self) + sys.getsizeof(self._nodes) \
+            + sum(sys.getsizeof(node) for node in self._nodes.values())
+
+    def _position(self, position: int) -> int:
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError('sequence index out of range')
+        return position
+
+    def _node_at(self, position: int) -> _Node:
+        node = self._root
+        while True:
+            left_size = _size(node.left)
+            if position < left_size:
+                node = node.left
+            elif position == left_size:
+                return node
+            else:
+                position -= left_size + 1
+                node = node.right
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[index] for index in range(*position.indices(len(self)))]
+        return self._node_at(self._position(position)).item
+
+    def __setitem__(self, position: int, item: Any):
+        if isinstance(position, slice):
+            raise TypeError('{} does not support slice assignment'.format(
+                type(self).__name__))
+        node = self._node_at(self._position(position))
+        if item is node.item:
+            return
+        if id(item) in self._nodes:
+            raise ValueError('Item is already in the sequence')
+        del self._nodes[id(node.item)]
+        node.item = item
+        self._nodes[id(item)] = node
+
+    def __delitem__(self, position: int):
+        if isinstance(position, slice):
+            for index in sorted(range(*position.indices(len(self))), reverse=True):
+                del self[index]
+            return
+        position = self._position(position)
+        left, right = _split(self._root, position)
+        node, right = _split(right, 1)
+        del self._nodes[id(node.item)]
+        self._root = _merge(left, right)
+        if self._root is not None:
+            self._root.parent = None
+
+    def insert(self, position: int, item: Any):
+        if id(item) in self._nodes:
+            raise ValueError('Item is already in the sequence')
+        # same clamping as list.insert
+        if position < 0:
+            position = max(position + len(self), 0)
+        position = min(position, len(self))
+        node = _Node(item)
+        self._nodes[id(item)] = node
+        left, right = _split(self._root, position)
+        self._root = _merge(_merge(left, node), right)
+        self._root.parent = None
+
+    def index(self, item: Any, *_) -> int:
+        node = self._nodes.get(id(item))
+        if node is None:
+            raise ValueError('Item is not in the sequence')
+        position = _size(node.left)
+        while node.parent is not None:
+            if node is node.parent.right:
+                position += _size(node.parent.left) + 1
+            node = node.parent
+        return position
+
+    def clear(self):
+        self._root = None
+        self._nodes.clear()
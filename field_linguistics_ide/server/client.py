@@ -0,0 +1,117 @@
+import asyncio
+import http.client
+import json
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote, urlencode
+from field_linguistics_ide.server.server import DEFAULT_HOST, DEFAULT_PORT
+
+
+class ServerError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__('{}: {}'.format(status, message))
+        self.status = status
+
+
+def query_path(route: str, **parameters) -> str:
+    query = urlencode({key: value for key, value in parameters.items() if value is not None})
+    return '/{}?{}'.format(route, query) if query else '/{}'.format(route)
+
+
+def _decode(status: int, body: bytes) -> Any:
+    payload = json.loads(body.decode('utf-8'))
+    if status != 200:
+        raise ServerError(status, payload.get('error', ''))
+    return payload
+
+
+# Blocking client for scripts and notebooks, one persistent connection.
+class Client:
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                 timeout: float = 30.0):
+        self._connection = http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def __enter__(self) -> 'Client':
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def close(self):
+        self._connection.close()
+
+    def get(self, path: str) -> Any:
+        self._connection.request('GET', path)
+        response = self._connection.getresponse()
+        return _decode(response.status, response.read())
+
+    def statistics(self) -> Dict[str, int]:
+        return self.get('/statistics')
+
+    def documents(self) -> List[str]:
+        return self.get('/documents')
+
+    def document(self, name: str) -> List[dict]:
+        return self.get('/documents/{}'.format(quote(name, safe='')))
+
+    def concordance(self, query: str, field: str = 'text',
+                    width: int = 3, limit: int = 100) -> List[dict]:
+        return self.get(query_path('concordance', query=query, field=field,
+                                   width=width, limit=limit))
+
+    def lookup(self, text: Optional[str] = None,
+               gloss: Optional[str] = None) -> List[dict]:
+        return self.get(query_path('dictionary', text=text, gloss=gloss))
+
+
+# asyncio client, pipeline() writes every request before reading any answer
+class AsyncClient:
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        self.host = host
+        self.port = port
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    async def connect(self):
+        self._reader, self._writer = await asyncio.open_connection(self.host, self.port)
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            await self._writer.wait_closed()
+            self._writer = None
+
+    async def __aenter__(self) -> 'AsyncClient':
+        await self.connect()
+        return self
+
+    async def __aexit__(self, *_):
+        await self.close()
+
+    def _send(self, path: str):
+        self._writer.write('GET {} HTTP/1.1\r\nHost: {}:{}\r\n\r\n'.format(
+            path, self.host, self.port).encode('latin-1'))
+
+    async def _receive(self) -> Tuple[int, bytes]:
+        status_line = await self._reader.readline()
+        if not status_line:
+            raise ConnectionError('connection closed by the server')
+        status = int(status_line.split()[1])
+        length = 0
+        while True:
+            header_line = await self._reader.readline()
+            if header_line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = header_line.decode('latin-1').partition(':')
+            if name.strip().lower() == 'content-length':
+                length = int(value)
+        return status, await self._reader.readexactly(length)
+
+    async def get(self, path: str) -> Any:
+        return (await self.pipeline([path]))[0]
+
+    async def pipeline(self, paths: List[str]) -> List[Any]:
+        for path in paths:
+            self._send(path)
+        await self._writer.drain()
+        responses = [await self._receive() for _ in paths]
+        return [_decode(status, body) for status, body in responses]
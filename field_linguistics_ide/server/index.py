@@ -0,0 +1,232 @@
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from field_linguistics_ide.normalization import DEFAULT_PROFILE, PROFILES, \
+    NormalizationProfile, canonical, normalize
+from field_linguistics_ide.project import DICTIONARY_FILE, DOCUMENTS_DIR, document_paths, \
+    load_dictionary, load_document, load_settings
+from field_linguistics_ide.types_ import Document, MorphemesDictionary, Token
+
+
+class Occurrence(NamedTuple):
+    line_position: int
+    token_position: int
+    morpheme_position: int
+
+
+# texts are indexed under their key in the project's profile and glosses
+# in NFC, queries are looked up the same way
+def _gloss_key(gloss: str) -> str:
+    return canonical(gloss)
+
+
+class _DocumentIndex:
+    def __init__(self, document: Document, profile: NormalizationProfile):
+        self.document = document
+        self.profile = profile
+        self.by_text: Dict[str, List[Occurrence]] = defaultdict(list)
+        self.by_gloss: Dict[str, List[Occurrence]] = defaultdict(list)
+        self.glossed = 0
+        for line_position, line in enumerate(document.data):
+            for token_position, token in enumerate(line.tokens):
+                for morpheme_position, morpheme in enumerate(token.morphemes):
+                    occurrence = Occurrence(line_position, token_position, morpheme_position)
+                    self.by_text[normalize(morpheme.text, profile)].append(occurrence)
+                    if morpheme.gloss:
+                        self.by_gloss[_gloss_key(morpheme.gloss)].append(occurrence)
+                        self.glossed += 1
+        # positional access is O(log n) on Document.data, hits need it often
+        self.lines = list(document.data)
+        self._snapshot: Optional[List[dict]] = None
+
+    @property
+    def snapshot(self) -> List[dict]:
+        # documents in the index are never edited, only replaced
+        if self._snapshot is None:
+            self._snapshot = self.document.snapshot()
+        return self._snapshot
+
+
+class _DictionaryIndex(NamedTuple):
+    dictionary: MorphemesDictionary
+    by_text: Dict[str, List[int]]
+    by_gloss: Dict[str, List[int]]
+
+
+def _token_text(token: Token) -> str:
+    return '-'.join(morpheme.text for morpheme in token.morphemes)
+
+
+def _stamp(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+# Read-only view of a project directory shared by every connection.
+# The project may be edited at the same time, so files are stat-ed at most
+# once per REFRESH_INTERVAL and only changed documents are reloaded.
+# refresh() may run on another thread: it builds new indexes and swaps
+# each in with one assignment, readers keep the ones they started with.
+class CorpusIndex:
+    REFRESH_INTERVAL = 1.0
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._profile = PROFILES[DEFAULT_PROFILE]
+        self._dictionary_index = _DictionaryIndex(MorphemesDictionary(), {}, {})
+        self._dictionary_stamp: Optional[Tuple[int, int]] = None
+        self._documents: Dict[str, _DocumentIndex] = {}
+        self._stamps: Dict[str, Tuple[int, int]] = {}
+        self._refreshed = 0.0
+        self._lock = threading.Lock()
+        self.refresh()
+
+    def refresh(self):
+        with self._lock:
+            self._refreshed = time.monotonic()
+            self._refresh_settings()
+            self._refresh_dictionary()
+            self._refresh_documents()
+
+    @property
+    def refresh_due(self) -> bool:
+        return time.monotonic() - self._refreshed >= self.REFRESH_INTERVAL
+
+    def maybe_refresh(self):
+        if self.refresh_due:
+            self.refresh()
+
+    @property
+    def dictionary(self) -> MorphemesDictionary:
+        return self._dictionary_index.dictionary
+
+    def _refresh_settings(self):
+        try:
+            profile = load_settings(self.path).profile
+        except ValueError:
+            # caught in the middle of a save, or an unknown profile
+            return
+        if profile != self._profile:
+            # everything is indexed again under the new keys
+            self._profile = profile
+            self._dictionary_stamp = None
+            self._stamps = {}
+
+    def _refresh_dictionary(self):
+        path = self.path / DICTIONARY_FILE
+        stamp = _stamp(path)
+        if stamp == self._dictionary_stamp:
+            return
+        try:
+            dictionary = load_dictionary(path, self._profile)
+        except ValueError:
+            # caught in the middle of a non-atomic save, try again later
+            return
+        by_text = defaultdict(list)
+        by_gloss = defaultdict(list)
+        for dict_id, entry in dictionary.items():
+            by_text[dictionary.key(entry.text)].append(dict_id)
+            if entry.gloss:
+                by_gloss[_gloss_key(entry.gloss)].append(dict_id)
+        self._dictionary_index = _DictionaryIndex(dictionary, by_text, by_gloss)
+        self._dictionary_stamp = stamp
+
+    def _refresh_documents(self):
+        documents_dir = self.path / DOCUMENTS_DIR
+        paths = document_paths(documents_dir) if documents_dir.is_dir() else []
+        documents = dict(self._documents)
+        stamps = dict(self._stamps)
+        names = set()
+        for path in paths:
+            name = path.name[:-5]
+            names.add(name)
+            stamp = _stamp(path)
+            if stamp is None or stamp == stamps.get(name):
+                continue
+            try:
+                document = load_document(path)
+            except ValueError:
+                continue
+            documents[name] = _DocumentIndex(document, self._profile)
+            stamps[name] = stamp
+        for name in set(documents) - names:
+            del documents[name]
+            stamps.pop(name, None)
+        self._stamps = stamps
+        self._documents = documents
+
+    @property
+    def document_names(self) -> List[str]:
+        return sorted(self._documents)
+
+    def document(self, name: str) -> Optional[List[dict]]:
+        document_index = self._documents.get(name)
+        if document_index is None:
+            return None
+        return document_index.snapshot
+
+    def concordance(self, query: str, field: str = 'text',
+                    width: int = 3, limit: int = 100) -> List[dict]:
+        if field not in ('text', 'gloss'):
+            raise ValueError('field must be text or gloss')
+        hits = []
+        documents = self._documents
+        for name in sorted(documents):
+            document_index = documents[name]
+            key = normalize(query, document_index.profile) if field == 'text' \
+                else _gloss_key(query)
+            occurrences = getattr(document_index, 'by_' + field).get(key, ())
+            for line_position, token_position, morpheme_position in occurrences:
+                if len(hits) == limit:
+                    return hits
+                line = document_index.lines[line_position]
+                token = line.tokens[token_position]
+                morpheme = token.morphemes[morpheme_position]
+                hits.append({
+                    'document': name,
+                    'line_id': line.id_,
+                    'left': [_token_text(item) for item in
+                             line.tokens[max(token_position - width, 0):token_position]],
+                    'token': _token_text(token),
+                    'right': [_token_text(item) for item in
+                              line.tokens[token_position + 1:token_position + 1 + width]],
+                    'morpheme': morpheme.text,
+                    'gloss': morpheme.gloss,
+                    'dict_id': morpheme.dict_id,
+                    'translation': line.translation,
+                })
+        return hits
+
+    def lookup(self, text: Optional[str] = None,
+               gloss: Optional[str] = None) -> List[dict]:
+        if text is None and gloss is None:
+            raise ValueError('text or gloss is required')
+        dictionary, by_text, by_gloss = self._dictionary_index
+        if text is not None:
+            dict_ids = by_text.get(dictionary.key(text), [])
+            if gloss is not None:
+                dict_ids = [dict_id for dict_id in dict_ids
+                            if canonical(dictionary[dict_id].gloss or '') == _gloss_key(gloss)]
+        else:
+            dict_ids = by_gloss.get(_gloss_key(gloss), [])
+        return [{'dict_id': dict_id, 'text': dictionary[dict_id].text,
+                 'gloss': dictionary[dict_id].gloss,
+                 'is_stem': dictionary[dict_id].is_stem} for dict_id in dict_ids]
+
+    def statistics(self) -> Dict[str, int]:
+        documents = self._documents
+        totals = {'documents': len(documents), 'lines': 0, 'tokens': 0,
+                  'morphemes': 0, 'glossed': 0}
+        for document_index in documents.values():
+            document = document_index.document
+            totals['lines'] += len(document.lines)
+            totals['tokens'] += len(document.tokens)
+            totals['morphemes'] += len(document.morphemes)
+            totals['glossed'] += document_index.glossed
+        totals['dictionary entries'] = len(self.dictionary)
+        return totals
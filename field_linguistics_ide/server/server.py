@@ -0,0 +1,188 @@
+import asyncio
+import json
+from http import HTTPStatus
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+from field_linguistics_ide.instrumentation import count, span
+from field_linguistics_ide.server.index import CorpusIndex
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+# seconds an idle keep-alive connection is kept open
+IDLE_TIMEOUT = 60.0
+MAX_BODY = 1 << 20
+
+
+class RequestError(Exception):
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _parameter(query: Dict[str, List[str]], name: str,
+               default: Optional[str] = None) -> Optional[str]:
+    values = query.get(name)
+    return values[-1] if values else default
+
+
+def _integer(query: Dict[str, List[str]], name: str, default: int) -> int:
+    value = _parameter(query, name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise RequestError(HTTPStatus.BAD_REQUEST, '{} must be an integer'.format(name))
+
+
+def _refresh_done(future: asyncio.Future):
+    # a failed refresh is tried again after REFRESH_INTERVAL
+    if not future.cancelled() and future.exception() is not None:
+        count('server refresh errors')
+
+
+# JSON over HTTP/1.1. Connections are kept alive and requests that are
+# pipelined on one connection are answered in order. Every connection
+# reads from the same CorpusIndex.
+class CorpusServer:
+    def __init__(self, index: CorpusIndex, host: str = DEFAULT_HOST,
+                 port: int = DEFAULT_PORT):
+        self.index = index
+        self.host = host
+        self.port = port
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._refresh: Optional[asyncio.Future] = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        # the real port when 0 was asked for
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    def close(self):
+        if self._server is not None:
+            self._server.close()
+
+    def dispatch(self, method: str, target: str) -> Tuple[HTTPStatus, Any]:
+        if method not in ('GET', 'HEAD'):
+            raise RequestError(HTTPStatus.METHOD_NOT_ALLOWED, 'only GET is supported')
+        url = urlsplit(target)
+        parts = [unquote(part) for part in url.path.strip('/').split('/') if part]
+        query = parse_qs(url.query)
+        try:
+            if parts == ['statistics']:
+                return HTTPStatus.OK, self.index.statistics()
+            if parts == ['documents']:
+                return HTTPStatus.OK, self.index.document_names
+            if len(parts) == 2 and parts[0] == 'documents':
+                document = self.index.document(parts[1])
+                if document is None:
+                    raise RequestError(HTTPStatus.NOT_FOUND,
+                                       'no document {!r}'.format(parts[1]))
+                return HTTPStatus.OK, document
+            if parts == ['concordance']:
+                query_text = _parameter(query, 'query')
+                if query_text is None:
+                    raise RequestError(HTTPStatus.BAD_REQUEST, 'query is required')
+                return HTTPStatus.OK, self.index.concordance(
+                    query_text, _parameter(query, 'field', 'text'),
+                    _integer(query, 'width', 3), _integer(query, 'limit', 100))
+            if parts == ['dictionary']:
+                return HTTPStatus.OK, self.index.lookup(
+                    _parameter(query, 'text'), _parameter(query, 'gloss'))
+        except ValueError as error:
+            raise RequestError(HTTPStatus.BAD_REQUEST, str(error))
+        raise RequestError(HTTPStatus.NOT_FOUND, 'no route {!r}'.format(url.path))
+
+    def _start_refresh(self):
+        # changed files are read on a worker thread; until that is done
+        # the previous index is served
+        if not self.index.refresh_due or (self._refresh is not None
+                                          and not self._refresh.done()):
+            return
+        self._refresh = asyncio.get_running_loop().run_in_executor(None, self.index.refresh)
+        self._refresh.add_done_callback(_refresh_done)
+
+    async def _read_request(self, reader: asyncio.StreamReader,
+                            ) -> Optional[Tuple[str, str, str, Dict[str, str]]]:
+        request_line = await asyncio.wait_for(reader.readline(), IDLE_TIMEOUT)
+        if not request_line:
+            return None
+        try:
+            method, target, version = request_line.decode('latin-1').split()
+        except ValueError:
+            raise RequestError(HTTPStatus.BAD_REQUEST, 'malformed request line')
+        headers = {}
+        while True:
+            header_line = await reader.readline()
+            if header_line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = header_line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        length = int(headers.get('content-length', 0) or 0)
+        if length > MAX_BODY:
+            raise RequestError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, 'request body too large')
+        if length:
+            # bodies are not used, but have to be consumed for the next request
+            await reader.readexactly(length)
+        return method, target, version, headers
+
+    @staticmethod
+    def _keep_alive(version: str, headers: Dict[str, str]) -> bool:
+        connection = headers.get('connection', '').lower()
+        if version == 'HTTP/1.0':
+            return connection == 'keep-alive'
+        return connection != 'close'
+
+    @staticmethod
+    def _response(status: HTTPStatus, payload: Any, keep_alive: bool,
+                  head: bool = False) -> bytes:
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        header = ('HTTP/1.1 {} {}\r\n'
+                  'Content-Type: application/json; charset=utf-8\r\n'
+                  'Content-Length: {}\r\n'
+                  'Connection: {}\r\n\r\n').format(
+            status.value, status.phrase, len(body), 'keep-alive' if keep_alive else 'close')
+        return header.encode('latin-1') + (b'' if head else body)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        count('server connections')
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except (asyncio.TimeoutError, asyncio.IncompleteReadError):
+                    break
+                except (asyncio.LimitOverrunError, ValueError) as error:
+                    writer.write(self._response(HTTPStatus.BAD_REQUEST,
+                                                {'error': str(error)}, False))
+                    break
+                except RequestError as error:
+                    writer.write(self._response(error.status, {'error': str(error)}, False))
+                    break
+                if request is None:
+                    break
+                method, target, version, headers = request
+                keep_alive = self._keep_alive(version, headers)
+                count('server requests')
+                self._start_refresh()
+                with span('CorpusServer.dispatch'):
+                    try:
+                        status, payload = self.dispatch(method, target)
+                    except RequestError as error:
+                        status, payload = error.status, {'error': str(error)}
+                writer.write(self._response(status, payload, keep_alive, method == 'HEAD'))
+                # drain only waits when the transport buffer is full, so
+                # answers to pipelined requests still go out together
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
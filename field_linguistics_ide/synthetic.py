@@ -0,0 +1,125 @@
+import json
+import random
+from pathlib import Path
+from typing import Iterator, List, NamedTuple
+from field_linguistics_ide.project import Project
+from field_linguistics_ide.types_ import Document, Line, Morpheme, MorphemesDictionary, Token
+
+_CONSONANTS = 'ptkbdgmnslrwj'
+_VOWELS = 'aeiou'
+
+
+class CorpusSpec(NamedTuple):
+    lines: int = 1000
+    tokens_per_line: int = 8
+    morphemes_per_token: int = 3
+    lexicon_size: int = 2000
+    affix_ratio: float = 0.1
+    glossed_ratio: float = 0.9
+    # exponent of the Zipf distribution the lexicon is sampled from,
+    # 0 gives a uniform distribution
+    zipf_exponent: float = 1.0
+    seed: int = 0
+
+
+class CorpusGenerator:
+    def __init__(self, spec: CorpusSpec = CorpusSpec()):
+        self.spec = spec
+        self.random = random.Random(spec.seed)
+        self.stems: List[Morpheme] = []
+        self.affixes: List[Morpheme] = []
+        self._generate_lexicon()
+        self._stem_weights = self._cumulative_weights(len(self.stems))
+        self._affix_weights = self._cumulative_weights(len(self.affixes))
+
+    def _syllables(self, count: int) -> str:
+        return ''.join(self.random.choice(_CONSONANTS) + self.random.choice(_VOWELS)
+                       for _ in range(count))
+
+    def _generate_lexicon(self):
+        affixes = max(1, int(self.spec.lexicon_size * self.spec.affix_ratio))
+        stems = max(1, self.spec.lexicon_size - affixes)
+        for index in range(stems):
+            self.stems.append(Morpheme(self._syllables(self.random.randint(1, 3)),
+                                       'stem{}'.format(index), is_stem=True))
+        for index in range(affixes):
+            self.affixes.append(Morpheme(self._syllables(1),
+                                         'AFF{}'.format(index), is_stem=False))
+
+    def _cumulative_weights(self, size: int) -> List[float]:
+        total = 0.0
+        weights = []
+        for rank in range(1, size + 1):
+            total += 1 / rank ** self.spec.zipf_exponent
+            weights.append(total)
+        return weights
+
+    def _morphemes(self) -> List[Morpheme]:
+        count = self.random.randint(1, 2 * self.spec.morphemes_per_token - 1)
+        morphemes = self.random.choices(self.stems, cum_weights=self._stem_weights)
+        if count > 1:
+            morphemes.extend(self.random.choices(
+                self.affixes, cum_weights=self._affix_weights, k=count - 1))
+        return morphemes
+
+    def raw_lines(self) -> Iterator[dict]:
+        # lines in the shape read by JsonLoader
+        for _ in range(self.spec.lines):
+            text = []
+            glosses = []
+            translation = []
+            for _ in range(self.random.randint(1, 2 * self.spec.tokens_per_line - 1)):
+                morphemes = self._morphemes()
+                glossed = self.random.random() < self.spec.glossed_ratio
+                text.append('-'.join(morpheme.text for morpheme in morphemes))
+                glosses.append('-'.join(morpheme.gloss for morpheme in morphemes)
+                               if glossed else '')
+                translation.append(morphemes[0].gloss)
+            yield {'text': text, 'glosses': glosses,
+                   'translation': ' '.join(translation)}
+
+    def document(self, dictionary: MorphemesDictionary,
+                 name: str = 'Unnamed') -> Document:
+        document = Document()
+        document.name = name
+        dict_ids = {}
+        for raw_line in self.raw_lines():
+            line = Line([], raw_line['translation'])
+            for text, glosses in zip(raw_line['text'], raw_line['glosses']):
+                token = Token([])
+                texts = text.split('-')
+                for morpheme_text, gloss in zip(texts, glosses.split('-') if glosses
+                                                else len(texts) * [None]):
+                    morpheme = Morpheme(morpheme_text, gloss)
+                    if gloss:
+                        morpheme.is_stem = not gloss.isupper()
+                        if (morpheme_text, gloss) not in dict_ids:
+                            dict_ids[morpheme_text, gloss] = dictionary.add(morpheme)
+                        morpheme.dict_id = dict_ids[morpheme_text, gloss]
+                    document.add_morpheme_to_token(morpheme, token)
+                document.add_token_to_line(token, line)
+            document.add_line(line)
+        return document
+
+    def write_json(self, path: Path):
+        with path.open('w', encoding='utf-8') as file:
+            json.dump(list(self.raw_lines()), file, ensure_ascii=False)
+
+    def write_csv(self, path: Path):
+        with path.open('w', encoding='utf-8') as file:
+            for raw_line in self.raw_lines():
+                file.write('\\Text {}\n'.format(' '.join(raw_line['text'])))
+                file.write('\\Glosses {}\n'.format(
+                    ' '.join(gloss or '-' for gloss in raw_line['glosses'])))
+                file.write('\\Translation {}\n\n'.format(raw_line['translation']))
+
+
+def generate_project(path: Path, spec: CorpusSpec = CorpusSpec(),
+                     documents: int = 1) -> Project:
+    project = Project(path)
+    generator = CorpusGenerator(spec)
+    for index in range(documents):
+        project.documents.append(
+            generator.document(project.dictionary, 'document{}'.format(index)))
+    project.save()
+    return project
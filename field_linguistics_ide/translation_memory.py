@@ -0,0 +1,211 @@
+import hashlib
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple, Union
+from field_linguistics_ide.instrumentation import timed
+from field_linguistics_ide.types_ import Document, Line, Morpheme, Token
+
+# lines are compared by character trigrams, LSH looks at BANDS bands
+# of ROWS MinHash values each
+SHINGLE = 3
+BANDS = 16
+ROWS = 3
+BINS = BANDS * ROWS
+# makes values borrowed by empty bins differ from the bin they come from
+_BORROWED = 1 << 64
+# (document key, line id)
+_Key = Tuple[int, int]
+
+
+def token_text(token: Token) -> str:
+    return ''.join(morpheme.text or '' for morpheme in token.morphemes)
+
+
+def line_text(line: Line) -> str:
+    return ' '.join(token_text(token) for token in line.tokens)
+
+
+def is_glossed(line: Line) -> bool:
+    return any(morpheme.gloss for token in line.tokens for morpheme in token.morphemes)
+
+
+@lru_cache(maxsize=1 << 16)
+def _shingle_hash(shingle: str) -> int:
+    return int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(),
+                          'little')
+
+
+def shingles(text: str) -> Set[str]:
+    text = ' {} '.format(' '.join(text.casefold().split()))
+    return {text[start:start + SHINGLE] for start in range(len(text) - SHINGLE + 1)}
+
+
+def _signature(text_shingles: Set[str]) -> Optional[List[int]]:
+    # one permutation hashing: each shingle is hashed once and only
+    # competes for the minimum of its own bin
+    bins: List[Optional[int]] = [None] * BINS
+    for shingle in text_shingles:
+        value, position = divmod(_shingle_hash(shingle), BINS)
+        if bins[position] is None or value < bins[position]:
+            bins[position] = value
+    if all(value is None for value in bins):
+        return None
+    # empty bins borrow from the next filled one to the right
+    signature = []
+    for position in range(BINS):
+        distance = 0
+        while bins[(position + distance) % BINS] is None:
+            distance += 1
+        signature.append(bins[(position + distance) % BINS] + distance * _BORROWED)
+    return signature
+
+
+def _band_keys(signature: List[int]) -> Tuple[int, ...]:
+    return tuple(hash((band,) + tuple(signature[band * ROWS:(band + 1) * ROWS]))
+                 for band in range(BANDS))
+
+
+def jaccard(first: Set[str], second: Set[str]) -> float:
+    if not first and not second:
+        return 1.0
+    return len(first & second) / len(first | second)
+
+
+class Match(NamedTuple):
+    document: Document
+    line_id: int
+    similarity: float
+
+
+# Finds already glossed lines that look like a given one. Only the LSH
+# buckets of a query are looked at, so a query does not grow with the
+# corpus; candidates are then ranked by their exact trigram Jaccard.
+# Documents report their changes, changed lines are re-indexed lazily
+# before the next query.
+class TranslationMemory:
+    def __init__(self):
+        self._documents: Dict[int, Document] = {}
+        self._observers = {}
+        self._buckets: Dict[int, Set[_Key]] = {}
+        self._bands: Dict[_Key, Tuple[int, ...]] = {}
+        self._dirty: Set[_Key] = set()
+
+    def __len__(self) -> int:
+        self._refresh()
+        return len(self._bands)
+
+    @property
+    def documents(self) -> List[Document]:
+        return list(self._documents.values())
+
+    def add_document(self, document: Document):
+        document_key = id(document)
+        if document_key in self._documents:
+            return
+        self._documents[document_key] = document
+
+        def observer(event: str, item: Union[Line, Token, Morpheme]):
+            if event in ('add_line', 'pop_line'):
+                line = item
+            elif event in ('add_token', 'pop_token'):
+                line = document.token_line(item.id_)
+            elif event in ('add_morpheme', 'update_morpheme', 'pop_morpheme'):
+                line = document.morpheme_line(item.id_)
+            else:
+                return
+            # tokens and morphemes of lines being built are not in a line yet
+            if line is not None and line.id_ is not None:
+                self._dirty.add((document_key, line.id_))
+
+        self._observers[document_key] = observer
+        document.subscribe(observer)
+        for line in document.data:
+            self._add_line((document_key, line.id_), line)
+
+    def add_documents(self, documents: Iterable[Document]):
+        for document in documents:
+            self.add_document(document)
+
+    def remove_document(self, document: Document):
+        document_key = id(document)
+        if self._documents.pop(document_key, None) is None:
+            return
+        document.unsubscribe(self._observers.pop(document_key))
+        for key in [key for key in self._bands if key[0] == document_key]:
+            self._remove_line(key)
+        self._dirty = {key for key in self._dirty if key[0] != document_key}
+
+    def _add_line(self, key: _Key, line: Line):
+        if not is_glossed(line):
+            return
+        signature = _signature(shingles(line_text(line)))
+        if signature is None:
+            return
+        band_keys = _band_keys(signature)
+        self._bands[key] = band_keys
+        for band_key in band_keys:
+            self._buckets.setdefault(band_key, set()).add(key)
+
+    def _remove_line(self, key: _Key):
+        for band_key in self._bands.pop(key, ()):
+            bucket = self._buckets[band_key]
+            bucket.discard(key)
+            if not bucket:
+                del self._buckets[band_key]
+
+    def _refresh(self):
+        while self._dirty:
+            key = self._dirty.pop()
+            self._remove_line(key)
+            line = self._documents[key[0]].lines.get(key[1])
+            if line is not None:
+                self._add_line(key, line)
+
+    @timed('TranslationMemory.similar')
+    def similar(self, text: str, limit: int = 5, threshold: float = 0.5,
+                exclude: Optional[Tuple[Document, int]] = None) -> List[Match]:
+        self._refresh()
+        query = shingles(text)
+        signature = _signature(query)
+        if signature is None or limit <= 0:
+            return []
+        candidates = set()
+        for band_key in _band_keys(signature):
+            candidates.update(self._buckets.get(band_key, ()))
+        if exclude is not None:
+            candidates.discard((id(exclude[0]), exclude[1]))
+        matches = []
+        for document_key, line_id in candidates:
+            document = self._documents[document_key]
+            similarity = jaccard(query, shingles(line_text(document.lines[line_id])))
+            if similarity >= threshold:
+                matches.append(Match(document, line_id, similarity))
+        matches.sort(key=lambda match: -match.similarity)
+        return matches[:limit]
+
+    def similar_lines(self, document: Document, line_id: int, limit: int = 5,
+                      threshold: float = 0.5) -> List[Match]:
+        return self.similar(line_text(document.lines[line_id]), limit, threshold,
+                            exclude=(document, line_id))
+
+
+def copy_analysis(document: Document, line: Line, source: Line) -> List[Token]:
+    # tokens written the same way as in the source line take its
+    # segmentation and glosses, the others are left alone
+    analyses = {}
+    for token in source.tokens:
+        analyses.setdefault(token_text(token).casefold(), token.morphemes)
+    changed = []
+    for token in line.tokens:
+        morphemes = analyses.get(token_text(token).casefold())
+        if morphemes is None or [(morpheme.text, morpheme.gloss) for morpheme in morphemes] \
+                == [(morpheme.text, morpheme.gloss) for morpheme in token.morphemes]:
+            continue
+        for morpheme in list(token.morphemes):
+            document.pop_morpheme(morpheme.id_)
+        for morpheme in morphemes:
+            document.add_morpheme_to_token(
+                Morpheme(morpheme.text, morpheme.gloss, dict_id=morpheme.dict_id,
+                         is_stem=morpheme.is_stem),
+                token)
+        changed.append(token)
+    return changed
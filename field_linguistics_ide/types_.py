@@ -1,15 +1,66 @@
-import json
-from dataclasses import asdict, is_dataclass, dataclass
+import os
+import tempfile
+from dataclasses import asdict, dataclass
 from copy import deepcopy
 from pathlib import Path
-from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, \
+    Union
+from field_linguistics_ide import codec
+from field_linguistics_ide.instrumentation import timed
+from field_linguistics_ide.normalization import DEFAULT_PROFILE, PROFILES, \
+    NormalizationProfile, canonical, normalize
+from field_linguistics_ide.sequence import IndexedSequence
 
 
-class JSONEncoderWithDataClasses(json.JSONEncoder):
-    def default(self, o):
-        if is_dataclass(o):
-            return asdict(o)
-        return super().default(o)
+# read once, os.umask can only be read by setting it
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+def _file_mode(path: Path) -> int:
+    # mkstemp makes owner-only files, the replaced file keeps its mode
+    # and a new one gets what open() would have given it
+    try:
+        return os.stat(str(path)).st_mode & 0o7777
+    except FileNotFoundError:
+        return 0o666 & ~_UMASK
+
+
+def write_text_atomically(path: Path, text: str):
+    write_chunks_atomically(path, (text,))
+
+
+def write_bytes_atomically(path: Path, data: bytes):
+    write_chunks_atomically(path, (data,), binary=True)
+
+
+def write_chunks_atomically(path: Path, chunks: Iterable[Union[str, bytes]],
+                            binary: bool = False):
+    fd, tmp_name = tempfile.mkstemp(prefix='.{}.'.format(path.name),
+                                    suffix='.tmp', dir=str(path.parent))
+    try:
+        os.fchmod(fd, _file_mode(path))
+        with os.fdopen(fd, 'wb' if binary else 'w',
+                       encoding=None if binary else 'utf-8') as tmp_file:
+            tmp_file.writelines(chunks)
+            tmp_file.flush()
+            os.fsync(tmp_file.fileno())
+        os.replace(tmp_name, str(path))
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+
+
+def save_json(path: Path, data: Any, compact: bool = False):
+    write_chunks_atomically(path, codec.iter_json(data, compact))
+
+
+def _canonically_equal(first: Optional[str], second: Optional[str]) -> bool:
+    # equal strings never get normalized, others only once each (cached)
+    if first == second:
+        return True
+    return bool(first) and bool(second) and canonical(first) == canonical(second)
 
 
 @dataclass
@@ -20,12 +71,21 @@ class Morpheme:
     dict_id: Optional[int] = None
     is_stem: Optional[bool] = None
 
+    # A morpheme does not know its project, so == only treats canonically
+    # equivalent strings (precomposed or combining diacritics) as equal,
+    # which holds under every profile. Case and diacritic folding are
+    # for matching against a dictionary: MorphemesDictionary.matches.
     def __eq__(self, other: 'Morpheme'):
-        eq_text = self.text == other.text
-        eq_gloss = self.gloss == other.gloss
+        eq_text = _canonically_equal(self.text, other.text)
+        eq_gloss = _canonically_equal(self.gloss, other.gloss)
         return eq_text and eq_gloss
 
 
+def _morpheme_data(morpheme: Morpheme) -> dict:
+    return {'text': morpheme.text, 'gloss': morpheme.gloss, 'id_': morpheme.id_,
+            'dict_id': morpheme.dict_id, 'is_stem': morpheme.is_stem}
+
+
 @dataclass
 class Token:
     morphemes: List[Morpheme]
@@ -52,19 +112,57 @@ class Line:
 class _Dictionary(dict):
     def __init__(self):
         self._gid = 0
+        self.version = 0
+        # called with an event name and the dict_id, None after load_json
+        self._observers: List[Callable[[str, Optional[int]], None]] = []
         super().__init__()
 
+    def subscribe(self, observer: Callable[[str, Optional[int]], None]):
+        self._observers.append(observer)
+
+    def unsubscribe(self, observer: Callable[[str, Optional[int]], None]):
+        if observer in self._observers:
+            self._observers.remove(observer)
+
+    def _notify(self, event: str, dict_id: Optional[int]):
+        for observer in self._observers:
+            observer(event, dict_id)
+
+    @timed('Dictionary.add')
     def add(self, item: Union[Morpheme, Token]) -> int:
         for index, entry in self.items():
             if entry == item:
                 return entry.dict_id
+        return self._insert(item)
+
+    def _insert(self, item: Union[Morpheme, Token]) -> int:
         new_entry = deepcopy(item)
         new_entry.id_ = None
         new_entry.dict_id = self._gid
         self.update({new_entry.dict_id: new_entry})
         self._gid += 1
+        self.version += 1
+        self._added(new_entry.dict_id)
+        self._notify('add', new_entry.dict_id)
         return new_entry.dict_id
 
+    def pop(self, dict_id: int, *default):
+        self.version += 1
+        entry = super().pop(dict_id, *default)
+        self._removed(dict_id)
+        self._notify('pop', dict_id)
+        return entry
+
+    # for indexes of subclasses, called before the observers
+    def _added(self, dict_id: int):
+        pass
+
+    def _removed(self, dict_id: int):
+        pass
+
+    def snapshot(self) -> Dict[int, dict]:
+        return {dict_id: asdict(entry) for dict_id, entry in self.items()}
+
     @staticmethod
     def _char_keys_to_integers(dictionary_dict: Dict[str, dict],
                                ) -> Dict[int, dict]:
@@ -75,33 +173,95 @@ class TokensDictionary(_Dictionary):
     pass
 
 
+# Entries are indexed by their text normalized with the project's
+# profile, so finding a morpheme is a lookup, not a scan.
 class MorphemesDictionary(_Dictionary):
+    def __init__(self, profile: NormalizationProfile = PROFILES[DEFAULT_PROFILE]):
+        super().__init__()
+        self.profile = profile
+        # normalized text to dict_ids, in the order they were indexed
+        self._by_key: Dict[str, List[int]] = {}
+        self._keys: Dict[int, str] = {}
+
+    def key(self, text: Optional[str]) -> str:
+        return normalize(text or '', self.profile)
+
+    def set_profile(self, profile: NormalizationProfile):
+        self.profile = profile
+        self._reindex()
+
+    def _reindex(self):
+        self._by_key = {}
+        self._keys = {}
+        for dict_id in self:
+            self._added(dict_id)
+
+    def _added(self, dict_id: int):
+        key = self._keys[dict_id] = self.key(self[dict_id].text)
+        self._by_key.setdefault(key, []).append(dict_id)
+
+    def _removed(self, dict_id: int):
+        key = self._keys.pop(dict_id, None)
+        if key is None:
+            return
+        dict_ids = self._by_key[key]
+        dict_ids.remove(dict_id)
+        if not dict_ids:
+            del self._by_key[key]
+
+    @timed('Dictionary.add')
+    def add(self, item: Morpheme) -> int:
+        dict_id = self.find(item)
+        return dict_id if dict_id is not None else self._insert(item)
+
+    def add_many(self, morphemes: Iterable[Morpheme]) -> List[int]:
+        return [self.add(morpheme) for morpheme in morphemes]
+
+    def matches(self, morpheme: Morpheme, dict_id: int) -> bool:
+        # equality under the profile, against the precomputed key of the entry
+        return self.key(morpheme.text) == self._keys.get(dict_id) \
+            and _canonically_equal(morpheme.gloss, self[dict_id].gloss)
+
+    def find_text(self, text: str) -> List[int]:
+        # every entry whose text has the same key, whatever its gloss
+        return list(self._by_key.get(self.key(text), ()))
+
     def edit(self, morpheme_id: int, field: str,
              new_value: Union[str, int, None, bool]):
         morpheme = self.get(morpheme_id)
         if not morpheme:
             raise ValueError('Morpheme with dict_id=={} '
                              'is not in the dictionary'.format(morpheme_id))
+        if field == 'text':
+            self._removed(morpheme_id)
         setattr(morpheme, field, new_value)
+        if field == 'text':
+            self._added(morpheme_id)
+        self.version += 1
+        self._notify('edit', morpheme_id)
 
+    @timed('MorphemesDictionary.find')
     def find(self, morpheme: Morpheme) -> Optional[int]:
-        for morpheme_id, dict_morpheme in self.items():
-            if morpheme == dict_morpheme:
+        for morpheme_id in self._by_key.get(self.key(morpheme.text), ()):
+            if self.matches(morpheme, morpheme_id):
                 return morpheme_id
         return
 
-    def save(self, path: Path):
-        path.write_text(
-            json.dumps(self, ensure_ascii=False,
-                       indent=4, cls=JSONEncoderWithDataClasses)
-        )
+    def snapshot(self) -> Dict[int, dict]:
+        return {dict_id: _morpheme_data(entry) for dict_id, entry in self.items()}
 
-    def load_json(self, dictionary_json: str):
-        dictionary_dict: Dict[int, dict] = json.loads(dictionary_json)
+    def save(self, path: Path, compact: bool = False):
+        save_json(path, self.snapshot(), compact)
+
+    def load_json(self, dictionary_json: Union[str, bytes]):
+        dictionary_dict: Dict[int, dict] = codec.loads(dictionary_json)
         dictionary_dict = self._char_keys_to_integers(dictionary_dict)
         for dict_id, item_dict in dictionary_dict.items():
             self.update({dict_id: Morpheme(**item_dict)})
-            self._gid = dict_id
+            self._gid = max(self._gid, dict_id + 1)
+        self._reindex()
+        self.version += 1
+        self._notify('load', None)
 
 
 class Document:
@@ -112,8 +272,14 @@ class Document:
         self._tokens_gid = 0
         self._lines = {}
         self._lines_gid = 0
-        self.data = []
+        # parents of tokens and morphemes, so that nothing has to be searched
+        self._token_lines: Dict[int, Line] = {}
+        self._morpheme_tokens: Dict[int, Token] = {}
+        self.data = IndexedSequence()
         self.name = 'Unnamed'
+        self.version = 0
+        # called with an event name and the line, token or morpheme that changed
+        self._observers: List[Callable[[str, Union[Line, Token, Morpheme]], None]] = []
 
     @property
     def morphemes(self):
@@ -127,14 +293,30 @@ class Document:
     def lines(self):
         return self._lines
 
-    def add_line(self, line: Line):
+    def subscribe(self, observer: Callable[[str, Union[Line, Token, Morpheme]], None]):
+        self._observers.append(observer)
+
+    def unsubscribe(self, observer: Callable[[str, Union[Line, Token, Morpheme]], None]):
+        if observer in self._observers:
+            self._observers.remove(observer)
+
+    def _notify(self, event: str, item: Union[Line, Token, Morpheme]):
+        for observer in self._observers:
+            observer(event, item)
+
+    def add_line(self, line: Line, position: int = -1):
         if line.id_ is None:
             line.id_ = self._lines_gid
             self._lines_gid += 1
         else:
             self._lines_gid = line.id_ + 1
         self._lines.update({line.id_: line})
-        self.data.append(line)
+        if position == -1:
+            self.data.append(line)
+        else:
+            self.data.insert(position, line)
+        self.version += 1
+        self._notify('add_line', line)
 
     def add_token_to_line(self, token: Token, line: Line,
                           position: int = -1):
@@ -144,10 +326,13 @@ class Document:
         else:
             self._tokens_gid = token.id_ + 1
         self._tokens.update({token.id_: token})
+        self._token_lines[token.id_] = line
         if position == -1:
             line.tokens.append(token)
         else:
             line.tokens.insert(position, token)
+        self.version += 1
+        self._notify('add_token', token)
 
     def add_morpheme_to_token(self, morpheme: Morpheme, token: Token,
                               position: int = -1):
@@ -157,10 +342,13 @@ class Document:
         else:
             self._morphemes_gid = morpheme.id_ + 1
         self._morphemes.update({morpheme.id_: morpheme})
+        self._morpheme_tokens[morpheme.id_] = token
         if position == -1:
             token.morphemes.append(morpheme)
         else:
             token.morphemes.insert(position, morpheme)
+        self.version += 1
+        self._notify('add_morpheme', morpheme)
 
     def update_morphemes(self,
                          morpheme_dict_id: int,
@@ -171,6 +359,8 @@ class Document:
             if not morpheme.dict_id == morpheme_dict_id:
                 continue
             setattr(morpheme, field, new_value)
+            self.version += 1
+            self._notify('update_morpheme', morpheme)
             yield morpheme
 
     def update_morpheme(self, morpheme_id: int,
@@ -179,39 +369,80 @@ class Document:
         if morpheme is None:
             raise ValueError('Morpheme is not in the document')
         setattr(morpheme, field, new_value)
+        self.version += 1
+        self._notify('update_morpheme', morpheme)
+
+    @staticmethod
+    def _position(items: List[Any], item: Any) -> int:
+        # identity, Morpheme.__eq__ only compares text and gloss
+        for position, candidate in enumerate(items):
+            if candidate is item:
+                return position
+        raise ValueError('{!r} is not in the document'.format(item))
+
+    def line_position(self, line_id: int) -> int:
+        return self.data.index(self._lines[line_id])
+
+    def token_position(self, token_id: int) -> int:
+        return self._position(self._token_lines[token_id].tokens, self._tokens[token_id])
+
+    def morpheme_position(self, morpheme_id: int) -> int:
+        return self._position(self._morpheme_tokens[morpheme_id].morphemes,
+                              self._morphemes[morpheme_id])
+
+    def token_line(self, token_id: int) -> Optional[Line]:
+        return self._token_lines.get(token_id)
+
+    def morpheme_line(self, morpheme_id: int) -> Optional[Line]:
+        token = self._morpheme_tokens.get(morpheme_id)
+        return self._token_lines.get(token.id_) if token is not None else None
 
     def pop_morpheme(self, morpheme_id: int) -> Tuple[int, int, Morpheme]:
-        self._morphemes.pop(morpheme_id)
-        for line in self.data:
-            for token in line.tokens:
-                for position, morpheme in enumerate(token.morphemes):
-                    if morpheme.id_ == morpheme_id:
-                        token.morphemes.pop(position)
-                        return token.id_, position, morpheme
+        position = self.morpheme_position(morpheme_id)
+        morpheme = self._morphemes.pop(morpheme_id)
+        token = self._morpheme_tokens[morpheme_id]
+        token.morphemes.pop(position)
+        self.version += 1
+        # observers can still look up the line the morpheme was in
+        self._notify('pop_morpheme', morpheme)
+        del self._morpheme_tokens[morpheme_id]
+        return token.id_, position, morpheme
 
     def pop_token(self, token_id: int) -> Tuple[int, int, Token]:
-        self._tokens.pop(token_id)
-        for line in self.data:
-            for position, token in enumerate(line.tokens):
-                if token.id_ == token_id:
-                    line.tokens.pop(position)
-                    return token.id_, position, token
+        position = self.token_position(token_id)
+        token = self._tokens.pop(token_id)
+        self._token_lines[token_id].tokens.pop(position)
+        self.version += 1
+        self._notify('pop_token', token)
+        del self._token_lines[token_id]
+        return token.id_, position, token
 
     def pop_line(self, line_id: int) -> Tuple[int, int, Line]:
-        self._lines.pop(line_id)
-        for position, line in enumerate(self.data):
-            if line.id_ == line_id:
-                self.data.pop(position)
-                return line.id_, position, line
+        position = self.line_position(line_id)
+        line = self._lines.pop(line_id)
+        del self.data[position]
+        self.version += 1
+        self._notify('pop_line', line)
+        return line.id_, position, line
 
     def update_translation(self, line_id: int, new_value: str):
         line = self._lines.get(line_id)
         if line is None:
             raise ValueError('Line is not in the document')
         setattr(line, 'translation', new_value)
-
-    def save(self, path: Path):
-        path.write_text(
-            json.dumps(self.data, ensure_ascii=False,
-                       indent=4, cls=JSONEncoderWithDataClasses)
-        )
+        self.version += 1
+        self._notify('update_translation', line)
+
+    def snapshot(self) -> List[dict]:
+        # what asdict gives, without its recursive deep copy
+        return [{'tokens': [{'morphemes': [_morpheme_data(morpheme)
+                                           for morpheme in token.morphemes],
+                             'id_': token.id_,
+                             'dict_id': token.dict_id}
+                            for token in line.tokens],
+                 'translation': line.translation,
+                 'id_': line.id_}
+                for line in self.data]
+
+    def save(self, path: Path, compact: bool = False):
+        save_json(path, self.snapshot(), compact)
@@ -0,0 +1,110 @@
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from PySide2 import QtCore
+from field_linguistics_ide.instrumentation import count, span, timed
+from field_linguistics_ide.types_ import save_json
+
+
+def _write_snapshot(path: Path, snapshot: Any):
+    with span('Autosaver.write'):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        save_json(path, snapshot)
+
+
+class Autosaver(QtCore.QObject):
+    DELAY = 1500
+    # path and error of a write that failed, it is retried after the
+    # next change of its source or when closing
+    save_failed = QtCore.Signal(str)
+    # emitted by the worker, delivered on the GUI thread
+    _written = QtCore.Signal()
+
+    def __init__(self, parent: Optional[QtCore.QObject] = None):
+        super().__init__(parent)
+        # a single worker keeps the writes of one file in order
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._sources: Dict[int, Tuple[Any, Callable[[], Path]]] = {}
+        self._saved_versions: Dict[int, Optional[int]] = {}
+        self._observers: Dict[int, Callable] = {}
+        self._pending: Dict[int, Tuple[Future, int, Path]] = {}
+        # versions whose write failed, not written again until they change
+        self._failed_versions: Dict[int, int] = {}
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(self.DELAY)
+        self._timer.timeout.connect(self.flush)
+        self._written.connect(self._collect_failed)
+
+    def track(self, source: Any, path: Callable[[], Path], dirty: bool = False):
+        # source is a Document or a dictionary, every change it reports
+        # starts the timer
+        key = id(source)
+        self.untrack(source)
+        self._sources.update({key: (source, path)})
+        self._saved_versions.update({key: None if dirty else source.version})
+        observer = self._observers[key] = lambda *_: self.schedule()
+        source.subscribe(observer)
+        if dirty:
+            self.schedule()
+
+    def untrack(self, source: Any):
+        key = id(source)
+        self._sources.pop(key, None)
+        self._saved_versions.pop(key, None)
+        self._failed_versions.pop(key, None)
+        observer = self._observers.pop(key, None)
+        if observer is not None:
+            source.unsubscribe(observer)
+
+    def schedule(self):
+        # every call restarts the timer, so a burst of edits is saved once
+        self._timer.start()
+
+    def _collect_failed(self) -> List[str]:
+        errors = []
+        for key, (future, version, path) in list(self._pending.items()):
+            if not future.done():
+                continue
+            self._pending.pop(key)
+            if future.exception() is None:
+                continue
+            errors.append('Could not save {}: {}'.format(path, future.exception()))
+            if self._saved_versions.get(key) == version:
+                self._saved_versions[key] = None
+                self._failed_versions[key] = version
+        for error in errors:
+            self.save_failed.emit(error)
+        return errors
+
+    @timed('Autosaver.flush')
+    def flush(self, retry_failed: bool = False):
+        self._timer.stop()
+        self._collect_failed()
+        for key, (source, path) in self._sources.items():
+            if self._saved_versions[key] == source.version:
+                continue
+            if not retry_failed and self._failed_versions.get(key) == source.version:
+                # a directory that just refused the write would refuse it again
+                continue
+            self._failed_versions.pop(key, None)
+            # the snapshot is a deep copy taken on the GUI thread,
+            # so the worker never sees a half-edited document
+            target = path()
+            future = self._executor.submit(_write_snapshot, target, source.snapshot())
+            future.add_done_callback(lambda _: self._written.emit())
+            self._saved_versions[key] = source.version
+            count('autosave writes')
+            self._pending.update({key: (future, source.version, target)})
+
+    def close(self) -> List[str]:
+        # waits for the last writes, failed ones are tried once more; the
+        # worker only stops if all of them succeeded, otherwise the errors
+        # are returned and saving goes on
+        self.flush(retry_failed=True)
+        wait([future for future, _, _ in self._pending.values()])
+        errors = self._collect_failed()
+        if not errors:
+            self._timer.stop()
+            self._executor.shutdown(wait=True)
+        return errors
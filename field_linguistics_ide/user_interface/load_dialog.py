@@ -1,18 +1,18 @@
 from pathlib import Path
-from PySide2 import QtWidgets as Qt
-from field_linguistics_ide.user_interface.signals import Signal, StrSignal
+from PySide2 import QtCore, QtWidgets as Qt
 
 
 class ProjectDialog(Qt.QDialog):
+    create_signal = QtCore.Signal()
+    load_signal = QtCore.Signal(str)
+
     def __init__(self):
         super().__init__()
         layout = Qt.QVBoxLayout()
         self.create_button = Qt.QPushButton('Create')
-        self.create_signal = Signal()
         self.create_button.pressed.connect(self.create_project)
         layout.addWidget(self.create_button)
         self.load_button = Qt.QPushButton('Load')
-        self.load_signal = StrSignal()
         self.load_button.pressed.connect(self.load_project)
         layout.addWidget(self.load_button)
         self.setLayout(layout)
@@ -20,11 +20,11 @@ class ProjectDialog(Qt.QDialog):
 
     def closeEvent(self, event):
         if self._no_actions_close:
-            self.create_signal.signal.emit()
+            self.create_signal.emit()
         super().closeEvent(event)
 
     def create_project(self):
-        self.create_signal.signal.emit()
+        self.create_signal.emit()
         self._no_actions_close = False
         self.close()
 
@@ -32,7 +32,7 @@ class ProjectDialog(Qt.QDialog):
         directory = Qt.QFileDialog.getExistingDirectory(
             self, 'Import', str(Path.home()))
         try:
-            self.load_signal.signal.emit(directory)
+            self.load_signal.emit(directory)
             self._no_actions_close = False
             self.close()
         except FileNotFoundError:
@@ -1,16 +1,23 @@
-import json
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Iterable, List, Optional
+from typing import TYPE_CHECKING, Deque, Iterable, List, Optional
 from collections import deque
-from PySide2 import QtGui, QtWidgets as Qt
+# first, so that the startup profile counts the imports below
+from field_linguistics_ide.user_interface.startup import STARTED, StartupProfile
+from PySide2 import QtCore, QtGui, QtWidgets as Qt
+from field_linguistics_ide.instrumentation import timed
+from field_linguistics_ide.user_interface import theme
 from field_linguistics_ide.user_interface.templates.main_window import Ui_MainWindow
+from field_linguistics_ide.user_interface.autosave import Autosaver
 from field_linguistics_ide.user_interface.widgets import DictionaryArea, DocumentArea
-from field_linguistics_ide.loaders.json_loader import JsonLoader
-from field_linguistics_ide.loaders.csv_loader import CSVLoader
-from field_linguistics_ide.types_ import Document, Morpheme, MorphemesDictionary, Token, Line
-from field_linguistics_ide.user_interface.load_dialog import ProjectDialog
+from field_linguistics_ide.project import DICTIONARY_FILE, DOCUMENTS_DIR, \
+    document_paths, load_document, load_documents, load_settings
+from field_linguistics_ide.types_ import Document, MorphemesDictionary
 from field_linguistics_ide.user_interface.widgets.main_area import MainArea
+if TYPE_CHECKING:
+    from field_linguistics_ide.batch_rewrite import Rule
+    from field_linguistics_ide.validation import Problem
 
 
 class UpdateButton(Qt.QPushButton):
@@ -30,36 +37,141 @@ class UpdateButton(Qt.QPushButton):
 
 
 class App(Qt.QMainWindow, Ui_MainWindow):
-    def __init__(self, parent=None):
+    # documents rewritten so far and in total, or an error, sent from the
+    # rewrite thread
+    rewrite_progress = QtCore.Signal(int, int)
+    rewrite_failed = QtCore.Signal(str)
+
+    def __init__(self, parent=None, profile: Optional[StartupProfile] = None):
         super().__init__()
+        self.profile = profile if profile is not None else StartupProfile()
         self.setupUi(self)
         self.parent = parent
         self.actionFrom_JSON.triggered.connect(self.load_json)
         self.actionFrom_CSV.triggered.connect(self.load_csv)
+        self.menuLoad.addAction('From &FLExText').triggered.connect(self.load_flextext)
         self.project_dir: Optional[Path] = None
+        self.doc_dir: Optional[Path] = None
         self._document_areas: List[DocumentArea] = []
+        # documents still to be loaded, and the dictionary changes made
+        # meanwhile, which they get once loaded instead of on disk
+        self._pending_documents: Deque[Path] = deque()
+        self._rules_while_loading: List['Rule'] = []
+        self.autosaver = Autosaver(self)
+        self.autosaver.save_failed.connect(
+            lambda error: self.statusBar().showMessage(error, 10000))
+        # one rewrite at a time, so that they are applied in order
+        self._rewrite_executor = ThreadPoolExecutor(max_workers=1)
+        self.rewrite_progress.connect(self._show_rewrite_progress)
+        self.rewrite_failed.connect(
+            lambda error: self.statusBar().showMessage(error, 10000))
         self.dictionary_area = DictionaryArea(MorphemesDictionary())
         self.dictionary_area.display()
         self.horizontalLayout.addWidget(self.dictionary_area)
         self.tab_area = MainArea()
-        self.tab_area.tab_closed.signal.connect(self.save_all)
-        self.exec_project_dialog()
+        self.tab_area.tab_closed.connect(self.save_all)
+        self.tab_area.tab_closed.connect(
+            lambda: QtCore.QTimer.singleShot(0, self._forget_closed_documents))
         self.update_button = UpdateButton(self._document_areas)
-        self.setWindowTitle('Field Linguistics - {}'.format(self.project_dir.name))
         self.horizontalLayout.addWidget(self.tab_area)
         self.horizontalLayout.addWidget(self.update_button)
         Qt.QShortcut(QtGui.QKeySequence("Ctrl+s"), self, self.save_all)
-        self.doc_dir = self.project_dir / 'documents'
+        export_action = self.menu.addAction('Export document')
+        export_action.triggered.connect(self.export_document)
+        memory_action = self.menu.addAction('Memory report')
+        memory_action.triggered.connect(self.show_memory_report)
 
-    def add_document_area(self, document_area: DocumentArea):
+    def _add_panels(self):
+        # imported and built after the first paint, before any document is open
+        from field_linguistics_ide.search import TranslationIndex
+        from field_linguistics_ide.translation_memory import TranslationMemory
+        from field_linguistics_ide.validation import ConsistencyChecker
+        from field_linguistics_ide.user_interface.widgets.performance_panel import \
+            PerformancePanel
+        from field_linguistics_ide.user_interface.widgets.problems_panel import ProblemsPanel
+        from field_linguistics_ide.user_interface.widgets.search_panel import SearchPanel
+        self.performance_panel = PerformancePanel(self)
+        self.addDockWidget(QtCore.Qt.RightDockWidgetArea, self.performance_panel)
+        self.performance_panel.hide()
+        self.menu.addAction(self.performance_panel.toggleViewAction())
+        self.search_index = TranslationIndex()
+        self.translation_memory = TranslationMemory()
+        self.search_panel = SearchPanel(self.search_index, self.open_line, self)
+        self.addDockWidget(QtCore.Qt.RightDockWidgetArea, self.search_panel)
+        self.search_panel.hide()
+        self.menu.addAction(self.search_panel.toggleViewAction())
+        Qt.QShortcut(QtGui.QKeySequence("Ctrl+Shift+f"), self, self.search_panel.focus_query)
+        self.checker = ConsistencyChecker(self.dictionary_area.model.dictionary)
+        self.problems_panel = ProblemsPanel(self.checker, self.fix_problem, self)
+        self.addDockWidget(QtCore.Qt.BottomDockWidgetArea, self.problems_panel)
+        self.problems_panel.hide()
+        self.menu.addAction(self.problems_panel.toggleViewAction())
+
+    def start(self):
+        # runs from the event loop, after the empty window has been shown
+        self._add_panels()
+        self.profile.mark('panels')
+        self.exec_project_dialog()
+        self.autosaver.track(self.dictionary_area.model.dictionary,
+                             lambda: self.project_dir / DICTIONARY_FILE)
+        self.setWindowTitle('Field Linguistics - {}'.format(self.project_dir.name))
+        self.doc_dir = self.project_dir / DOCUMENTS_DIR
+
+    def paintEvent(self, event: QtGui.QPaintEvent):
+        self.profile.mark_first_paint()
+        super().paintEvent(event)
+
+    def add_document_area(self, document_area: DocumentArea, saved: bool = False):
         self._document_areas.append(document_area)
-        document_area.update_signal.signal.connect(self.update)
+        document = document_area.document
+        self.autosaver.track(document,
+                             lambda: self.document_path(document),
+                             dirty=not saved)
+        document_area.update_signal.connect(self.update)
+        self.search_index.add_document(document)
+        self.checker.add_document(document)
+        self.translation_memory.add_document(document)
+        document_area.translation_memory = self.translation_memory
         self.tab_area.addTab(document_area, document_area.document.name)
 
+    def open_line(self, document: Document, line_id: int):
+        for index in range(self.tab_area.count()):
+            document_area = self.tab_area.widget(index)
+            if document_area.document is document:
+                self.tab_area.setCurrentIndex(index)
+                document_area.show_line(line_id)
+                return
+
+    def _forget_closed_documents(self):
+        # runs after the tab has been removed
+        open_documents = {id(self.tab_area.widget(index).document)
+                          for index in range(self.tab_area.count())}
+        for document_area in list(self._document_areas):
+            if id(document_area.document) not in open_documents:
+                self.autosaver.untrack(document_area.document)
+                self._document_areas.remove(document_area)
+        for document in self.search_index.documents:
+            if id(document) not in open_documents:
+                self.search_index.remove_document(document)
+                self.checker.remove_document(document)
+                self.translation_memory.remove_document(document)
+
+    def fix_problem(self, problem: 'Problem'):
+        self.checker.fix(problem)
+        if problem.morpheme_id is None:
+            return
+        for document_area in self._document_areas:
+            if document_area.document.name != problem.document:
+                continue
+            morpheme_widget = document_area.morphemes_tray.get(problem.morpheme_id)
+            if morpheme_widget is not None:
+                morpheme_widget.reset(document_area.document.morphemes[problem.morpheme_id])
+
     def exec_project_dialog(self):
+        from field_linguistics_ide.user_interface.load_dialog import ProjectDialog
         dialog_window = ProjectDialog()
-        dialog_window.create_signal.signal.connect(self.create_project)
-        dialog_window.load_signal.signal.connect(self.load_project)
+        dialog_window.create_signal.connect(self.create_project)
+        dialog_window.load_signal.connect(self.load_project)
         dialog_window.exec_()
 
     def _create_project_directory(self):
@@ -79,55 +191,64 @@ class App(Qt.QMainWindow, Ui_MainWindow):
 
     def create_project(self):
         self._create_project_directory()
+        self.profile.exclude('project dialog')
         document = Document()
         document.name = 'Unnamed'
         document_area = DocumentArea(document)
         document_area.display()
         self.add_document_area(document_area)
+        self.profile.mark('new document')
+        self.profile.report()
 
     def _load_dictionary(self, path: Path):
         self.dictionary_area.model.dictionary.load_json(path.read_text())
         self.dictionary_area.model.populate()
+        QtCore.QTimer.singleShot(0, self.dictionary_area.tree_view.expandAll)
 
     @staticmethod
     def _load_document(path: Path) -> Document:
-        document = Document()
-        document_json = json.loads(path.read_text())
-        for line_dict in document_json:
-            tokens_dicts = line_dict.pop('tokens')
-            line = Line([], **line_dict)
-            for token_dict in tokens_dicts:
-                morpheme_dicts = token_dict.pop('morphemes')
-                token = Token([], **token_dict)
-                for morpheme_dict in morpheme_dicts:
-                    document.add_morpheme_to_token(
-                        Morpheme(**morpheme_dict), token)
-                document.add_token_to_line(token, line)
-            document.add_line(line)
-        document.name = path.name[:-5]
-        return document
+        return load_document(path)
 
     @staticmethod
     def _load_documents(path: Path) -> Iterable[Document]:
-        for doc_path in path.iterdir():
-            yield App._load_document(doc_path)
+        return load_documents(path)
 
+    @timed('App.load_project')
     def load_project(self, path: str):
+        self.profile.exclude('project dialog')
         self.project_dir = Path(path)
-        documents = None
-        for filename in self.project_dir.iterdir():
-            if filename.name == 'dictionary.json':
-                self._load_dictionary(filename)
-            if filename.name == 'documents':
-                documents = self._load_documents(filename)
-        if documents is None:
+        documents_dir = self.project_dir / DOCUMENTS_DIR
+        if not documents_dir.is_dir():
             raise ValueError('No documents directory found')
-        for document in documents:
-            document_area = DocumentArea(document)
-            document_area.display()
-            self.add_document_area(document_area)
+        # forms in the dictionary are matched the way the project asks
+        self.dictionary_area.model.dictionary.set_profile(
+            load_settings(self.project_dir).profile)
+        dictionary_path = self.project_dir / DICTIONARY_FILE
+        if dictionary_path.exists():
+            self._load_dictionary(dictionary_path)
+        self.profile.mark('dictionary')
+        # one document per event loop iteration keeps the window responsive
+        self._pending_documents = deque(document_paths(documents_dir))
+        self._rules_while_loading = []
+        QtCore.QTimer.singleShot(0, self._display_next_document)
+
+    @timed('App.display_document')
+    def _display_next_document(self):
+        if not self._pending_documents:
+            self._rules_while_loading = []
+            self.profile.mark('documents')
+            self.profile.report()
+            return
+        path = self._pending_documents.popleft()
+        document_area = DocumentArea(self._load_document(path))
+        document_area.display()
+        self.add_document_area(document_area, saved=True)
+        # after tracking, so that the autosaver writes the changes
+        self._apply_rules(document_area, self._rules_while_loading)
+        QtCore.QTimer.singleShot(0, self._display_next_document)
 
     def load_json(self):
+        from field_linguistics_ide.loaders.json_loader import JsonLoader
         file_name = Qt.QFileDialog.getOpenFileName(
             self, 'Import', str(Path.home()))
         try:
@@ -140,16 +261,43 @@ class App(Qt.QMainWindow, Ui_MainWindow):
             pass
 
     def load_csv(self):
+        from field_linguistics_ide.loaders.csv_loader import CSVLoader
         file_name = Qt.QFileDialog.getOpenFileName(
             self, 'Import', str(Path.home()))
         try:
             path = Path(file_name[0])
-            loader = CSVLoader(path, self.dictionary_area.model)
+            dictionary = self.dictionary_area.model.dictionary
+            known_ids = set(dictionary)
+            loader = CSVLoader(path, dictionary)
             loader.load()
+            for dict_id, morpheme in dictionary.items():
+                if dict_id not in known_ids:
+                    self.dictionary_area.model.add_morpheme(morpheme)
             self.display_document(loader.document)
         except FileNotFoundError:
             pass
 
+    def load_flextext(self):
+        from field_linguistics_ide.loaders.flextext_loader import FlexTextLoader
+        file_name = Qt.QFileDialog.getOpenFileName(
+            self, 'Import', str(Path.home()), 'FLExText (*.flextext);;All files (*)')
+        try:
+            path = Path(file_name[0])
+            dictionary = self.dictionary_area.model.dictionary
+            known_ids = set(dictionary)
+            taken = {self.tab_area.widget(index).document.name
+                     for index in range(self.tab_area.count())}
+            if self.doc_dir is not None and self.doc_dir.is_dir():
+                taken.update(path.stem for path in document_paths(self.doc_dir))
+            loader = FlexTextLoader(path, dictionary, taken_names=taken)
+            for document in loader.iter_documents():
+                self.display_document(document)
+            for dict_id, morpheme in dictionary.items():
+                if dict_id not in known_ids:
+                    self.dictionary_area.model.add_morpheme(morpheme)
+        except FileNotFoundError:
+            pass
+
     def display_document(self, document: Document):
         # draw in scroll area
         document_area = DocumentArea(document)
@@ -160,31 +308,77 @@ class App(Qt.QMainWindow, Ui_MainWindow):
         self.dictionary_area.display()
         self.horizontalLayout.addWidget(self.dictionary_area)
 
+    @timed('App.update')
     def update(self):
-        if self.dictionary_area.model.edited_morphemes:
-            while self.dictionary_area.model.edited_morphemes:
-                edited_field, edited_entry = \
-                    self.dictionary_area.model.edited_morphemes.pop()
-                for document_area in self._document_areas:
-                    document_area.update_morphemes(
-                        edited_entry.dict_id,
-                        edited_field,
-                        getattr(edited_entry, edited_field),
-                    )
-        if self.dictionary_area.model.deleted_morphemes:
-            while self.dictionary_area.model.deleted_morphemes:
-                deleted_morpheme = self.dictionary_area.model.deleted_morphemes.pop()
-                for document_area in self._document_areas:
-                    deque(document_area.document.update_morphemes(
-                        deleted_morpheme.dict_id,
-                        'gloss',
-                        '',
-                    ), maxlen=0)
-                    document_area.update_morphemes(deleted_morpheme.dict_id,
-                                                   'dict_id', None)
-        self.save_all()
+        from field_linguistics_ide.batch_rewrite import DeleteEntry, EditEntry
+        rules = []
+        while self.dictionary_area.model.edited_morphemes:
+            edited_field, edited_entry = \
+                self.dictionary_area.model.edited_morphemes.pop()
+            rules.append(EditEntry(edited_entry.dict_id, edited_field,
+                                   getattr(edited_entry, edited_field)))
+        while self.dictionary_area.model.deleted_morphemes:
+            deleted_morpheme = self.dictionary_area.model.deleted_morphemes.pop()
+            rules.append(DeleteEntry(deleted_morpheme.dict_id))
+        if rules:
+            for document_area in self._document_areas:
+                self._apply_rules(document_area, rules)
+            if self._pending_documents:
+                self._rules_while_loading.extend(rules)
+            self.rewrite_closed_documents(rules)
         super().update()
 
+    @staticmethod
+    def _apply_rules(document_area: DocumentArea, rules: List['Rule']):
+        from field_linguistics_ide.batch_rewrite import EditEntry
+        for rule in rules:
+            if isinstance(rule, EditEntry):
+                document_area.update_morphemes(rule.dict_id, rule.field, rule.value)
+                continue
+            deque(document_area.document.update_morphemes(rule.dict_id, 'gloss', ''),
+                  maxlen=0)
+            document_area.update_morphemes(rule.dict_id, 'dict_id', None)
+
+    def rewrite_closed_documents(self, rules: List['Rule']):
+        # documents without a tab only exist on disk, the edits are
+        # queued in the order they were made, newest first
+        if self.doc_dir is None or not self.doc_dir.is_dir():
+            return
+        # the autosaver must not write the files the rewrite writes
+        self._forget_closed_documents()
+        open_names = {self.tab_area.widget(index).document.name
+                      for index in range(self.tab_area.count())}
+        # documents still loading are changed in memory once they are open
+        pending = set(self._pending_documents)
+        paths = [path for path in document_paths(self.doc_dir)
+                 if path.stem not in open_names and path not in pending]
+        if paths:
+            self._rewrite_executor.submit(self._rewrite_in_background, paths,
+                                          list(reversed(rules)))
+
+    def _rewrite_in_background(self, paths: List[Path], rules: List['Rule']):
+        # runs on the rewrite thread, the window only hears from it by signals
+        from field_linguistics_ide.batch_rewrite import rewrite_documents
+        try:
+            # in this thread: a process pool would fork the whole Qt process
+            for done, report in enumerate(rewrite_documents(paths, rules, workers=1), 1):
+                if report.error is not None:
+                    self.rewrite_failed.emit('Could not update {}: {}'.format(
+                        report.name, report.error))
+                self.rewrite_progress.emit(done, len(paths))
+        except Exception as error:
+            self.rewrite_failed.emit('Could not update closed documents: {}'.format(error))
+
+    def _show_rewrite_progress(self, done: int, total: int):
+        if done < total:
+            self.statusBar().showMessage(
+                'Updating closed documents: {} of {}'.format(done, total))
+        else:
+            self.statusBar().showMessage('Updated {} closed documents'.format(total), 5000)
+
+    def document_path(self, document: Document) -> Path:
+        return self.project_dir / 'documents' / '{}.json'.format(document.name)
+
     def save_dictionary(self):
         self.dictionary_area.model.dictionary.save(
             self.project_dir / 'dictionary.json'
@@ -192,24 +386,59 @@ class App(Qt.QMainWindow, Ui_MainWindow):
 
     def save_document_area(self, document_area: DocumentArea):
         self.doc_dir.mkdir(exist_ok=True)
-        document_area.document.save(
-            self.doc_dir / '{}.json'.format(document_area.document.name)
-        )
+        document_area.document.save(self.document_path(document_area.document))
 
+    @timed('App.save_all')
     def save_all(self):
-        self.save_dictionary()
-        for document_area in self._document_areas:
-            self.save_document_area(document_area)
+        self.autosaver.flush()
+
+    def export_document(self):
+        from field_linguistics_ide.exporters import EXPORTERS, EXTENSIONS
+        document_area = self.tab_area.currentWidget()
+        if document_area is None:
+            return
+        filters = ['{} (*.{})'.format(export_format, EXTENSIONS[export_format])
+                   for export_format in EXPORTERS]
+        file_name, chosen_filter = Qt.QFileDialog.getSaveFileName(
+            self, 'Export', str(Path.home() / document_area.document.name),
+            ';;'.join(filters))
+        if not file_name:
+            return
+        export_format = list(EXPORTERS)[filters.index(chosen_filter)]
+        EXPORTERS[export_format](document_area.document).save(Path(file_name))
+
+    def show_memory_report(self):
+        from field_linguistics_ide.user_interface.memory_report import \
+            MemoryReportDialog, report_rows
+        rows = report_rows(self._document_areas, self.dictionary_area)
+        MemoryReportDialog(rows, self).exec_()
 
     def closeEvent(self, event):
-        self.save_all()
+        # rewrites of closed documents are finished, not cut off; the
+        # executor stays usable in case the window is not closed after all
+        self._rewrite_executor.submit(lambda: None).result()
+        errors = self.autosaver.close()
+        if errors:
+            reply = Qt.QMessageBox.warning(
+                self, 'Unsaved changes',
+                '{}\n\nClose anyway and lose these changes?'.format('\n'.join(errors)),
+                Qt.QMessageBox.Yes | Qt.QMessageBox.No, Qt.QMessageBox.No)
+            if reply == Qt.QMessageBox.No:
+                event.ignore()
+                return
         super().closeEvent(event)
 
 
 def main():
+    profile = StartupProfile.from_arguments(sys.argv, started=STARTED)
+    profile.mark('imports')
     app = Qt.QApplication(sys.argv)
-    window = App()
+    theme.apply(app)
+    profile.mark('QApplication')
+    window = App(profile=profile)
+    profile.mark('main window')
     window.showMaximized()
+    QtCore.QTimer.singleShot(0, window.start)
     app.exec_()
 
 
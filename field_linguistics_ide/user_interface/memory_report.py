@@ -0,0 +1,107 @@
+import sys
+import tracemalloc
+from typing import Iterable, List
+from PySide2 import QtCore, QtWidgets as Qt
+from field_linguistics_ide.memory import MemoryRow, document_rows, dictionary_rows, \
+    format_report, rss_bytes
+from field_linguistics_ide.user_interface.widgets import DictionaryArea, DocumentArea
+from field_linguistics_ide.user_interface.widgets.dictionary_area import DictionaryModel
+
+
+def _qobjects(widgets: Iterable[QtCore.QObject]) -> int:
+    return sum(1 + len(widget.findChildren(QtCore.QObject)) for widget in widgets)
+
+
+def widget_rows(document_area: DocumentArea) -> List[MemoryRow]:
+    name = document_area.document.name
+    morphemes = _qobjects(document_area.morphemes_tray.values())
+    tokens = _qobjects(document_area.tokens_tray.values())
+    lines = _qobjects(document_area.lines_tray.values())
+    trays = (document_area.lines_tray, document_area.tokens_tray,
+             document_area.morphemes_tray)
+    # nested widgets are children of their parents, so every layer
+    # counts only the objects that the layer below does not own
+    return [
+        MemoryRow(name, 'line widgets', lines - tokens, 0),
+        MemoryRow(name, 'token widgets', tokens - morphemes, 0),
+        MemoryRow(name, 'morpheme widgets', morphemes, 0),
+        MemoryRow(name, 'tray registries', sum(map(len, trays)),
+                  sum(map(sys.getsizeof, trays))),
+    ]
+
+
+def dictionary_model_rows(model: DictionaryModel) -> List[MemoryRow]:
+    items = len(model.morpheme_text_items) + len(model.morpheme_gloss_items)
+    registries = sys.getsizeof(model.morpheme_text_items) \
+        + sys.getsizeof(model.morpheme_gloss_items)
+    return dictionary_rows(model.dictionary) + [
+        MemoryRow('dictionary', 'dictionary model', items, registries)]
+
+
+def report_rows(document_areas: Iterable[DocumentArea],
+                dictionary_area: DictionaryArea) -> List[MemoryRow]:
+    rows = []
+    for document_area in document_areas:
+        rows.extend(document_rows(document_area.document))
+        rows.extend(widget_rows(document_area))
+    rows.extend(dictionary_model_rows(dictionary_area.model))
+    return rows
+
+
+def process_summary() -> str:
+    summary = 'Process RSS: {:.1f} MiB'.format(rss_bytes() / 2 ** 20)
+    if tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+        summary += ', traced python heap: {:.1f} MiB (peak {:.1f} MiB)'.format(
+            current / 2 ** 20, peak / 2 ** 20)
+    return summary
+
+
+class MemoryReportDialog(Qt.QDialog):
+    COLUMNS = ['Scope', 'Layer', 'Objects', 'KiB']
+
+    def __init__(self, rows: List[MemoryRow], parent: Qt.QWidget = None):
+        super().__init__(parent)
+        self.setWindowTitle('Memory report')
+        self.rows = rows
+        layout = Qt.QVBoxLayout()
+        layout.addWidget(Qt.QLabel(process_summary()))
+        table = Qt.QTableWidget(len(rows), len(self.COLUMNS))
+        table.setHorizontalHeaderLabels(self.COLUMNS)
+        table.setEditTriggers(Qt.QAbstractItemView.NoEditTriggers)
+        for row_index, row in enumerate(rows):
+            table.setItem(row_index, 0, Qt.QTableWidgetItem(row.scope))
+            table.setItem(row_index, 1, Qt.QTableWidgetItem(row.layer))
+            for column, value in ((2, row.objects), (3, round(row.bytes / 1024, 1))):
+                item = Qt.QTableWidgetItem()
+                item.setData(QtCore.Qt.DisplayRole, value)
+                table.setItem(row_index, column, item)
+        table.resizeColumnsToContents()
+        layout.addWidget(table)
+        copy_button = Qt.QPushButton('Copy as text')
+        copy_button.pressed.connect(self.copy)
+        layout.addWidget(copy_button)
+        self.setLayout(layout)
+        self.resize(600, 400)
+
+    def copy(self):
+        Qt.QApplication.clipboard().setText(format_report(self.rows))
+
+
+def measure_widgets(documents) -> List[MemoryRow]:
+    # headless measurement, the caller sets QT_QPA_PLATFORM=offscreen
+    from field_linguistics_ide.types_ import MorphemesDictionary
+    app = Qt.QApplication.instance() or Qt.QApplication([])
+    if DictionaryArea._self is None:
+        DictionaryArea(MorphemesDictionary())
+    rows = []
+    document_areas = []
+    for document in documents:
+        before = rss_bytes()
+        document_area = DocumentArea(document)
+        document_area.display()
+        app.processEvents()
+        rows.extend(widget_rows(document_area))
+        rows.append(MemoryRow(document.name, 'widgets (rss)', 0, rss_bytes() - before))
+        document_areas.append(document_area)
+    return rows
@@ -0,0 +1,65 @@
+import os
+import sys
+import time
+from typing import List, Optional, TextIO, Tuple
+
+PROFILE_FLAG = '--profile-startup'
+PROFILE_ENVIRONMENT_VARIABLE = 'FIELD_LINGUISTICS_PROFILE_STARTUP'
+# seconds from process start until the main window is painted
+FIRST_PAINT_BUDGET = 1.0
+# when this module was imported, which main does before anything else
+STARTED = time.perf_counter()
+
+
+class StartupProfile:
+    def __init__(self, enabled: bool = False, started: Optional[float] = None):
+        self.enabled = enabled
+        self.started = time.perf_counter() if started is None else started
+        self._last = self.started
+        self.phases: List[Tuple[str, float]] = []
+        self.first_paint: Optional[float] = None
+        self._reported = False
+
+    @classmethod
+    def from_arguments(cls, argv: List[str],
+                       started: Optional[float] = None) -> 'StartupProfile':
+        enabled = PROFILE_FLAG in argv \
+            or bool(os.environ.get(PROFILE_ENVIRONMENT_VARIABLE))
+        if PROFILE_FLAG in argv:
+            argv.remove(PROFILE_FLAG)
+        return cls(enabled, started)
+
+    def mark(self, phase: str):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last))
+        self._last = now
+
+    def mark_first_paint(self):
+        if self.first_paint is None:
+            self.mark('first paint')
+            self.first_paint = time.perf_counter() - self.started
+
+    def exclude(self, phase: str):
+        # for phases spent waiting on the user, e.g. in the project dialog
+        self.mark('({})'.format(phase))
+
+    def report(self, file: TextIO = sys.stderr):
+        if not self.enabled or self._reported:
+            return
+        self._reported = True
+        total = sum(duration for phase, duration in self.phases
+                    if not phase.startswith('('))
+        width = max(len(phase) for phase, _ in self.phases) if self.phases else 0
+        print('Startup profile:', file=file)
+        for phase, duration in self.phases:
+            print('  {:<{width}}  {:8.1f} ms'.format(
+                phase, duration * 1000, width=width), file=file)
+        print('  {:<{width}}  {:8.1f} ms'.format(
+            'total', total * 1000, width=width), file=file)
+        if self.first_paint is not None:
+            status = 'over budget' if self.first_paint > FIRST_PAINT_BUDGET else 'ok'
+            print('  time to first paint: {:.1f} ms ({}, budget {:.0f} ms)'.format(
+                self.first_paint * 1000, status, FIRST_PAINT_BUDGET * 1000),
+                file=file)
@@ -0,0 +1,34 @@
+from typing import Any
+from PySide2 import QtWidgets as Qt
+
+# One stylesheet for the whole application, parsed once. Widgets only
+# flip the dynamic properties below and get re-polished, so a focus
+# change no longer parses a stylesheet of its own.
+FOCUSED = 'focused'
+NOT_IN_DICTIONARY = 'notInDictionary'
+
+STYLESHEET = '''
+*[focused="true"] {
+    background: gray;
+}
+QLabel[notInDictionary="true"] {
+    border-bottom-width: 1px;
+    border-bottom-style: solid;
+    border-radius: 0px;
+    border-color: brown;
+}
+'''
+
+
+def apply(app: Qt.QApplication):
+    app.setStyleSheet(STYLESHEET)
+
+
+def set_state(widget: Qt.QWidget, name: str, value: Any):
+    if widget.property(name) == value:
+        return
+    widget.setProperty(name, value)
+    style = widget.style()
+    style.unpolish(widget)
+    style.polish(widget)
+    widget.update()
@@ -4,8 +4,16 @@ from PySide2 import QtWidgets as Qt
 class ScrollArea(Qt.QScrollArea):
     def __init__(self,):
         super().__init__()
+        self._create_contents()
+        self.setWidgetResizable(True)
+
+    def _create_contents(self):
         content_widget = Qt.QWidget()
         self.setWidget(content_widget)
         # layout inside the scroll area
         self.flay = Qt.QVBoxLayout(content_widget)
-        self.setWidgetResizable(True)
+
+    def replace_contents(self):
+        # deleting the old content widget deletes every widget inside it
+        self.takeWidget().deleteLater()
+        self._create_contents()
@@ -1,6 +1,7 @@
 from collections import deque
 from typing import Deque, Dict, List, Optional, Tuple
 from PySide2 import QtWidgets as Qt, QtCore, QtGui
+from field_linguistics_ide.fuzzy import FuzzyIndex
 from field_linguistics_ide.types_ import MorphemesDictionary, Morpheme
 from field_linguistics_ide.user_interface.widgets.common import ScrollArea
 
@@ -194,6 +195,8 @@ class DictionaryArea(ScrollArea):
                                           Qt.QSizePolicy.Expanding))
         # Qt.QShortcut(QtGui.QKeySequence("Ctrl+z"), self, self.ctrl_z_action)
         self.model = DictionaryModel(dictionary)
+        # entries close to a morpheme, for the morpheme widgets
+        self.fuzzy_index = FuzzyIndex(dictionary)
         __class__._self = self
         self.tree_view = TreeView(self.model)
 
@@ -1,5 +1,6 @@
 from typing import Any
 from PySide2 import QtCore, QtGui, QtWidgets as Qt
+from field_linguistics_ide.user_interface import theme
 from field_linguistics_ide.user_interface.widgets.dictionary_area import DictionaryArea
 
 
@@ -56,13 +57,15 @@ class EditableWidgetsArea(Qt.QWidget):
         self.layout = Qt.QVBoxLayout()
         self.setLayout(self.layout)
         self.setFocusPolicy(QtCore.Qt.FocusPolicy.StrongFocus)
+        # plain QWidget subclasses only paint a stylesheet background with this
+        self.setAttribute(QtCore.Qt.WA_StyledBackground, True)
         self.connect_editable_labels()
 
     def focusInEvent(self, _):
-        self.setStyleSheet('background: gray;')
+        theme.set_state(self, theme.FOCUSED, True)
 
     def focusOutEvent(self, _):
-        self.setStyleSheet('')
+        theme.set_state(self, theme.FOCUSED, False)
 
     def reset(self, data: Any):
         pass
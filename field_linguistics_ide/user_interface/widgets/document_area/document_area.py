@@ -1,11 +1,12 @@
 from collections import deque
 from typing import Callable, Deque, Optional, Tuple
 from contextlib import contextmanager
-from PySide2 import QtGui, QtWidgets as Qt
+from PySide2 import QtCore, QtGui, QtWidgets as Qt
 
+from field_linguistics_ide.instrumentation import timed
+from field_linguistics_ide.translation_memory import TranslationMemory
 from field_linguistics_ide.types_ import Document, Line, Morpheme, Token
 from field_linguistics_ide.user_interface.items import VSpacer
-from field_linguistics_ide.user_interface.signals import Signal
 from field_linguistics_ide.user_interface.widgets.common import ScrollArea
 from field_linguistics_ide.user_interface.widgets.dictionary_area import DictionaryArea
 from field_linguistics_ide.user_interface.widgets.document_area.common import Tray
@@ -24,6 +25,11 @@ class AddLineButton(Qt.QPushButton):
 
 
 class DocumentArea(ScrollArea):
+    # lines built before the first paint, then per event loop iteration
+    FIRST_CHUNK = 40
+    CHUNK = 20
+    update_signal = QtCore.Signal()
+
     def __init__(self, document: Document):
         self.dictionary_area = DictionaryArea.get_instance()
         super().__init__()
@@ -31,26 +37,127 @@ class DocumentArea(ScrollArea):
         self.tokens_tray = Tray()
         self.morphemes_tray = Tray()
         self.document = document
+        # offers glosses of similar lines, set by the application
+        self.translation_memory: Optional[TranslationMemory] = None
         self.editing_morphemes: Deque[MorphemeWidget] = deque()
         self.editing_translations: Deque[TranslationWidget] = deque()
         self.deleted_morphemes: Deque[Tuple[int, int, Morpheme]] = deque()
         self.spacer = VSpacer()
         self.add_line_button = AddLineButton(self.add_line)
         Qt.QShortcut(QtGui.QKeySequence("Ctrl+z"), self, self.ctrl_z_action)
-        self.update_signal = Signal()
+        self.hibernated = False
+        self._scroll_position = 0
+        # set while a woken tab waits for its lines to get back to it
+        self._restore_scroll = False
+        self._pending_lines: Deque[Line] = deque()
+        self._render_timer = QtCore.QTimer(self)
+        self._render_timer.setInterval(0)
+        self._render_timer.timeout.connect(self._render_next_chunk)
+
+    @property
+    def widget_count(self) -> int:
+        return len(self.lines_tray) + len(self.tokens_tray) + len(self.morphemes_tray)
 
+    def hibernate(self):
+        # drops all widgets, the document and the undo stack stay
+        if self.hibernated:
+            return
+        self.stop_editing()
+        self.cancel_rendering()
+        self._scroll_position = self.verticalScrollBar().value()
+        self.lines_tray.clear()
+        self.tokens_tray.clear()
+        self.morphemes_tray.clear()
+        self.replace_contents()
+        self.spacer = VSpacer()
+        self.add_line_button = AddLineButton(self.add_line)
+        self.hibernated = True
+
+    def wake(self):
+        if not self.hibernated:
+            return
+        self.hibernated = False
+        self._restore_scroll = True
+        self.display()
+        if not self._pending_lines:
+            self._restore_scroll_position()
+
+    def _restore_scroll_position(self):
+        # only once every line is back, before that the value would be
+        # clamped to the height of the lines rendered so far
+        self._restore_scroll = False
+        QtCore.QTimer.singleShot(
+            0, lambda: self.verticalScrollBar().setValue(self._scroll_position))
+
+    @timed('DocumentArea.display')
     def display(self):
-        line_index = 0
-        for line in self.document.data:
-            line_widget = LineWidget(line, self)
-            line_widget.add_line.signal.connect(self.add_line)
-            self.lines_tray.update({line.id_: line_widget})
-            # add to the grid in the scroll area
-            self.flay.addWidget(line_widget)
-            line_index += 1
         self.flay.addWidget(self.add_line_button)
         # spacer at the end of the layout to prevent stretching
         self.flay.addItem(self.spacer)
+        # lines added later with add_line are not rendered twice
+        self._pending_lines = deque(self.document.data)
+        self._render_chunk(self.FIRST_CHUNK)
+        if self._pending_lines:
+            self._render_timer.start()
+
+    @property
+    def rendering(self) -> bool:
+        return bool(self._pending_lines)
+
+    def cancel_rendering(self):
+        self._render_timer.stop()
+        self._pending_lines.clear()
+        self._restore_scroll = False
+
+    def _render_next_chunk(self):
+        self._render_chunk(self.CHUNK)
+        if not self._pending_lines:
+            self._render_timer.stop()
+            if self._restore_scroll:
+                self._restore_scroll_position()
+
+    @timed('DocumentArea.render_chunk')
+    def _render_chunk(self, size: int):
+        contents = self.widget()
+        # one relayout per chunk instead of one per added line
+        contents.setUpdatesEnabled(False)
+        self.flay.setEnabled(False)
+        try:
+            for _ in range(min(size, len(self._pending_lines))):
+                line = self._pending_lines.popleft()
+                if line.id_ not in self.document.lines:
+                    continue
+                line_widget = LineWidget(line, self)
+                line_widget.add_line.connect(self.add_line)
+                self.lines_tray.update({line.id_: line_widget})
+                # the layout mirrors the document, every line before
+                # this one is rendered already
+                self.flay.insertWidget(self.document.line_position(line.id_), line_widget)
+        finally:
+            self.flay.setEnabled(True)
+            self.flay.activate()
+            contents.setUpdatesEnabled(True)
+
+    def show_line(self, line_id: int):
+        if self.hibernated:
+            self.wake()
+        # the line decides where to scroll, not the old position
+        self._restore_scroll = False
+        # lines before it are rendered first, the rest keeps coming in chunks
+        while line_id not in self.lines_tray and self._pending_lines:
+            self._render_chunk(self.CHUNK)
+        if not self._pending_lines:
+            self._render_timer.stop()
+        line_widget = self.lines_tray.get(line_id)
+        if line_widget is None:
+            return
+        self.stop_editing()
+        # after the new widgets have been laid out
+        QtCore.QTimer.singleShot(0, lambda: self.ensureWidgetVisible(line_widget))
+
+    def closeEvent(self, event: QtGui.QCloseEvent):
+        self.cancel_rendering()
+        super().closeEvent(event)
 
     def stop_editing(self):
         while self.editing_morphemes:
@@ -60,7 +167,7 @@ class DocumentArea(ScrollArea):
 
     def mousePressEvent(self, _):
         self.stop_editing()
-        self.update_signal.signal.emit()
+        self.update_signal.emit()
 
     def ctrl_z_action(self):
         if not self.deleted_morphemes:
@@ -69,7 +176,7 @@ class DocumentArea(ScrollArea):
         morpheme_widget = MorphemeWidget.from_deleted(*morpheme_data, self)
         token_id, position, morpheme = morpheme_data
         self.morphemes_tray.update({morpheme.id_: morpheme_widget})
-        self.tokens_tray[token_id].insert_widget(position, morpheme_widget)
+        self.tokens_tray[token_id].insert_morpheme(position, morpheme_widget)
 
     @contextmanager
     def _no_spacer_and_add_button(self):
@@ -95,8 +202,11 @@ class DocumentArea(ScrollArea):
                          new_value: Optional[str]):
         morphemes = self.document.update_morphemes(dict_id, field, new_value)
         for morpheme in morphemes:
-            self.morphemes_tray[morpheme.id_].reset(morpheme)
+            # hibernated documents have no widgets to reset
+            morpheme_widget = self.morphemes_tray.get(morpheme.id_)
+            if morpheme_widget is not None:
+                morpheme_widget.reset(morpheme)
 
     def update(self):
-        self.update_signal.signal.emit()
+        self.update_signal.emit()
         super().update()
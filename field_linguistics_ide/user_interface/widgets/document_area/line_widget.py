@@ -1,10 +1,14 @@
 from collections import deque
+from functools import partial
 from typing import Callable, Iterable
 from contextlib import contextmanager
-from PySide2 import QtGui, QtWidgets as Qt
+from PySide2 import QtCore, QtGui, QtWidgets as Qt
+from field_linguistics_ide.exporters import EXPORTERS
+from field_linguistics_ide.exporters.html_exporter import HtmlExporter
+from field_linguistics_ide.instrumentation import timed
+from field_linguistics_ide.translation_memory import copy_analysis, line_text
 from field_linguistics_ide.types_ import Line, Morpheme, Token
 from field_linguistics_ide.user_interface.items import HSpacer
-from field_linguistics_ide.user_interface.signals import Signal
 from field_linguistics_ide.user_interface.widgets.document_area.common import EditableLabel, EditableWidgetsArea
 from field_linguistics_ide.user_interface.widgets.document_area.token_widget import TokenWidget
 
@@ -51,7 +55,6 @@ class TokensLayout(Qt.QHBoxLayout):
     def __init__(self, token_widgets: Iterable[TokenWidget], add_token_action: Callable):
         super().__init__()
         self._add_token_action = add_token_action
-        self._token_widgets = []
         self.spacer = HSpacer()
         self.add_token_button = AddTokenButton(self._add_token_action)
         deque(map(self.add_token, token_widgets), maxlen=0)
@@ -59,10 +62,6 @@ class TokensLayout(Qt.QHBoxLayout):
         self.addItem(self.spacer)
         self.deleted_tokens = []
 
-    @property
-    def _token_index(self) -> int:
-        return len(self._token_widgets)
-
     @contextmanager
     def _no_spacer_and_button(self):
         try:
@@ -74,16 +73,11 @@ class TokensLayout(Qt.QHBoxLayout):
             self.addItem(self.spacer)
 
     def add_token(self, token_widget: TokenWidget):
-        token_widget.index = self._token_index
-        self._token_widgets.append(token_widget)
         self.addWidget(token_widget)
 
-    def remove_token(self, token_id: int):
-        for token_widget in self._token_widgets:
-            if token_id:
-                self.deleted_tokens.append(token_widget)
-                self.removeWidget(token_widget)
-                break
+    def remove_token(self, token_widget: TokenWidget):
+        self.deleted_tokens.append(token_widget)
+        self.removeWidget(token_widget)
 
     def _show_tokens(self):
         tokens = []
@@ -95,32 +89,23 @@ class TokensLayout(Qt.QHBoxLayout):
         from pprint import pprint
         pprint(tokens)
 
-    def _insert_token(self, position: int, token_widget: TokenWidget):
-        new_token_widgets = []
-        while self.count():
-            widget_item = self.takeAt(0)
-            if widget_item is not None:
-                widget = widget_item.widget()
-                new_token_widgets.append(widget)
-
-        self._token_widgets = []
-        for new_token_widget in new_token_widgets:
-            self.add_token(new_token_widget)
-            if self._token_index == position:
-                self.add_token(token_widget)
-
     def insert_token(self, position: int, token_widget: TokenWidget):
-        self._insert_token(position, token_widget)
+        # token widgets come first, in document order, so the position
+        # in the line is the position in the layout
+        self.insertWidget(position, token_widget)
 
     def add(self, position: int, token_widget: TokenWidget):
-        with self._no_spacer_and_button():
-            if position < 0:
+        if position < 0:
+            with self._no_spacer_and_button():
                 self.add_token(token_widget)
-            else:
-                self.insert_token(position, token_widget)
+        else:
+            self.insert_token(position, token_widget)
 
 
 class LineWidget(Qt.QWidget):
+    add_line = QtCore.Signal()
+
+    @timed('LineWidget.__init__')
     def __init__(self, line: Line, document_area: 'DocumentArea'):
         self.line = line
         self.document_area = document_area
@@ -135,26 +120,60 @@ class LineWidget(Qt.QWidget):
         self.line_layout.addWidget(Qt.QLabel())
         self.setObjectName(f'line_widget{line.id_}')
         self.setLayout(self.line_layout)
-        self.add_line = Signal()
+
+    def _create_token_widget(self, token: Token) -> TokenWidget:
+        token_widget = TokenWidget(token, self.document_area)
+        token_widget.add_right.connect(self.add_token)
+        self.document_area.tokens_tray.update({token.id_: token_widget})
+        return token_widget
 
     def _create_tokens_widgets(self, line: Line) -> Iterable[TokenWidget]:
         for token in line.tokens:
-            token_widget = TokenWidget(token, self.document_area)
-            token_widget.add_right.signal.connect(self.add_token)
-            self.document_area.tokens_tray.update({token.id_: token_widget})
-            yield token_widget
+            yield self._create_token_widget(token)
 
     def add_token(self, position: int = -1):
         token = Token([])
         morpheme = Morpheme('', '', is_stem=True)
         self.document_area.document.add_morpheme_to_token(morpheme, token)
         self.document_area.document.add_token_to_line(token, self.line, position=position)
-        token_widget = TokenWidget(token, self.document_area)
-        self.document_area.tokens_tray.update({token.id_: token_widget})
-        token_widget.add_right.signal.connect(self.add_token)
+        token_widget = self._create_token_widget(token)
         self.tokens_layout.add(position, token_widget)
         self.dumpObjectTree()
 
+    def copy_analysis_from(self, source: Line):
+        morphemes_tray = self.document_area.morphemes_tray
+        old_morphemes = {token.id_: [morpheme.id_ for morpheme in token.morphemes]
+                         for token in self.line.tokens}
+        for token in copy_analysis(self.document_area.document, self.line, source):
+            for morpheme_id in old_morphemes[token.id_]:
+                if morpheme_id in morphemes_tray:
+                    morphemes_tray.pop(morpheme_id)
+            old_widget = self.document_area.tokens_tray[token.id_]
+            self.tokens_layout.replaceWidget(old_widget, self._create_token_widget(token))
+            old_widget.deleteLater()
+
+    def _add_similar_lines_menu(self, menu: Qt.QMenu):
+        translation_memory = self.document_area.translation_memory
+        if translation_memory is None:
+            return
+        matches = translation_memory.similar_lines(self.document_area.document, self.line.id_)
+        similar_menu = menu.addMenu('Copy glosses from')
+        similar_menu.setEnabled(bool(matches))
+        for match in matches:
+            source = match.document.lines[match.line_id]
+            copy_action = similar_menu.addAction('{:.0%} {}: {}'.format(
+                match.similarity, match.document.name, line_text(source)))
+            copy_action.setToolTip(source.translation)
+            copy_action.triggered.connect(partial(self.copy_analysis_from, source))
+
+    def copy_as(self, export_format: str):
+        document = self.document_area.document
+        mime_data = QtCore.QMimeData()
+        mime_data.setText(EXPORTERS[export_format](document).to_string([self.line]))
+        if export_format == 'html':
+            mime_data.setHtml(HtmlExporter(document, standalone=False).to_string([self.line]))
+        Qt.QApplication.clipboard().setMimeData(mime_data)
+
     def closeEvent(self, _):
         self.document_area.lines_tray.pop(self.line.id_)
         self.document_area.document.pop_line(self.line.id_)
@@ -163,11 +182,16 @@ class LineWidget(Qt.QWidget):
         menu: Qt.QMenu = Qt.QMenu()
         add_action = Qt.QAction('Add new')
         add_action.setText('Add new')
-        add_action.triggered.connect(self.add_line.signal.emit)
+        add_action.triggered.connect(self.add_line.emit)
         menu.addAction(add_action)
         delete_action = Qt.QAction('Delete')
         delete_action.setText('Delete')
         delete_action.triggered.connect(self.close)
         menu.addAction(delete_action)
+        copy_menu = menu.addMenu('Copy as')
+        for export_format in EXPORTERS:
+            copy_action = copy_menu.addAction(export_format)
+            copy_action.triggered.connect(partial(self.copy_as, export_format))
+        self._add_similar_lines_menu(menu)
         menu.exec_(menu_event.globalPos())
         menu.deleteLater()
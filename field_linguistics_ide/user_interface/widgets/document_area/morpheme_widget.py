@@ -1,11 +1,19 @@
+from functools import partial
+from typing import Callable, Optional
 from PySide2 import QtCore, QtGui, QtWidgets as Qt
+from field_linguistics_ide.instrumentation import timed
 from field_linguistics_ide.types_ import Morpheme
-from field_linguistics_ide.user_interface.signals import BoolSignal, IntSignal
+from field_linguistics_ide.user_interface import theme
 from field_linguistics_ide.user_interface.widgets.document_area.common import EditableLabel, EditableWidgetsArea
 from field_linguistics_ide.user_interface.widgets.dictionary_area import DictionaryArea
 
 
 class DictionaryActions(Qt.QWidget):
+    check_in_dict = QtCore.Signal(bool)
+    # dict_id of a suggested entry the user picked
+    link_to_entry = QtCore.Signal(int)
+    SUGGESTIONS = 10
+
     def __init__(self, morpheme: Morpheme):
         self.morpheme = morpheme
         self._start_text = self.morpheme.text
@@ -24,14 +32,13 @@ class DictionaryActions(Qt.QWidget):
         self.layout_.addWidget(self.edit)
         self.add.pressed.connect(self._add_to_dictionary)
         self.edit.pressed.connect(self._edit_dictionary)
-        self.check_in_dict = BoolSignal()
         self.update()
 
     def update(self):
         if self.morpheme.dict_id is None:
-            self.check_in_dict.signal.emit(False)
+            self.check_in_dict.emit(False)
         else:
-            self.check_in_dict.signal.emit(True)
+            self.check_in_dict.emit(True)
         if self.morpheme.text == self._start_text \
                 and self.morpheme.gloss == self._start_gloss:
             self.add.setEnabled(False)
@@ -48,21 +55,37 @@ class DictionaryActions(Qt.QWidget):
         self.dictionary.model.edit_or_add(self.morpheme)
         self.update()
 
+    def suggestions_menu(self, parent: Qt.QMenu) -> Qt.QMenu:
+        # built when the context menu opens, not for every morpheme widget
+        entries = self.dictionary.model.dictionary
+        menu = Qt.QMenu('Similar entries', parent)
+        for suggestion in self.dictionary.fuzzy_index.suggest(self.morpheme, self.SUGGESTIONS):
+            entry = entries[suggestion.dict_id]
+            action = menu.addAction('{} - {}'.format(entry.text, entry.gloss))
+            action.triggered.connect(partial(self.link_to_entry.emit, suggestion.dict_id))
+        if menu.isEmpty():
+            menu.addAction('No similar entries').setEnabled(False)
+        return menu
+
 
 class MorphemeTextLabel(EditableLabel):
+    split = QtCore.Signal(int)
+
     def __init__(self, text: str):
         super().__init__(text)
         self.editable.contextMenuEvent = self.context_menu_event
-        self.split = IntSignal()
-        self.split.signal.connect(lambda x: print(x, len(self.editable.text())))
+        # builds the submenu of similar dictionary entries
+        self.suggestions_menu: Optional[Callable[[Qt.QMenu], Qt.QMenu]] = None
 
     def context_menu_event(self, menu_event: QtGui.QContextMenuEvent):
         menu: Qt.QMenu = self.editable.createStandardContextMenu()
         action = Qt.QAction('Split')
         action.setText('Split')
         action.triggered.connect(
-            lambda *_: self.split.signal.emit(self.editable.cursorPosition()))
+            lambda *_: self.split.emit(self.editable.cursorPosition()))
         menu.addAction(action)
+        if self.suggestions_menu is not None:
+            menu.addMenu(self.suggestions_menu(menu))
         menu.exec_(menu_event.globalPos())
         menu.deleteLater()
 
@@ -72,33 +95,33 @@ class MorphemeGlossLabel(EditableLabel):
         super().__init__(text)
 
     def highlight_not_in_dict(self, in_dict: bool):
-        if in_dict:
-            self.fixed.setStyleSheet('')
-        else:
-            self.fixed.setStyleSheet(
-                'border-bottom-width: 1px;'
-                'border-bottom-style: solid;'
-                'border-radius: 0px;'
-                'border-color: brown;'
-            )
+        theme.set_state(self.fixed, theme.NOT_IN_DICTIONARY, not in_dict)
 
 
 class MorphemeWidget(EditableWidgetsArea):
+    split = QtCore.Signal(int)
+
+    @timed('MorphemeWidget.__init__')
     def __init__(self, morpheme: Morpheme, document_area: 'DocumentArea'):
-        self.index = None
         self._document_area = document_area
         self.morpheme = morpheme
         self.text_widget = MorphemeTextLabel(morpheme.text)
         self.gloss_widget = MorphemeGlossLabel(morpheme.gloss)
         self.dictionary_actions = DictionaryActions(morpheme)
-        self.dictionary_actions.check_in_dict.signal.connect(
+        self.dictionary_actions.check_in_dict.connect(
             self.gloss_widget.highlight_not_in_dict)
+        self.dictionary_actions.link_to_entry.connect(self.link_to_entry)
+        self.text_widget.suggestions_menu = self.dictionary_actions.suggestions_menu
         super().__init__()
         self.layout.addWidget(self.text_widget)
         self.layout.addWidget(self.gloss_widget)
         self.layout.addWidget(self.dictionary_actions)
-        self.split = IntSignal()
-        self.text_widget.split.signal.connect(self.split.signal.emit)
+        # signal to signal, no Python slot in between
+        self.text_widget.split.connect(self.split)
+
+    @property
+    def index(self) -> int:
+        return self._document_area.document.morpheme_position(self.morpheme.id_)
 
     def text(self) -> str:
         return self.text_widget.text()
@@ -144,6 +167,15 @@ class MorphemeWidget(EditableWidgetsArea):
         self.update_document('gloss', self.gloss_widget)
         self.dictionary_actions.update()
 
+    def link_to_entry(self, dict_id: int):
+        # the morpheme takes the form, gloss and class of the entry
+        entry = self.dictionary_actions.dictionary.model.dictionary[dict_id]
+        for field in ('text', 'gloss', 'is_stem', 'dict_id'):
+            self._document_area.document.update_morpheme(self.morpheme.id_, field,
+                                                         getattr(entry, field))
+        self.reset(self.morpheme)
+        self.dictionary_actions.update()
+
     def set_morpheme_dict_id_none(self, _):
         self.morpheme.dict_id = None
 
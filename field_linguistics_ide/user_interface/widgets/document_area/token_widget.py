@@ -1,14 +1,16 @@
-from typing import Iterable, Optional
+from typing import Iterable
 from PySide2 import QtCore, QtGui, QtWidgets as Qt
+from field_linguistics_ide.instrumentation import timed
 from field_linguistics_ide.types_ import Morpheme, Token
-from field_linguistics_ide.user_interface.signals import IntSignal
 from field_linguistics_ide.user_interface.widgets.document_area.common import Tray
 from field_linguistics_ide.user_interface.widgets.document_area.morpheme_widget import MorphemeWidget
 
 
 class TokenWidget(Qt.QGroupBox):
+    add_right = QtCore.Signal(int)
+
+    @timed('TokenWidget.__init__')
     def __init__(self, token: Token, document_area: 'DocumentArea'):
-        self.index: Optional[int] = None
         self.token = token
         self.document_area = document_area
         self.morphemes_tray = Tray()
@@ -22,35 +24,34 @@ class TokenWidget(Qt.QGroupBox):
             self.layout.addWidget(morpheme_widget)
         self.setLayout(self.layout)
         # self.closed.connect(p)
-        self.add_right = IntSignal()
 
     def _create_morpheme_widgets(self) -> Iterable[MorphemeWidget]:
-        for morpheme_index, morpheme in enumerate(self.token.morphemes):
+        for morpheme in self.token.morphemes:
             morpheme_widget = MorphemeWidget(morpheme, self.document_area)
-            morpheme_widget.index = morpheme_index
-            morpheme_widget.split.signal.connect(
-                lambda pos: self.split_morpheme(morpheme_widget, pos)
-            )
+            morpheme_widget.split.connect(self._split_requested)
             yield morpheme_widget
 
+    @property
+    def index(self) -> int:
+        return self.document_area.document.token_position(self.token.id_)
+
     def __repr__(self):
         return '{cls}(index={index}, token={token})'.format(
             cls=type(self).__name__, index=self.index, token=self.token)
 
     def closeEvent(self, _):
         self.document_area.document.pop_token(self.token.id_)
+        # removes the widget from the layout, which mirrors the line
+        self.document_area.tokens_tray.pop(self.token.id_)
         super().close()
 
     def insert_morpheme(self, position: int, widget: MorphemeWidget):
+        widget.split.connect(self._split_requested)
         self.layout.insertWidget(position, widget)
 
-    def reindex(self):
-        widgets = []
-        while self.layout.count():
-            widget = self.layout.takeAt(0).widget()
-            widgets.append(widget)
-        for widget in widgets:
-            self.layout.addWidget(widget)
+    def _split_requested(self, split_position: int):
+        # one slot for all morphemes of the token instead of a lambda each
+        self.split_morpheme(self.sender(), split_position)
 
     def split_morpheme(self, morpheme_widget: MorphemeWidget, split_position: int):
         text = morpheme_widget.text()
@@ -58,18 +59,18 @@ class TokenWidget(Qt.QGroupBox):
         morpheme.text = text[:split_position]
         morpheme_widget.reset(morpheme)
         new_morpheme = Morpheme(text[split_position:], None)
+        position = morpheme_widget.index + 1
         self.document_area.document.add_morpheme_to_token(
-            new_morpheme, self.token, position=morpheme_widget.index+1)
-        self.document_area.morphemes_tray.update({morpheme_widget.morpheme.id_: morpheme_widget})
+            new_morpheme, self.token, position=position)
         new_morpheme_widget = MorphemeWidget(new_morpheme, self.document_area)
-        self.insert_morpheme(morpheme_widget.index+1, new_morpheme_widget)
-        self.reindex()
+        self.document_area.morphemes_tray.update({new_morpheme.id_: new_morpheme_widget})
+        self.insert_morpheme(position, new_morpheme_widget)
 
     def contextMenuEvent(self, menu_event: QtGui.QContextMenuEvent):
         menu = Qt.QMenu()
         action_add_right = Qt.QAction('Add token')
         action_add_right.setText('Add token')
-        action_add_right.triggered.connect(lambda: self.add_right.signal.emit(self.index + 1))
+        action_add_right.triggered.connect(lambda: self.add_right.emit(self.index + 1))
         menu.addAction(action_add_right)
         action_delete = Qt.QAction('Delete token')
         action_delete.setText('Delete token')
@@ -1,20 +1,70 @@
-from PySide2 import QtWidgets as Qt
-from field_linguistics_ide.user_interface.signals import Signal
+import time
+from typing import Dict
+from PySide2 import QtCore, QtWidgets as Qt
 
 
 class MainArea(Qt.QTabWidget):
+    # seconds a tab may stay in the background before its widgets are dropped
+    HIBERNATE_AFTER = 30 * 60
+    # line, token and morpheme widgets kept alive over all tabs
+    WIDGET_BUDGET = 60000
+    CHECK_INTERVAL = 60 * 1000
+    tab_closed = QtCore.Signal()
+
     def __init__(self):
         super().__init__()
         self.setMovable(True)
         self.setTabsClosable(True)
-        self.tab_closed = Signal()
         self.tabCloseRequested.connect(self.close_tab)
+        self._current_widget = None
+        self._inactive_since: Dict[Qt.QWidget, float] = {}
+        self.currentChanged.connect(self._activate)
+        self._hibernation_timer = QtCore.QTimer(self)
+        self._hibernation_timer.setInterval(self.CHECK_INTERVAL)
+        self._hibernation_timer.timeout.connect(self.hibernate_inactive)
+        self._hibernation_timer.start()
+
+    def _activate(self, current_index):
+        if self._current_widget is not None:
+            self._inactive_since[self._current_widget] = time.monotonic()
+        current_widget = self.widget(current_index)
+        self._current_widget = current_widget
+        if current_widget is None:
+            return
+        self._inactive_since.pop(current_widget, None)
+        if getattr(current_widget, 'hibernated', False):
+            current_widget.wake()
+
+    def addTab(self, widget: Qt.QWidget, label: str) -> int:
+        self._inactive_since[widget] = time.monotonic()
+        return super().addTab(widget, label)
+
+    def hibernate_inactive(self):
+        now = time.monotonic()
+        # least recently used first
+        candidates = sorted(
+            ((since, widget) for widget, since in self._inactive_since.items()
+             if not widget.hibernated),
+            key=lambda candidate: candidate[0],
+        )
+        live_widgets = sum(self.widget(index).widget_count
+                           for index in range(self.count())
+                           if not self.widget(index).hibernated)
+        for since, widget in candidates:
+            if now - since > self.HIBERNATE_AFTER or live_widgets > self.WIDGET_BUDGET:
+                live_widgets -= widget.widget_count
+                widget.hibernate()
 
     def close_tab(self, current_index):
         current_widget = self.widget(current_index)
+        if current_widget is self._current_widget:
+            self._current_widget = None
+        # hidden tabs get no close event, stop their background rendering too
+        current_widget.cancel_rendering()
         current_widget.close()
-        self.tab_closed.signal.emit()
+        self.tab_closed.emit()
         self.removeTab(current_index)
+        self._inactive_since.pop(current_widget, None)
 
     # def tabCloseRequested(self, *args, **kwargs):
     #     print()
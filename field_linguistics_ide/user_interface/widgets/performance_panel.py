@@ -0,0 +1,89 @@
+from pathlib import Path
+from PySide2 import QtCore, QtWidgets as Qt
+from field_linguistics_ide import instrumentation
+
+
+class PerformancePanel(Qt.QDockWidget):
+    REFRESH_INTERVAL = 1000
+    COLUMNS = ['Span', 'Calls', 'Total, ms', 'Mean, ms', 'Max, ms']
+
+    def __init__(self, parent: Qt.QWidget = None):
+        super().__init__('Performance', parent)
+        self.setObjectName('performance_panel')
+        contents = Qt.QWidget()
+        layout = Qt.QVBoxLayout()
+        contents.setLayout(layout)
+        buttons = Qt.QHBoxLayout()
+        self.enabled_box = Qt.QCheckBox('Record')
+        self.enabled_box.setChecked(instrumentation.is_enabled())
+        self.enabled_box.toggled.connect(self.set_enabled)
+        buttons.addWidget(self.enabled_box)
+        reset_button = Qt.QPushButton('Reset')
+        reset_button.pressed.connect(self.reset)
+        buttons.addWidget(reset_button)
+        export_button = Qt.QPushButton('Export trace')
+        export_button.pressed.connect(self.export_trace)
+        buttons.addWidget(export_button)
+        layout.addLayout(buttons)
+        self.spans_table = Qt.QTableWidget(0, len(self.COLUMNS))
+        self.spans_table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.spans_table.setEditTriggers(Qt.QAbstractItemView.NoEditTriggers)
+        self.spans_table.setSortingEnabled(True)
+        layout.addWidget(self.spans_table)
+        self.counters_table = Qt.QTableWidget(0, 2)
+        self.counters_table.setHorizontalHeaderLabels(['Counter', 'Value'])
+        self.counters_table.setEditTriggers(Qt.QAbstractItemView.NoEditTriggers)
+        layout.addWidget(self.counters_table)
+        self.setWidget(contents)
+        self._timer = QtCore.QTimer(self)
+        self._timer.setInterval(self.REFRESH_INTERVAL)
+        self._timer.timeout.connect(self.refresh)
+        self.visibilityChanged.connect(self._toggle_refresh)
+
+    def _toggle_refresh(self, visible: bool):
+        if visible:
+            self.refresh()
+            self._timer.start()
+        else:
+            self._timer.stop()
+
+    def set_enabled(self, enabled: bool):
+        if enabled:
+            instrumentation.enable()
+        else:
+            instrumentation.disable()
+
+    def reset(self):
+        instrumentation.reset()
+        self.refresh()
+
+    @staticmethod
+    def _number_item(value: float) -> Qt.QTableWidgetItem:
+        item = Qt.QTableWidgetItem()
+        item.setData(QtCore.Qt.DisplayRole, round(value, 3))
+        return item
+
+    def refresh(self):
+        statistics = instrumentation.statistics()
+        self.spans_table.setSortingEnabled(False)
+        self.spans_table.setRowCount(len(statistics))
+        for row, (name, span) in enumerate(sorted(statistics.items())):
+            self.spans_table.setItem(row, 0, Qt.QTableWidgetItem(name))
+            self.spans_table.setItem(row, 1, self._number_item(span.calls))
+            self.spans_table.setItem(row, 2, self._number_item(span.total * 1000))
+            self.spans_table.setItem(row, 3, self._number_item(
+                span.total / span.calls * 1000))
+            self.spans_table.setItem(row, 4, self._number_item(span.max * 1000))
+        self.spans_table.setSortingEnabled(True)
+        counters = instrumentation.counters()
+        self.counters_table.setRowCount(len(counters))
+        for row, (name, value) in enumerate(sorted(counters.items())):
+            self.counters_table.setItem(row, 0, Qt.QTableWidgetItem(name))
+            self.counters_table.setItem(row, 1, self._number_item(value))
+
+    def export_trace(self):
+        file_name, _ = Qt.QFileDialog.getSaveFileName(
+            self, 'Export trace', str(Path.home() / 'trace.json'),
+            'Chrome trace (*.json)')
+        if file_name:
+            instrumentation.save_chrome_trace(Path(file_name))
@@ -0,0 +1,77 @@
+from typing import Callable
+from PySide2 import QtCore, QtWidgets as Qt
+from field_linguistics_ide.validation import ConsistencyChecker, Problem, fix_description
+
+
+class ProblemsPanel(Qt.QDockWidget):
+    # the checker is advanced a little on every tick, so typing stays smooth;
+    # the timer only runs while the checker has work
+    INTERVAL = 100
+    BATCH = 200
+    # more rows than anyone reads make the table itself slow
+    LIMIT = 500
+    COLUMNS = ['Kind', 'Document', 'Message', '']
+
+    def __init__(self, checker: ConsistencyChecker,
+                 fix_problem: Callable[[Problem], None],
+                 parent: Qt.QWidget = None):
+        super().__init__('Problems', parent)
+        self.setObjectName('problems_panel')
+        self.checker = checker
+        self._fix_problem = fix_problem
+        self._revision = None
+        contents = Qt.QWidget()
+        layout = Qt.QVBoxLayout()
+        contents.setLayout(layout)
+        self.status_label = Qt.QLabel()
+        layout.addWidget(self.status_label)
+        self.problems_table = Qt.QTableWidget(0, len(self.COLUMNS))
+        self.problems_table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.problems_table.setEditTriggers(Qt.QAbstractItemView.NoEditTriggers)
+        self.problems_table.horizontalHeader().setSectionResizeMode(
+            2, Qt.QHeaderView.Stretch)
+        layout.addWidget(self.problems_table)
+        self.setWidget(contents)
+        self._timer = QtCore.QTimer(self)
+        self._timer.setInterval(self.INTERVAL)
+        self._timer.timeout.connect(self.step)
+        self.checker.subscribe(self._work_queued)
+        self.visibilityChanged.connect(self._visibility_changed)
+        self._work_queued()
+
+    def _work_queued(self):
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def _visibility_changed(self, visible: bool):
+        # hidden panels are not refreshed while the checker works
+        if visible and self.checker.revision != self._revision:
+            self.refresh()
+
+    def step(self):
+        working = self.checker.process(self.BATCH)
+        if not working:
+            self._timer.stop()
+        if self.isVisible() and self.checker.revision != self._revision:
+            self.refresh()
+        self.status_label.setText('Checking, {} left'.format(self.checker.pending)
+                                  if working else
+                                  '{} problems'.format(self.checker.problem_count))
+
+    def refresh(self):
+        self._revision = self.checker.revision
+        problems = self.checker.problems[:self.LIMIT]
+        self.problems_table.setRowCount(len(problems))
+        for row, problem in enumerate(problems):
+            self.problems_table.setItem(row, 0, Qt.QTableWidgetItem(problem.kind))
+            self.problems_table.setItem(
+                row, 1, Qt.QTableWidgetItem(problem.document or 'dictionary'))
+            self.problems_table.setItem(row, 2, Qt.QTableWidgetItem(problem.message))
+            fix_button = Qt.QPushButton(fix_description(problem))
+            fix_button.pressed.connect(lambda problem=problem: self.fix(problem))
+            self.problems_table.setCellWidget(row, 3, fix_button)
+
+    def fix(self, problem: Problem):
+        self._fix_problem(problem)
+        self.checker.process()
+        self.refresh()
@@ -0,0 +1,56 @@
+from typing import Callable
+from PySide2 import QtCore, QtWidgets as Qt
+from field_linguistics_ide.search import TranslationIndex
+from field_linguistics_ide.types_ import Document
+
+
+class SearchPanel(Qt.QDockWidget):
+    # search as you type, after a short pause
+    DELAY = 200
+    LIMIT = 100
+
+    def __init__(self, index: TranslationIndex,
+                 open_line: Callable[[Document, int], None],
+                 parent: Qt.QWidget = None):
+        super().__init__('Search translations', parent)
+        self.setObjectName('search_panel')
+        self.index = index
+        self._open_line = open_line
+        contents = Qt.QWidget()
+        layout = Qt.QVBoxLayout()
+        contents.setLayout(layout)
+        self.query_edit = Qt.QLineEdit()
+        self.query_edit.setPlaceholderText('Search translations')
+        self.query_edit.textEdited.connect(self._schedule)
+        self.query_edit.returnPressed.connect(self.search)
+        layout.addWidget(self.query_edit)
+        self.results = Qt.QListWidget()
+        self.results.itemActivated.connect(self._activate)
+        layout.addWidget(self.results)
+        self.setWidget(contents)
+        self._timer = QtCore.QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(self.DELAY)
+        self._timer.timeout.connect(self.search)
+
+    def _schedule(self, _):
+        self._timer.start()
+
+    def focus_query(self):
+        self.show()
+        self.raise_()
+        self.query_edit.setFocus()
+        self.query_edit.selectAll()
+
+    def search(self):
+        self._timer.stop()
+        self.results.clear()
+        for hit in self.index.search(self.query_edit.text(), self.LIMIT):
+            item = Qt.QListWidgetItem('{}: {}'.format(hit.document.name, hit.translation))
+            item.setToolTip('score {:.2f}'.format(hit.score))
+            item.setData(QtCore.Qt.UserRole, (hit.document, hit.line_id))
+            self.results.addItem(item)
+
+    def _activate(self, item: Qt.QListWidgetItem):
+        document, line_id = item.data(QtCore.Qt.UserRole)
+        self._open_line(document, line_id)
@@ -0,0 +1,273 @@
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Set, Tuple, Union
+from field_linguistics_ide.types_ import Document, Line, Morpheme, MorphemesDictionary
+
+MORPHEME_EVENTS = {'add_morpheme', 'update_morpheme', 'pop_morpheme'}
+
+
+class Problem(NamedTuple):
+    kind: str
+    document: Optional[str]
+    morpheme_id: Optional[int]
+    dict_id: Optional[int]
+    message: str
+
+
+def _class_name(is_stem: Optional[bool]) -> str:
+    return 'stem' if is_stem else 'affix'
+
+
+def check_morpheme(document_name: str, morpheme: Morpheme,
+                   dictionary: MorphemesDictionary) -> Optional[Problem]:
+    if morpheme.dict_id is None:
+        return None
+    entry = dictionary.get(morpheme.dict_id)
+    if entry is None:
+        return Problem('missing_entry', document_name, morpheme.id_,
+                       morpheme.dict_id,
+                       'dict_id {} is not in the dictionary'.format(morpheme.dict_id))
+    if entry.gloss != morpheme.gloss or entry.text != morpheme.text:
+        return Problem('entry_mismatch', document_name, morpheme.id_,
+                       morpheme.dict_id,
+                       '{}/{} differs from the dictionary entry {}/{}'.format(
+                           morpheme.text, morpheme.gloss, entry.text, entry.gloss))
+    if None not in (entry.is_stem, morpheme.is_stem) and entry.is_stem != morpheme.is_stem:
+        return Problem('entry_mismatch', document_name, morpheme.id_,
+                       morpheme.dict_id,
+                       '{}/{} is marked as {} but the dictionary entry as {}'.format(
+                           morpheme.text, morpheme.gloss, _class_name(morpheme.is_stem),
+                           _class_name(entry.is_stem)))
+    return None
+
+
+def check_document(document: Document,
+                   dictionary: MorphemesDictionary) -> Iterator[Problem]:
+    for morpheme in document.morphemes.values():
+        problem = check_morpheme(document.name, morpheme, dictionary)
+        if problem is not None:
+            yield problem
+
+
+def _check_group(dict_ids: List[int], dictionary: MorphemesDictionary) -> Iterator[Problem]:
+    # the first entry of a text and gloss decides, later ones conflict with it
+    first = dictionary[dict_ids[0]]
+    for dict_id in dict_ids[1:]:
+        if dictionary[dict_id].is_stem != first.is_stem:
+            yield Problem('stem_conflict', None, None, dict_id,
+                          '{}/{} is both a stem and an affix'.format(first.text, first.gloss))
+
+
+def check_dictionary(dictionary: MorphemesDictionary) -> Iterator[Problem]:
+    groups: Dict[Tuple[str, Optional[str]], List[int]] = {}
+    for dict_id, entry in dictionary.items():
+        groups.setdefault((entry.text, entry.gloss), []).append(dict_id)
+    for dict_ids in groups.values():
+        yield from _check_group(dict_ids, dictionary)
+
+
+def fix_description(problem: Problem) -> str:
+    if problem.kind == 'missing_entry':
+        return 'Relink or unlink'
+    if problem.kind == 'entry_mismatch':
+        return 'Take from dictionary'
+    return 'Use the first class'
+
+
+# Builds its indexes once, then only re-checks what the documents and
+# the dictionary report as changed. process() does a bounded amount of
+# work so that the GUI can call it in idle time.
+class ConsistencyChecker:
+    def __init__(self, dictionary: MorphemesDictionary):
+        self.dictionary = dictionary
+        # bumped whenever the list of problems changes
+        self.revision = 0
+        self._documents: Dict[int, Document] = {}
+        self._observers = {}
+        self._morpheme_problems: Dict[Tuple[int, int], Problem] = {}
+        self._entry_problems: Dict[int, Problem] = {}
+        # morphemes linked to each entry and entries sharing a text and gloss
+        self._linked: Dict[int, Set[Tuple[int, int]]] = {}
+        self._links: Dict[Tuple[int, int], int] = {}
+        self._groups: Dict[Tuple[str, Optional[str]], Set[int]] = {}
+        self._entry_keys: Dict[int, Tuple[str, Optional[str]]] = {}
+        self._dirty_morphemes: Set[Tuple[int, int]] = set()
+        self._dirty_entries: Set[int] = set(dictionary)
+        self._dirty_groups: Set[Tuple[str, Optional[str]]] = set()
+        # the problems sorted for the revision they were sorted at
+        self._sorted: Tuple[Optional[int], List[Problem]] = (None, [])
+        # called when there is new work for process()
+        self._subscribers: List[Callable[[], None]] = []
+        dictionary.subscribe(self._dictionary_changed)
+
+    def subscribe(self, subscriber: Callable[[], None]):
+        self._subscribers.append(subscriber)
+
+    def unsubscribe(self, subscriber: Callable[[], None]):
+        self._subscribers.remove(subscriber)
+
+    def _notify(self):
+        for subscriber in self._subscribers:
+            subscriber()
+
+    def close(self):
+        self.dictionary.unsubscribe(self._dictionary_changed)
+        for document in list(self._documents.values()):
+            self.remove_document(document)
+
+    def add_document(self, document: Document):
+        document_key = id(document)
+        if document_key in self._documents:
+            return
+        self._documents[document_key] = document
+
+        def observer(event: str, item: Union[Line, Morpheme]):
+            if event in MORPHEME_EVENTS:
+                self._dirty_morphemes.add((document_key, item.id_))
+                self._notify()
+
+        self._observers[document_key] = observer
+        document.subscribe(observer)
+        self._dirty_morphemes.update((document_key, morpheme_id)
+                                     for morpheme_id in document.morphemes)
+        self._notify()
+
+    def remove_document(self, document: Document):
+        document_key = id(document)
+        if self._documents.pop(document_key, None) is None:
+            return
+        document.unsubscribe(self._observers.pop(document_key))
+        for key in [key for key in self._links if key[0] == document_key]:
+            self._unlink(key)
+        self._dirty_morphemes = {key for key in self._dirty_morphemes
+                                 if key[0] != document_key}
+        problems = len(self._morpheme_problems)
+        self._morpheme_problems = {key: problem
+                                   for key, problem in self._morpheme_problems.items()
+                                   if key[0] != document_key}
+        if len(self._morpheme_problems) != problems:
+            self.revision += 1
+            self._notify()
+
+    def _dictionary_changed(self, event: str, dict_id: Optional[int]):
+        if dict_id is None:
+            # reloaded, everything may have changed
+            self._dirty_entries.update(self.dictionary)
+            self._dirty_entries.update(self._entry_keys)
+            for document_key, document in self._documents.items():
+                self._dirty_morphemes.update((document_key, morpheme_id)
+                                             for morpheme_id in document.morphemes)
+        else:
+            self._dirty_entries.add(dict_id)
+        self._notify()
+
+    @property
+    def pending(self) -> int:
+        return len(self._dirty_morphemes) + len(self._dirty_entries) + len(self._dirty_groups)
+
+    @property
+    def problem_count(self) -> int:
+        return len(self._entry_problems) + len(self._morpheme_problems)
+
+    @property
+    def problems(self) -> List[Problem]:
+        revision, problems = self._sorted
+        if revision == self.revision:
+            return list(problems)
+        problems = list(self._entry_problems.values())
+        problems.extend(self._morpheme_problems.values())
+        problems.sort(key=lambda problem: (
+            problem.document or '', problem.kind,
+            -1 if problem.morpheme_id is None else problem.morpheme_id,
+            -1 if problem.dict_id is None else problem.dict_id))
+        self._sorted = (self.revision, problems)
+        return list(problems)
+
+    def document(self, name: str) -> Optional[Document]:
+        for document in self._documents.values():
+            if document.name == name:
+                return document
+        return None
+
+    def _unlink(self, key: Tuple[int, int]):
+        dict_id = self._links.pop(key, None)
+        if dict_id is not None:
+            self._linked[dict_id].discard(key)
+            if not self._linked[dict_id]:
+                del self._linked[dict_id]
+
+    def _set_problem(self, problems: dict, key, problem: Optional[Problem]):
+        if problems.get(key) == problem:
+            return
+        if problem is None:
+            del problems[key]
+        else:
+            problems[key] = problem
+        self.revision += 1
+
+    def _check_entry(self, dict_id: int):
+        old_key = self._entry_keys.pop(dict_id, None)
+        if old_key is not None:
+            self._groups[old_key].discard(dict_id)
+            self._dirty_groups.add(old_key)
+        entry = self.dictionary.get(dict_id)
+        if entry is not None:
+            key = (entry.text, entry.gloss)
+            self._entry_keys[dict_id] = key
+            self._groups.setdefault(key, set()).add(dict_id)
+            self._dirty_groups.add(key)
+        else:
+            self._set_problem(self._entry_problems, dict_id, None)
+        # morphemes linked to the entry are checked again
+        self._dirty_morphemes.update(self._linked.get(dict_id, ()))
+
+    def _check_group(self, key: Tuple[str, Optional[str]]):
+        dict_ids = sorted(self._groups.get(key, ()))
+        if not dict_ids:
+            self._groups.pop(key, None)
+            return
+        problems = {problem.dict_id: problem
+                    for problem in _check_group(dict_ids, self.dictionary)}
+        for dict_id in dict_ids:
+            self._set_problem(self._entry_problems, dict_id, problems.get(dict_id))
+
+    def _check_morpheme(self, key: Tuple[int, int]):
+        document = self._documents.get(key[0])
+        self._unlink(key)
+        morpheme = document.morphemes.get(key[1]) if document is not None else None
+        if morpheme is None:
+            self._set_problem(self._morpheme_problems, key, None)
+            return
+        if morpheme.dict_id is not None:
+            self._links[key] = morpheme.dict_id
+            self._linked.setdefault(morpheme.dict_id, set()).add(key)
+        self._set_problem(self._morpheme_problems, key,
+                          check_morpheme(document.name, morpheme, self.dictionary))
+
+    def process(self, limit: Optional[int] = None) -> bool:
+        # returns whether work is left
+        done = 0
+        while self.pending and (limit is None or done < limit):
+            if self._dirty_entries:
+                self._check_entry(self._dirty_entries.pop())
+            elif self._dirty_groups:
+                self._check_group(self._dirty_groups.pop())
+            else:
+                self._check_morpheme(self._dirty_morphemes.pop())
+            done += 1
+        return bool(self.pending)
+
+    def fix(self, problem: Problem):
+        if problem.kind == 'stem_conflict':
+            entry = self.dictionary[problem.dict_id]
+            first = self.dictionary[min(self._groups[(entry.text, entry.gloss)])]
+            self.dictionary.edit(problem.dict_id, 'is_stem', first.is_stem)
+            return
+        document = self.document(problem.document)
+        morpheme = document.morphemes[problem.morpheme_id]
+        if problem.kind == 'missing_entry':
+            document.update_morpheme(morpheme.id_, 'dict_id', self.dictionary.find(morpheme))
+            return
+        entry = self.dictionary[morpheme.dict_id]
+        for field in ('text', 'gloss', 'is_stem'):
+            value = getattr(entry, field)
+            if getattr(morpheme, field) != value and value is not None:
+                document.update_morpheme(morpheme.id_, field, value)
@@ -0,0 +1,181 @@
+import hashlib
+import json
+import time
+import zlib
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
+from field_linguistics_ide.instrumentation import timed
+from field_linguistics_ide.project import DICTIONARY_FILE, DOCUMENTS_DIR, SETTINGS_FILE, \
+    document_paths
+from field_linguistics_ide.types_ import save_json, write_bytes_atomically
+
+SNAPSHOTS_DIR = '.snapshots'
+# files changed this recently could change again within the same
+# mtime tick, their hashes are not cached
+_RACY_NS = 2 * 10 ** 9
+
+
+class Snapshot(NamedTuple):
+    id_: str
+    created: float
+    message: str
+    # project relative path to content hash
+    files: Dict[str, str]
+
+
+class SnapshotDiff(NamedTuple):
+    added: List[str]
+    removed: List[str]
+    changed: List[str]
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed)
+
+
+def diff_files(old: Dict[str, str], new: Dict[str, str]) -> SnapshotDiff:
+    return SnapshotDiff(sorted(set(new) - set(old)),
+                        sorted(set(old) - set(new)),
+                        sorted(path for path in set(old) & set(new) if old[path] != new[path]))
+
+
+# Keeps every version of the dictionary and the documents once, under
+# the SHA-256 of its content, in <project>/.snapshots/objects. A
+# snapshot is a small manifest of paths and hashes, so unchanged files
+# are shared between snapshots. A stat cache of size and mtime avoids
+# reading files that did not change since they were last hashed.
+class SnapshotStore:
+    def __init__(self, project_path: Path):
+        self.project_path = project_path
+        self.root = project_path / SNAPSHOTS_DIR
+        self.objects_dir = self.root / 'objects'
+        self.manifests_dir = self.root / 'snapshots'
+        self._stat_cache_path = self.root / 'stat_cache.json'
+        self._stat_cache: Optional[Dict[str, list]] = None
+
+    def _tracked_paths(self) -> List[Path]:
+        paths = [self.project_path / name for name in (DICTIONARY_FILE, SETTINGS_FILE)
+                 if (self.project_path / name).exists()]
+        if (self.project_path / DOCUMENTS_DIR).is_dir():
+            paths.extend(document_paths(self.project_path / DOCUMENTS_DIR))
+        return paths
+
+    def _relative(self, path: Path) -> str:
+        return path.relative_to(self.project_path).as_posix()
+
+    def _object_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / digest[2:]
+
+    def has_object(self, digest: str) -> bool:
+        return self._object_path(digest).exists()
+
+    def read_object(self, digest: str) -> bytes:
+        return zlib.decompress(self._object_path(digest).read_bytes())
+
+    def _store_object(self, digest: str, data: bytes):
+        path = self._object_path(digest)
+        if path.exists():
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_bytes_atomically(path, zlib.compress(data))
+
+    def _load_stat_cache(self) -> Dict[str, list]:
+        if self._stat_cache is None:
+            try:
+                self._stat_cache = json.loads(self._stat_cache_path.read_text())
+            except (OSError, ValueError):
+                self._stat_cache = {}
+        return self._stat_cache
+
+    def _save_stat_cache(self):
+        if self._stat_cache is not None:
+            self.root.mkdir(parents=True, exist_ok=True)
+            save_json(self._stat_cache_path, self._stat_cache)
+
+    def _file_hash(self, path: Path, store: bool) -> str:
+        stat_cache = self._load_stat_cache()
+        relative = self._relative(path)
+        stat = path.stat()
+        cached = stat_cache.get(relative)
+        if cached is not None and cached[:2] == [stat.st_size, stat.st_mtime_ns] \
+                and (not store or self.has_object(cached[2])):
+            return cached[2]
+        data = path.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()
+        if store:
+            self._store_object(digest, data)
+        if time.time_ns() - stat.st_mtime_ns > _RACY_NS:
+            stat_cache[relative] = [stat.st_size, stat.st_mtime_ns, digest]
+        else:
+            stat_cache.pop(relative, None)
+        return digest
+
+    def scan(self, store: bool = False) -> Dict[str, str]:
+        # only files whose size or mtime changed are read
+        files = {self._relative(path): self._file_hash(path, store)
+                 for path in self._tracked_paths()}
+        self._save_stat_cache()
+        return files
+
+    def _read_manifest(self, path: Path) -> Snapshot:
+        manifest = json.loads(path.read_text())
+        return Snapshot(manifest['id_'], manifest['created'], manifest['message'],
+                        manifest['files'])
+
+    def list(self) -> List[Snapshot]:
+        if not self.manifests_dir.is_dir():
+            return []
+        snapshots = [self._read_manifest(path) for path in self.manifests_dir.iterdir()
+                     if path.suffix == '.json']
+        return sorted(snapshots, key=lambda snapshot: snapshot.created)
+
+    def latest(self) -> Optional[Snapshot]:
+        snapshots = self.list()
+        return snapshots[-1] if snapshots else None
+
+    def get(self, snapshot_id: str) -> Snapshot:
+        # any unambiguous prefix of an id will do
+        path = self.manifests_dir / '{}.json'.format(snapshot_id)
+        if path.exists():
+            return self._read_manifest(path)
+        matches = sorted(self.manifests_dir.glob('{}*.json'.format(snapshot_id))) \
+            if self.manifests_dir.is_dir() else []
+        if len(matches) != 1:
+            raise KeyError('{} snapshots match {}'.format(len(matches), snapshot_id))
+        return self._read_manifest(matches[0])
+
+    @timed('SnapshotStore.create')
+    def create(self, message: str = '') -> Snapshot:
+        files = self.scan(store=True)
+        latest = self.latest()
+        if latest is not None and latest.files == files:
+            return latest
+        created = time.time()
+        digest = hashlib.sha256(json.dumps([created, message, files],
+                                           sort_keys=True).encode('utf-8')).hexdigest()
+        snapshot = Snapshot(digest[:12], created, message, files)
+        self.manifests_dir.mkdir(parents=True, exist_ok=True)
+        save_json(self.manifests_dir / '{}.json'.format(snapshot.id_), snapshot._asdict())
+        return snapshot
+
+    def diff(self, old_id: str, new_id: Optional[str] = None) -> SnapshotDiff:
+        # without a second snapshot, against the files in the project
+        new_files = self.scan() if new_id is None else self.get(new_id).files
+        return diff_files(self.get(old_id).files, new_files)
+
+    @timed('SnapshotStore.restore')
+    def restore(self, snapshot_id: str) -> SnapshotDiff:
+        snapshot = self.get(snapshot_id)
+        current = self.scan()
+        changes = diff_files(current, snapshot.files)
+        for relative in changes.added + changes.changed:
+            path = self.project_path / relative
+            path.parent.mkdir(parents=True, exist_ok=True)
+            write_bytes_atomically(path, self.read_object(snapshot.files[relative]))
+        for relative in changes.removed:
+            (self.project_path / relative).unlink()
+        # the restored files are hashed again on the next scan
+        stat_cache = self._load_stat_cache()
+        for relative in changes.added + changes.changed + changes.removed:
+            stat_cache.pop(relative, None)
+        self._save_stat_cache()
+        return changes
@@ -10,16 +10,22 @@ setup(
     author_email='mikivo@list.ru',
     license='GPLv3',
     packages=['field_linguistics_ide',
+              'field_linguistics_ide.exporters',
               'field_linguistics_ide.loaders',
+              'field_linguistics_ide.server',
               'field_linguistics_ide.user_interface',
               'field_linguistics_ide.user_interface.templates',
               'field_linguistics_ide.user_interface.widgets',
               'field_linguistics_ide.user_interface.widgets.document_area',
               ],
     zip_safe=False,
+    extras_require={
+        'analysis': ['numpy'],
+    },
     entry_points={
         'console_scripts': [
             'field-linguistics-ide=field_linguistics_ide.user_interface.main:main',
+            'field-linguistics=field_linguistics_ide.cli:main',
         ],
     },
     include_package_data=True,
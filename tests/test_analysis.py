@@ -0,0 +1,37 @@
+import pytest
+from field_linguistics_ide.types_ import Document, Line, Morpheme, MorphemesDictionary, Token
+
+np = pytest.importorskip('numpy')
+from field_linguistics_ide.analysis import CorpusAnalysis  # noqa: E402
+
+
+def _document(dictionary: MorphemesDictionary, *tokens) -> Document:
+    document = Document()
+    line = Line([], '')
+    for morphemes in tokens:
+        token = Token([])
+        for text in morphemes:
+            entry = dictionary.find(Morpheme(text, text.upper()))
+            document.add_morpheme_to_token(
+                Morpheme(text, text.upper() if entry is not None else '', dict_id=entry),
+                token)
+        document.add_token_to_line(token, line)
+    document.add_line(line)
+    return document
+
+
+def test_unlinked_morpheme_breaks_bigram():
+    dictionary = MorphemesDictionary()
+    a = dictionary.add(Morpheme('a', 'A'))
+    b = dictionary.add(Morpheme('b', 'B'))
+    # x is not in the dictionary, so a and b are not neighbours
+    analysis = CorpusAnalysis([_document(dictionary, ['a', 'x', 'b'])], dictionary)
+    assert analysis.morpheme_matrix().sum() == 0
+    assert analysis.gloss_bigrams().counts.size == 0
+
+    analysis = CorpusAnalysis([_document(dictionary, ['a', 'x', 'b'], ['a', 'b'])],
+                              dictionary)
+    matrix = analysis.morpheme_matrix()
+    assert matrix.sum() == 1
+    codes = {dict_id: code for code, dict_id in enumerate(analysis.encoded.dict_ids)}
+    assert matrix[codes[a], codes[b]] == 1
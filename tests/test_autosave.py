@@ -0,0 +1,56 @@
+from concurrent.futures import wait
+import pytest
+from field_linguistics_ide.types_ import Document, Line, Morpheme, Token
+
+QtCore = pytest.importorskip('PySide2.QtCore')
+from field_linguistics_ide.user_interface.autosave import Autosaver  # noqa: E402
+
+
+def _document() -> Document:
+    document = Document()
+    line = Line([], '')
+    token = Token([])
+    document.add_morpheme_to_token(Morpheme('a', 'A'), token)
+    document.add_token_to_line(token, line)
+    document.add_line(line)
+    return document
+
+
+def _settle(autosaver: Autosaver):
+    # the worker's signal needs an event loop, the test collects by hand
+    wait([future for future, _, _ in autosaver._pending.values()])
+    autosaver._collect_failed()
+
+
+def test_failed_write_waits_for_the_next_edit(tmp_path):
+    QtCore.QCoreApplication.instance() or QtCore.QCoreApplication([])
+    # a file where the documents directory should be makes every write fail
+    blocker = tmp_path / 'documents'
+    blocker.write_text('')
+    target = blocker / 'document.json'
+    document = _document()
+    autosaver = Autosaver()
+    errors = []
+    autosaver.save_failed.connect(errors.append)
+    autosaver.track(document, lambda: target, dirty=True)
+
+    autosaver.flush()
+    _settle(autosaver)
+    assert len(errors) == 1
+
+    # nothing changed, so nothing is written and nothing reported again
+    autosaver.flush()
+    assert not autosaver._pending
+    _settle(autosaver)
+    assert len(errors) == 1
+
+    morpheme = next(iter(document.morphemes.values()))
+    document.update_morpheme(morpheme.id_, 'gloss', 'B')
+    autosaver.flush()
+    _settle(autosaver)
+    assert len(errors) == 2
+
+    # closing tries the failed write once more
+    blocker.unlink()
+    assert autosaver.close() == []
+    assert target.exists()
@@ -0,0 +1,25 @@
+import os
+import stat
+from field_linguistics_ide.types_ import write_bytes_atomically, write_text_atomically
+
+
+def _mode(path) -> int:
+    return stat.S_IMODE(os.stat(str(path)).st_mode)
+
+
+def test_atomic_write_keeps_file_mode(tmp_path):
+    path = tmp_path / 'dictionary.json'
+    path.write_text('{}')
+    os.chmod(str(path), 0o640)
+    write_text_atomically(path, '{"0": {}}')
+    assert _mode(path) == 0o640
+    assert path.read_text() == '{"0": {}}'
+
+
+def test_atomic_write_of_new_file_follows_umask(tmp_path):
+    path = tmp_path / 'object'
+    write_bytes_atomically(path, b'data')
+    umask = os.umask(0)
+    os.umask(umask)
+    assert _mode(path) == 0o666 & ~umask
+    assert path.read_bytes() == b'data'
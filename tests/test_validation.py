@@ -0,0 +1,38 @@
+from field_linguistics_ide.types_ import Document, Line, Morpheme, MorphemesDictionary, Token
+from field_linguistics_ide.validation import ConsistencyChecker
+
+
+def _document(*morphemes: Morpheme) -> Document:
+    document = Document()
+    line = Line([], '')
+    token = Token([])
+    for morpheme in morphemes:
+        document.add_morpheme_to_token(morpheme, token)
+    document.add_token_to_line(token, line)
+    document.add_line(line)
+    return document
+
+
+def test_checker_reports_work_and_sorts_only_on_change():
+    dictionary = MorphemesDictionary()
+    dict_id = dictionary.add(Morpheme('a', 'A'))
+    document = _document(Morpheme('a', 'A', dict_id=dict_id))
+    checker = ConsistencyChecker(dictionary)
+    checker.process()
+    queued = []
+    checker.subscribe(lambda: queued.append(checker.pending))
+    checker.add_document(document)
+    assert queued == [1]
+    assert not checker.process()
+    assert checker.problem_count == 0
+
+    morpheme = next(iter(document.morphemes.values()))
+    document.update_morpheme(morpheme.id_, 'gloss', 'B')
+    assert queued == [1, 1]
+    checker.process()
+    problems = checker.problems
+    assert [problem.kind for problem in problems] == ['entry_mismatch']
+    # unchanged problems are not sorted again
+    sorted_before = checker._sorted
+    assert checker.problems == problems
+    assert checker._sorted is sorted_before